@@ -0,0 +1,415 @@
+""" Asyncio counterpart of :class:`lfmcli.api.Client`.
+
+AsyncClient shares the requests and result parsing of Client (see
+lfmcli.api.BaseClient): its methods are coroutines returning the same result
+dicts, so callers can fan out many RESTCONF requests from a single process::
+
+    fm = AsyncClient(config=config)
+    results = await asyncio.gather(*[fm.get_eline_stats(n) for n in names])
+    await fm.close()
+
+The iter_* methods are async generators. The stats watch and the connector
+stats sweep are only available on Client.
+
+Needs python 3.6+ and aiohttp (``pip install lfmcli[async]``).
+"""
+import asyncio
+import json
+
+import requests
+
+from lfmcli.api import BaseClient
+from lfmcli.auth import TokenAuth
+from lfmcli.controller import Controller, JOLOKIA_READ
+from lfmcli.jsonstream import iter_list
+from lfmcli.retry import CircuitOpenException
+
+try:
+    import aiohttp
+    REQUEST_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError,
+                      CircuitOpenException)
+except ImportError:
+    aiohttp = None
+
+
+class AsyncResponse(object):
+    """ Response of an AsyncController request.
+
+    The body is read, but for the 200 responses of streamed requests: their
+    aiohttp response is 'raw', release it when done.
+
+    """
+
+    def __init__(self, status_code, content, headers, raw=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.raw = raw
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+
+# -----------------------------------------------------------------------------
+# Class 'AsyncController'
+# -----------------------------------------------------------------------------
+class AsyncController(Controller):
+    """ Controller sending its requests through an aiohttp session. """
+
+    def __init__(self, **kwargs):
+        """Initializes this object properties."""
+
+        if aiohttp is None:
+            raise Exception('AsyncController needs aiohttp installed')
+
+        Controller.__init__(self, **kwargs)
+
+    def make_auth(self):
+        """ Returns the auth for the configured 'auth' mode.
+
+        Tokens are requested with a blocking request, run in the loop's
+        executor (see http_request).
+
+        """
+        auth = Controller.make_auth(self)
+        if isinstance(auth, TokenAuth):
+            auth.post = requests.post
+            return auth
+
+        return aiohttp.BasicAuth(self.config['user'], self.config['password'])
+
+    def make_cache(self):
+        """ The state cache (see lfmcli.cache) is blocking, not used here """
+        return None
+
+    def get_session(self):
+        """ Returns the pooled aiohttp session shared by every request.
+
+        Must be called from a running event loop, the session is created on
+        first use with at most 'pool_maxsize' connections per host.
+
+        """
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.config['pool_connections'] *
+                self.config['pool_maxsize'],
+                limit_per_host=self.config['pool_maxsize'],
+                force_close=not self.config['keep_alive'],
+                ssl=None if self.config['verify'] else False)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                auth=None if isinstance(self.auth, TokenAuth) else self.auth,
+                trace_configs=[self.trace_config()])
+
+        return self.session
+
+    def jolokia_read(self, member, mbean):
+        """ Reads a datastore MBean, see Controller.jolokia_read
+
+        Leader discovery is rare (once per 'leader_ttl') and done with a
+        blocking request, routing runs it in the loop's executor (see
+        http_request).
+
+        """
+        resp = requests.get(member.get_root_url() + JOLOKIA_READ + mbean,
+                            auth=(self.config['user'],
+                                  self.config['password']),
+                            headers=self.default_headers,
+                            verify=self.config['verify'],
+                            timeout=self.config['timeout'])
+        if resp.status_code != 200:
+            return {}
+        return resp.json().get('value') or {}
+
+    async def check_members(self):
+        """ Health checks every cluster member, see Controller.check_members
+        """
+        for member in self.members:
+            try:
+                async with self.get_session().get(
+                        member.get_base_url() +
+                        "/operational/lumina-controller-status:system-status",
+                        headers=self.default_headers,
+                        timeout=aiohttp.ClientTimeout(
+                            total=self.config['timeout'])) as resp:
+                    await resp.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                member.breaker.record_failure()
+                continue
+
+            if resp.status == 200:
+                member.breaker.record_success()
+            else:
+                member.breaker.record_failure()
+
+        return [member.to_dict() for member in self.members]
+
+    def trace_config(self):
+        """ Returns the aiohttp tracing hooks feeding the pool counters. """
+
+        async def on_request_start(session, ctx, params):
+            self.stats.incr('requests')
+
+        async def on_connection_create_end(session, ctx, params):
+            self.stats.incr('connections')
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        return trace
+
+    async def close(self):
+        """ Closes every pooled connection. """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def route_async(self, method, url, idempotent=False):
+        """ Picks where to send a request, see Controller.route
+
+        Routing a config write may discover the shard leader with blocking
+        jolokia reads, it is run in the loop's executor.
+
+        """
+        if len(self.members) and self.config['leader_routing'] and \
+                self.is_write(method, url):
+            return await asyncio.get_event_loop().run_in_executor(
+                None, self.route, method, url, idempotent)
+        return self.route(method, url, idempotent)
+
+    async def http_request(self, method, url, data=None, headers=None,
+                           timeout=None, idempotent=False, stream=False):
+        """ Sends an HTTP request over the pooled session
+            and returns the response with its body read.
+
+        Retries and circuit breaking follow Controller.http_request.
+
+        :param string method: HTTP method (GET, POST, PUT, DELETE)
+        :param string url: The complete url including protocol
+        :param string data: The data to include in the body of the request.
+        :param dict headers: The headers to include in the request.
+        :param string timeout: Pass a timeout for longlived queries
+        :param bool idempotent: The request (RPC) has no side effect
+        :param bool stream: Leave the body of a 200 response unread
+        :return: The response from the http request.
+        :rtype: `AsyncResponse`
+
+        """
+
+        if headers is None:
+            headers = self.default_headers
+
+        if timeout is None:
+            timeout = self.config['timeout']
+
+        if stream:
+            # like requests, the timeout bounds each read of the body
+            client_timeout = aiohttp.ClientTimeout(sock_connect=timeout,
+                                                   sock_read=timeout)
+        else:
+            client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+        retryable = self.retry.is_retryable(method, idempotent)
+        refreshed = False
+        attempt = 0
+        while True:
+            target, breaker = await self.route_async(method, url, idempotent)
+            retry_after = None
+            if isinstance(self.auth, TokenAuth):
+                token = await asyncio.get_event_loop().run_in_executor(
+                    None, self.auth.get_token)
+                headers = dict(headers, Authorization='Bearer ' + token)
+            try:
+                resp = await self.get_session().request(
+                    method, target, data=data, headers=headers,
+                    timeout=client_timeout)
+                content = None
+                if not stream or resp.status != 200:
+                    content = await resp.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                breaker.record_failure()
+                self.leader_failed(method, url, breaker)
+                if not retryable or attempt >= self.retry.retries:
+                    raise
+            except Exception:
+                # never leave a half open breaker without an outcome
+                breaker.record_failure()
+                self.leader_failed(method, url, breaker)
+                raise
+            else:
+                if resp.status == 401 and not refreshed and \
+                        isinstance(self.auth, TokenAuth):
+                    breaker.record_success()
+                    refreshed = True
+                    self.auth.invalidate(token)
+                    continue
+
+                if not self.retry.is_retryable_status(resp.status):
+                    breaker.record_success()
+                    return AsyncResponse(resp.status, content, resp.headers,
+                                         resp if content is None else None)
+
+                breaker.record_failure()
+                self.leader_failed(method, url, breaker)
+                if not retryable or attempt >= self.retry.retries:
+                    return AsyncResponse(resp.status, content, resp.headers)
+                retry_after = resp.headers.get('retry-after')
+
+            await asyncio.sleep(self.retry.backoff(attempt, retry_after))
+            attempt += 1
+
+    async def http_get_request(self, url, headers=None, timeout=None):
+        """ Sends HTTP GET request, see Controller.http_get_request """
+        return await self.http_request('GET', url, headers=headers,
+                                       timeout=timeout)
+
+    async def http_stream_request(self, url, headers=None, timeout=None):
+        """ Sends HTTP GET request leaving the body of a 200 response
+            unread, see Controller.http_stream_request
+        """
+        return await self.http_request('GET', url, headers=headers,
+                                       timeout=timeout, stream=True)
+
+    async def http_post_request(self, url, data, headers=None,
+                                idempotent=False):
+        """ Sends HTTP POST request, see Controller.http_post_request """
+        return await self.http_request('POST', url, data=data,
+                                       headers=headers, idempotent=idempotent)
+
+    async def http_put_request(self, url, data, headers=None):
+        """ Sends HTTP PUT request, see Controller.http_put_request """
+        return await self.http_request('PUT', url, data=data,
+                                       headers=headers)
+
+    async def http_patch_request(self, url, data, headers=None,
+                                 idempotent=False):
+        """ Sends HTTP PATCH request, see Controller.http_patch_request """
+        return await self.http_request('PATCH', url, data=data,
+                                       headers=headers, idempotent=idempotent)
+
+    async def http_delete_request(self, url, data=None, headers=None):
+        """ Sends HTTP DELETE request, see Controller.http_delete_request """
+        return await self.http_request('DELETE', url, data=data,
+                                       headers=headers)
+
+
+# -----------------------------------------------------------------------------
+# Class 'AsyncClient'
+# -----------------------------------------------------------------------------
+class AsyncClient(BaseClient):
+    """Class that represents a Flowmanager service (asyncio version)
+
+    The methods sending requests are coroutines returning the same dict as
+    the Client method of the same name, the iter_* methods async generators.
+
+    """
+
+    def __init__(self, **kwargs):
+        """Initializes this object properties."""
+        self.ctrl = AsyncController(**kwargs)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        """ Closes the pooled connections to Flow Manager. """
+        await self.ctrl.close()
+
+    async def check_members(self):
+        """ Health checks the controller cluster members """
+        return await self.ctrl.check_members()
+
+    async def send(self, op):
+        """ Sends the request of an Operation and returns the response. """
+        return await self.ctrl.http_request(op.method, op.url, data=op.data,
+                                            headers=op.headers,
+                                            idempotent=op.idempotent)
+
+    async def perform(self, op):
+        """ Sends an Operation and returns its Result dict. """
+        resp = await self.send(op)
+        if op.reread is not None and resp.status_code not in (200, 404):
+            return await self.perform(op.reread)
+        return self.operation_result(op, resp)
+
+    async def patch_entries(self, url, list_name, entries, key='name',
+                            operation='merge', chunk_size=None, workers=1):
+        """ Writes many entries of a config list with YANG-Patch, up to
+            workers chunks at a time, see Client.patch_entries
+        """
+
+        semaphore = asyncio.Semaphore(workers)
+
+        async def send(keys, op):
+            async with semaphore:
+                try:
+                    resp = await self.send(op)
+                except REQUEST_ERRORS as e:
+                    return self.patch_failed(keys, str(e))
+            return self.patch_results(resp, keys)
+
+        chunks = self.patch_operations(url, list_name, entries, key,
+                                       operation, chunk_size)
+        return self.patch_report(await asyncio.gather(
+            *[send(keys, op) for keys, op in chunks]))
+
+    async def iter_stats(self, kind, names=None, workers=8):
+        """ Get the stats of many elines or etrees, up to workers at a time,
+            see Client.iter_stats
+        """
+
+        if names is None:
+            names = self.stats_names(
+                kind, await getattr(self, 'get_{}s'.format(kind))())
+
+        get_stats = getattr(self, 'get_{}_stats'.format(kind))
+        semaphore = asyncio.Semaphore(workers)
+
+        async def get(name):
+            async with semaphore:
+                try:
+                    r = await get_stats(name)
+                except REQUEST_ERRORS as e:
+                    r = {'status_code': None, 'content': str(e)}
+            return self.stats_result(name, r)
+
+        for done in asyncio.as_completed([get(name) for name in names]):
+            yield await done
+
+    async def iter_entries(self, url, path, chunk_size=65536):
+        """ Get the entries of a list, one at a time, see
+            Client.iter_entries
+
+        The body is parsed in the loop's executor as it arrives.
+
+        """
+
+        resp = await self.ctrl.http_stream_request(url)
+        if resp.status_code == 404:
+            return
+        if resp.status_code != 200:
+            raise self.read_error(url, resp.status_code, resp.content)
+
+        loop = asyncio.get_event_loop()
+
+        def chunks():
+            while True:
+                chunk = asyncio.run_coroutine_threadsafe(
+                    resp.raw.content.read(chunk_size), loop).result()
+                if not chunk:
+                    return
+                yield chunk
+
+        entries = iter_list(chunks(), path)
+        end = object()
+        try:
+            while True:
+                entry = await loop.run_in_executor(None, next, entries, end)
+                if entry is end:
+                    return
+                yield entry
+        finally:
+            resp.raw.release()
@@ -1,10 +1,51 @@
+import functools
 import json
+import requests
 
-from lfmcli.controller import Controller
+try:
+    from urllib import quote
+except ImportError:
+    from urllib.parse import quote
+
+from lfmcli.controller import Controller, json_default
+from lfmcli.fields import query, selecting
+from lfmcli.jsonstream import iter_list
+from lfmcli.parallel import run_parallel
+from lfmcli.result import Result, child, first, whole
+from lfmcli.retry import CircuitOpenException
+from lfmcli.stats import watch
 
 OFNODE_CONN_STATS = \
     'opendaylight-port-statistics:flow-capable-node-connector-statistics'
 
+YANG_PATCH_HEADERS = {
+    'content-type': 'application/yang.patch+json',
+    'accept': 'application/yang.patch-status+json, application/json'}
+
+
+def inventory_nodes(body):
+    """ Parser of the node list of an inventory read """
+    nodes = body.get('nodes')
+    return nodes['node'] if nodes else []
+
+
+def topology_node_ids(body):
+    """ Parser of the node ids of a topology read """
+    topology = body.get('topology')
+    nodes = topology[0].get('node', []) if topology else []
+    return [node['node-id'] for node in nodes]
+
+
+def topology_connector_ids(body):
+    """ Parser of the termination point (connector) ids of the nodes of a
+    topology read, {node id: list of ids}, nodes listing none are left out.
+    """
+    topology = body.get('topology')
+    nodes = topology[0].get('node', []) if topology else []
+    return dict((node['node-id'], [tp['tp-id'] for tp in
+                                   node['termination-point']])
+                for node in nodes if 'termination-point' in node)
+
 
 class FlowManagerClientException(Exception):
     """Flow Manager Client Exception class"""
@@ -16,12 +57,72 @@ class FlowManagerClientException(Exception):
         return repr(self.msg)
 
 
-class Client():
-    """Class that represents a Flowmanager service """
+# -----------------------------------------------------------------------------
+# Class 'Operation'
+# -----------------------------------------------------------------------------
+class Operation(object):
+    """ One RESTCONF request of a client method and how its result is read.
 
-    def __init__(self, **kwargs):
-        """Initializes this object properties."""
-        self.ctrl = Controller(**kwargs)
+    :param method: HTTP method
+    :param url: complete url of the resource
+    :param data: request body
+    :param headers: request headers, default the controller's
+    :param idempotent: the request (RPC) has no side effect
+    :param parsers: result keys of a 200 response (see lfmcli.result)
+    :param keep_content: keep the content of lean results
+    :param fields: RESTCONF fields selection the parsers read
+    :param depth: RESTCONF depth limit the parsers read
+    :param reread: Operation whose result is returned instead when the
+                   response status is neither 200 nor 404
+
+    """
+
+    def __init__(self, method, url, data=None, headers=None,
+                 idempotent=False, parsers=None, keep_content=False,
+                 fields=None, depth=None, reread=None):
+        self.method = method
+        self.url = url
+        self.data = data
+        self.headers = headers
+        self.idempotent = idempotent
+        self.parsers = parsers
+        self.keep_content = keep_content
+        self.fields = fields
+        self.depth = depth
+        self.reread = reread
+
+
+def operation(build):
+    """ Decorator of the BaseClient methods returning an Operation.
+
+    The decorated method performs the operation with the client's perform
+    method (blocking for Client, a coroutine for AsyncClient). The builder
+    stays available as the 'build' attribute of the method.
+
+    """
+
+    @functools.wraps(build)
+    def method(self, *args, **kwargs):
+        return self.perform(build(self, *args, **kwargs))
+
+    method.build = build
+    return method
+
+
+# -----------------------------------------------------------------------------
+# Class 'BaseClient'
+# -----------------------------------------------------------------------------
+class BaseClient(object):
+    """ Requests and results of the Flow Manager services.
+
+    The URLs, payloads and result parsers shared by Client and
+    lfmcli.aio.AsyncClient. Subclasses set 'ctrl' and send the operations
+    (send and perform), the YANG-Patch chunks (patch_entries) and the
+    streamed reads (iter_entries).
+
+    """
+
+    ctrl = None
 
     def __str__(self):
         """ Returns string representation of this object. """
@@ -33,7 +134,7 @@ class Client():
 
     def to_json(self):
         """ Returns JSON representation of this object. """
-        return json.dumps(self, default=lambda o: o.__dict__, sort_keys=True,
+        return json.dumps(self, default=json_default, sort_keys=True,
                           indent=4)
 
     def brief_json(self):
@@ -42,46 +143,152 @@ class Client():
         return json.dumps(d, default=lambda o: o.__dict__, sort_keys=True,
                           indent=4)
 
-    def get_paths(self, config=True):
-        """ get paths from Flow Manager """
-        resp = self.ctrl.http_get_request(
-                   self.ctrl.get_req_url(config)+"/lumina-flowmanager-path:paths")
+    def get_pool_stats(self):
+        """ Returns the connection reuse counters of the shared pool. """
+        return self.ctrl.get_pool_stats()
+
+    def result(self, resp, parsers=None, keep_content=False, fields=None,
+               depth=None):
+        """ Returns the Result dict of a response (see lfmcli.result),
+            lean when the 'lean' controller property is set. The parsers
+            read the body restricted to fields and depth (see
+            lfmcli.fields).
+        """
+        if parsers and (fields or depth):
+            parsers = dict((key, selecting(parse, fields, depth))
+                           for key, parse in parsers.items())
+        return Result(resp, parsers, lean=self.ctrl.config['lean'],
+                      keep_content=keep_content or
+                      self.ctrl.config['lean_content'])
+
+    def operation_result(self, op, resp):
+        """ Returns the Result dict of the response of an operation """
+        return self.result(resp, op.parsers, op.keep_content, op.fields,
+                           op.depth)
+
+    def query(self, fields=None, depth=None):
+        """ Returns the query string of the fields and depth of a read """
+        try:
+            return query(fields, depth)
+        except ValueError as e:
+            raise FlowManagerClientException(str(e))
+
+    def patch_operations(self, url, list_name, entries, key='name',
+                         operation='merge', chunk_size=None):
+        """ Returns the (keys, Operation) YANG-Patch chunks of
+            patch_entries.
+        """
 
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
+        chunk_size = chunk_size or self.ctrl.config['bulk_chunk_size']
+        remove = operation in ('delete', 'remove')
+
+        chunks = []
+        for index, start in enumerate(range(0, len(entries), chunk_size)):
+            chunk = entries[start:start + chunk_size]
+            keys = [str(entry if remove else entry[key]) for entry in chunk]
+            edits = []
+            for name, entry in zip(keys, chunk):
+                edit = {'edit-id': name, 'operation': operation,
+                        'target': '/{}/{}'.format(list_name,
+                                                  quote(name, safe=''))}
+                if not remove:
+                    edit['value'] = {list_name: [entry]}
+                edits.append(edit)
+
+            payload = {'ietf-yang-patch:yang-patch': {
+                'patch-id': '{}-{}'.format(list_name, index), 'edit': edits}}
+            chunks.append((keys, Operation(
+                'PATCH', url, json.dumps(payload), headers=YANG_PATCH_HEADERS,
+                idempotent=operation in ('merge', 'replace', 'remove'))))
+
+        return chunks
+
+    @staticmethod
+    def patch_results(resp, keys):
+        """ Returns per edit results (see patch_entries) of a YANG-Patch """
+
+        ok = resp.status_code in (200, 201, 204)
+        errors = {}
+        try:
+            status = json.loads(resp.content).get(
+                'ietf-yang-patch:yang-patch-status') or {}
+        except ValueError:
+            status = {}
+
+        for edit in (status.get('edit-status') or {}).get('edit', []):
+            error = (edit.get('errors') or {}).get('error')
+            if error:
+                errors[edit.get('edit-id')] = error[0].get('error-message')
+
+        error = None
+        if not ok:
+            global_error = (status.get('errors') or {}).get('error')
+            error = global_error[0].get('error-message') if global_error \
+                else 'HTTP {}'.format(resp.status_code)
+            # the edits ODL rejected, the others were rolled back
+            if errors:
+                error = 'rolled back'
+
+        return [{'name': name,
+                 'ok': ok,
+                 'status_code': resp.status_code,
+                 'error': errors.get(name, error)} for name in keys]
+
+    @staticmethod
+    def patch_failed(keys, error):
+        """ Returns per edit results of a YANG-Patch that got no response """
+        return [{'name': name, 'ok': False, 'status_code': None,
+                 'error': error} for name in keys]
+
+    @staticmethod
+    def patch_report(chunk_results):
+        """ Returns the resp dict of patch_entries from the per edit results
+            of its chunks, in chunks order.
+        """
 
-            if resp.status_code == 200:
-                r['paths'] = json.loads(resp.content)
+        r = {'status_code': 200, 'requests': len(chunk_results), 'errors': 0,
+             'results': []}
+        for results in chunk_results:
+            for result in results:
+                r['results'].append(result)
+                if not result['ok']:
+                    r['errors'] += 1
+                    if r['status_code'] == 200:
+                        r['status_code'] = result['status_code']
 
         return r
 
-    def get_path(self, name, config=True):
+    @operation
+    def get_paths(self, config=True, fields=None, depth=None):
+        """ get paths from Flow Manager
+
+        :param fields: RESTCONF fields selection (see lfmcli.fields)
+        :param depth: RESTCONF depth limit
+
+        """
+        return Operation(
+            'GET', self.ctrl.get_req_url(config) +
+            "/lumina-flowmanager-path:paths" + self.query(fields, depth),
+            parsers={'paths': whole}, fields=fields, depth=depth)
+
+    @operation
+    def get_path(self, name, config=True, fields=None, depth=None):
         """ Get a Flow Manager path given the path name
 
         :param name: path name to get
+        :param fields: RESTCONF fields selection (see lfmcli.fields)
+        :param depth: RESTCONF depth limit
         :return: response keywords (see add_path for description)
 
         """
 
-        resp = self.ctrl.http_get_request(
-                   self.ctrl.get_req_url(config) +
-                   "/lumina-flowmanager-path:paths/path/{}".format(name))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-            if resp.status_code == 200:
-                path = json.loads(resp.content).get('path')
-                if path:
-                    r['path'] = path[0]
-                else:
-                    r['path'] = None
-
-        return r
+        return Operation(
+            'GET', self.ctrl.get_req_url(config) +
+            "/lumina-flowmanager-path:paths/path/{}".format(name) +
+            self.query(fields, depth),
+            parsers={'path': first('path')}, fields=fields, depth=depth)
 
+    @operation
     def add_path(self, **kwargs):
         """ Add or create a path via Flow Manager.
 
@@ -110,24 +317,30 @@ class Client():
         if not path:
             raise FlowManagerClientException('didn\'t get any path properties')
 
-        # Make call to Flow Manager
         payload = {"path": [path]}
-        resp = self.ctrl.http_put_request(
-                 self.ctrl.get_config_url() +
-                 "/lumina-flowmanager-path:paths/path/{}".format(path['name']),
-                 json.dumps(payload))
+        return Operation(
+            'PUT', self.ctrl.get_config_url() +
+            "/lumina-flowmanager-path:paths/path/{}".format(path['name']),
+            json.dumps(payload))
 
-        # Check response
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
+    def add_paths(self, paths, chunk_size=None, workers=1):
+        """ Add or create many paths via Flow Manager.
 
-            # if (resp.status_code == 200) or (resp.status_code == 201):
-            #     r = self.get_path(path['name'])
+        Paths are merged into the paths container in chunks of
+        chunk_size per request (see patch_entries).
 
-        return r
+        :param paths: list of path keywords (see add_path)
+        :param chunk_size: paths per request
+        :param workers: requests sent concurrently
+        :return: per path results (see patch_entries for description)
+
+        """
+
+        return self.patch_entries(
+            self.ctrl.get_config_url() + "/lumina-flowmanager-path:paths",
+            'path', paths, chunk_size=chunk_size, workers=workers)
 
+    @operation
     def delete_path(self, name):
         """ Delete a path via Flow Manager.
 
@@ -136,79 +349,69 @@ class Client():
 
         """
 
-        resp = self.ctrl.http_delete_request(
-                   self.ctrl.get_config_url() +
-                   "/lumina-flowmanager-path:paths/path/{}".format(name))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-
-            if resp.status_code == 200 or resp.status_code == 404:
-                return r
-        else:
-            r = self.get_path(name)
-
-        return r
+        return Operation(
+            'DELETE', self.ctrl.get_config_url() +
+            "/lumina-flowmanager-path:paths/path/{}".format(name))
 
-    def delete_paths(self):
-        resp = self.ctrl.http_delete_request(
-                   self.ctrl.get_config_url()+"/lumina-flowmanager-path:paths")
+    def remove_paths(self, names, chunk_size=None, workers=1):
+        """ Delete many paths via Flow Manager.
 
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
+        Paths are removed from the paths container in chunks of
+        chunk_size per request (see patch_entries), names that don't exist
+        are ignored.
 
-            if resp.status_code == 200 or resp.status_code == 404:
-                return r
-            else:
-                r = self.get_paths()
+        :param names: list of path names
+        :param chunk_size: paths per request
+        :param workers: requests sent concurrently
+        :return: per path results (see patch_entries for description)
 
-        return r
+        """
 
-    def get_treepaths(self, config=True):
-        """ get treepaths from Flow Manager """
-        resp = self.ctrl.http_get_request(
-                   self.ctrl.get_req_url(config) +
-                   "/lumina-flowmanager-tree-path:treepaths")
+        return self.patch_entries(
+            self.ctrl.get_config_url() + "/lumina-flowmanager-path:paths",
+            'path', names, operation='remove', chunk_size=chunk_size,
+            workers=workers)
 
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
+    @operation
+    def delete_paths(self):
+        return Operation(
+            'DELETE',
+            self.ctrl.get_config_url() + "/lumina-flowmanager-path:paths",
+            reread=self.get_paths.build(self))
 
-            if resp.status_code == 200:
-                r['treepaths'] = json.loads(resp.content)
+    @operation
+    def get_treepaths(self, config=True, fields=None, depth=None):
+        """ get treepaths from Flow Manager
 
-        return r
+        :param fields: RESTCONF fields selection (see lfmcli.fields)
+        :param depth: RESTCONF depth limit
 
-    def get_treepath(self, name, config=True):
+        """
+        return Operation(
+            'GET', self.ctrl.get_req_url(config) +
+            "/lumina-flowmanager-tree-path:treepaths" +
+            self.query(fields, depth),
+            parsers={'treepaths': whole}, fields=fields, depth=depth)
+
+    @operation
+    def get_treepath(self, name, config=True, fields=None, depth=None):
         """ Get a Flow Manager treepath given the path name
 
         :param name: treepath name to get
+        :param fields: RESTCONF fields selection (see lfmcli.fields)
+        :param depth: RESTCONF depth limit
         :return: response keywords (see add_treepath for description)
 
         """
 
-        resp = self.ctrl.http_get_request(
-                   self.ctrl.get_req_url(config) +
-                   "/lumina-flowmanager-tree-path:treepaths/treepath/{}".format(name))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-            if resp.status_code == 200:
-                treepath = json.loads(resp.content).get('treepath')
-                if treepath:
-                    r['treepath'] = treepath[0]
-                else:
-                    r['treepath'] = None
-
-        return r
+        return Operation(
+            'GET', self.ctrl.get_req_url(config) +
+            "/lumina-flowmanager-tree-path:treepaths/treepath/" +
+            "{}".format(name) + self.query(fields, depth),
+            parsers={'treepath': first('treepath')}, fields=fields,
+            depth=depth)
 
+    @operation
     def add_treepath(self, **kwargs):
         """ Add or create a treepath via Flow Manager.
 
@@ -238,24 +441,31 @@ class Client():
             raise FlowManagerClientException(
                     'didn\'t get any treepath properties')
 
-        # Make call to Flow Manager
         payload = {"treepath": [treepath]}
-        resp = self.ctrl.http_put_request(
-                 self.ctrl.get_config_url() +
-                 "/lumina-flowmanager-tree-path:treepaths/treepath/{}".format(
-                    treepath['name']), json.dumps(payload))
+        return Operation(
+            'PUT', self.ctrl.get_config_url() +
+            "/lumina-flowmanager-tree-path:treepaths/treepath/{}".format(
+                treepath['name']), json.dumps(payload))
 
-        # Check response
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
+    def add_treepaths(self, treepaths, chunk_size=None, workers=1):
+        """ Add or create many treepaths via Flow Manager.
 
-            # if (resp.status_code == 200) or (resp.status_code == 201):
-            #     r = self.get_treepath(treepath['name'])
+        Treepaths are merged into the treepaths container in chunks of
+        chunk_size per request (see patch_entries).
 
-        return r
+        :param treepaths: list of treepath keywords (see add_treepath)
+        :param chunk_size: treepaths per request
+        :param workers: requests sent concurrently
+        :return: per treepath results (see patch_entries for description)
 
+        """
+
+        return self.patch_entries(
+            self.ctrl.get_config_url() +
+            "/lumina-flowmanager-tree-path:treepaths",
+            'treepath', treepaths, chunk_size=chunk_size, workers=workers)
+
+    @operation
     def delete_treepath(self, name):
         """ Delete a treepath via Flow Manager.
 
@@ -264,39 +474,39 @@ class Client():
 
         """
 
-        resp = self.ctrl.http_delete_request(
-                   self.ctrl.get_config_url() +
-                   "/lumina-flowmanager-tree-path:treepaths/treepath/{}".format(name))
+        return Operation(
+            'DELETE', self.ctrl.get_config_url() +
+            "/lumina-flowmanager-tree-path:treepaths/treepath/{}".format(
+                name))
 
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
+    def remove_treepaths(self, names, chunk_size=None, workers=1):
+        """ Delete many treepaths via Flow Manager.
 
-            if resp.status_code == 200 or resp.status_code == 404:
-                return r
-        else:
-            r = self.get_treepath(name)
+        Treepaths are removed from the treepaths container in chunks of
+        chunk_size per request (see patch_entries), names that don't exist
+        are ignored.
 
-        return r
+        :param names: list of treepath names
+        :param chunk_size: treepaths per request
+        :param workers: requests sent concurrently
+        :return: per treepath results (see patch_entries for description)
 
-    def delete_treepaths(self):
-        resp = self.ctrl.http_delete_request(
-                   self.ctrl.get_config_url() +
-                   "/lumina-flowmanager-tree-path:treepaths")
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
+        """
 
-            if resp.status_code == 200 or resp.status_code == 404:
-                return r
-            else:
-                r = self.get_treepaths()
+        return self.patch_entries(
+            self.ctrl.get_config_url() +
+            "/lumina-flowmanager-tree-path:treepaths",
+            'treepath', names, operation='remove', chunk_size=chunk_size,
+            workers=workers)
 
-        return r
+    @operation
+    def delete_treepaths(self):
+        return Operation(
+            'DELETE', self.ctrl.get_config_url() +
+            "/lumina-flowmanager-tree-path:treepaths",
+            reread=self.get_treepaths.build(self))
 
+    @operation
     def get_treepath_leaf(self, name, node, config=True):
         """ Get a Flow Manager treepath leaf
 
@@ -306,24 +516,13 @@ class Client():
 
         """
 
-        resp = self.ctrl.http_get_request(
-                   self.ctrl.get_req_url(config) +
-                   "/lumina-flowmanager-tree-path:treepaths/treepath" +
-                   "/{}/leaves/leaf/{}".format(name, node))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-            if resp.status_code == 200:
-                leaf = json.loads(resp.content).get('leaf')
-                if leaf:
-                    r['leaf'] = leaf[0]
-                else:
-                    r['leaf'] = None
-
-        return r
+        return Operation(
+            'GET', self.ctrl.get_req_url(config) +
+            "/lumina-flowmanager-tree-path:treepaths/treepath" +
+            "/{}/leaves/leaf/{}".format(name, node),
+            parsers={'leaf': first('leaf')})
 
+    @operation
     def add_treepath_leaf(self, name, node, leaf):
         """ Add or create a treepath leaf via Flow Manager.
 
@@ -351,24 +550,13 @@ class Client():
 
         """
 
-        # Make call to Flow Manager
         payload = {"leaf": [leaf]}
-        resp = self.ctrl.http_put_request(
-                 self.ctrl.get_config_url() +
-                 "/lumina-flowmanager-tree-path:treepaths/treepath" +
-                 "/{}/leaves/leaf/{}".format(name, node), json.dumps(payload))
-
-        # Check response
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-
-            # if (resp.status_code == 200) or (resp.status_code == 201):
-            #     r = self.get_treepath_leaf(name, node)
-
-        return r
+        return Operation(
+            'PUT', self.ctrl.get_config_url() +
+            "/lumina-flowmanager-tree-path:treepaths/treepath" +
+            "/{}/leaves/leaf/{}".format(name, node), json.dumps(payload))
 
+    @operation
     def delete_treepath_leaf(self, name, node):
         """ Delete a treepath leaf node via Flow Manager.
 
@@ -378,63 +566,42 @@ class Client():
 
         """
 
-        resp = self.ctrl.http_delete_request(
-                   self.ctrl.get_config_url() +
-                   "/lumina-flowmanager-tree-path:treepaths/treepath" +
-                   "/{}/leaves/lead/{}".format(name, node))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-
-            if resp.status_code == 200 or resp.status_code == 404:
-                return r
-        else:
-            r = self.get_treepath_leaf(name, node)
-
-        return r
-
-    def get_elines(self, config=True):
-        """ get elines from Flow Manager """
-        resp = self.ctrl.http_get_request(
-                   self.ctrl.get_req_url(config)+"/lumina-flowmanager-eline:elines")
+        return Operation(
+            'DELETE', self.ctrl.get_config_url() +
+            "/lumina-flowmanager-tree-path:treepaths/treepath" +
+            "/{}/leaves/leaf/{}".format(name, node))
 
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
+    @operation
+    def get_elines(self, config=True, fields=None, depth=None):
+        """ get elines from Flow Manager
 
-            if resp.status_code == 200:
-                r['elines'] = json.loads(resp.content)
+        :param fields: RESTCONF fields selection (see lfmcli.fields)
+        :param depth: RESTCONF depth limit
 
-        return r
+        """
+        return Operation(
+            'GET', self.ctrl.get_req_url(config) +
+            "/lumina-flowmanager-eline:elines" + self.query(fields, depth),
+            parsers={'elines': whole}, fields=fields, depth=depth)
 
-    def get_eline(self, name, config=True):
+    @operation
+    def get_eline(self, name, config=True, fields=None, depth=None):
         """ Get a Flow Manager eline given the eline name
 
         :param name: eline name to get
+        :param fields: RESTCONF fields selection (see lfmcli.fields)
+        :param depth: RESTCONF depth limit
         :return: response keywords (see add_eline for description)
 
         """
 
-        resp = self.ctrl.http_get_request(
-                   self.ctrl.get_req_url(config) +
-                   "/lumina-flowmanager-eline:elines/eline/{}".format(name))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-            if resp.status_code == 200:
-                eline = json.loads(resp.content).get('eline')
-                if eline:
-                    r['eline'] = eline[0]
-                else:
-                    r['eline'] = None
-
-        return r
+        return Operation(
+            'GET', self.ctrl.get_req_url(config) +
+            "/lumina-flowmanager-eline:elines/eline/{}".format(name) +
+            self.query(fields, depth),
+            parsers={'eline': first('eline')}, fields=fields, depth=depth)
 
+    @operation
     def get_eline_stats(self, name):
         """ Get a Flow Manager eline stats given the eline name
 
@@ -449,24 +616,12 @@ class Client():
             }
         }
 
-        resp = self.ctrl.http_post_request(
-                   self.ctrl.get_operations_url() +
-                   "/lumina-flowmanager-eline:get-stats",
-                   json.dumps(data))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-            if resp.status_code == 200:
-                output = json.loads(resp.content).get('output')
-                if output:
-                    r['output'] = output
-                else:
-                    r['output'] = {}
-
-        return r
+        return Operation(
+            'POST', self.ctrl.get_operations_url() +
+            "/lumina-flowmanager-eline:get-stats", json.dumps(data),
+            idempotent=True, parsers={'output': child('output', {})})
 
+    @operation
     def add_eline(self, **kwargs):
         """ Add or create a eline via Flow Manager.
 
@@ -496,24 +651,30 @@ class Client():
             raise FlowManagerClientException(
                     'didn\'t get any eline properties')
 
-        # Make call to Flow Manager
         payload = {"eline": [eline]}
-        resp = self.ctrl.http_put_request(
-                 self.ctrl.get_config_url() +
-                 "/lumina-flowmanager-eline:elines/eline/{}".format(eline['name']),
-                 json.dumps(payload))
+        return Operation(
+            'PUT', self.ctrl.get_config_url() +
+            "/lumina-flowmanager-eline:elines/eline/{}".format(eline['name']),
+            json.dumps(payload))
 
-        # Check response
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
+    def add_elines(self, elines, chunk_size=None, workers=1):
+        """ Add or create many elines via Flow Manager.
 
-            # if (resp.status_code == 200) or (resp.status_code == 201):
-            #     r = self.get_eline(eline['name'])
+        Elines are merged into the elines container in chunks of
+        chunk_size per request (see patch_entries).
 
-        return r
+        :param elines: list of eline keywords (see add_eline)
+        :param chunk_size: elines per request
+        :param workers: requests sent concurrently
+        :return: per eline results (see patch_entries for description)
+
+        """
 
+        return self.patch_entries(
+            self.ctrl.get_config_url() + "/lumina-flowmanager-eline:elines",
+            'eline', elines, chunk_size=chunk_size, workers=workers)
+
+    @operation
     def delete_eline(self, name):
         """ Delete a eline via Flow Manager.
 
@@ -522,62 +683,50 @@ class Client():
 
         """
 
-        resp = self.ctrl.http_delete_request(
-                   self.ctrl.get_config_url() +
-                   "/lumina-flowmanager-eline:elines/eline/{}".format(name))
+        return Operation(
+            'DELETE', self.ctrl.get_config_url() +
+            "/lumina-flowmanager-eline:elines/eline/{}".format(name))
 
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
+    def remove_elines(self, names, chunk_size=None, workers=1):
+        """ Delete many elines via Flow Manager.
 
-            if resp.status_code == 200 or resp.status_code == 404:
-                return r
-        else:
-            r = self.get_eline(name)
+        Elines are removed from the elines container in chunks of
+        chunk_size per request (see patch_entries), names that don't exist
+        are ignored.
 
-        return r
+        :param names: list of eline names
+        :param chunk_size: elines per request
+        :param workers: requests sent concurrently
+        :return: per eline results (see patch_entries for description)
 
-    def delete_elines(self):
-        resp = self.ctrl.http_delete_request(
-                   self.ctrl.get_config_url()+"/lumina-flowmanager-eline:elines")
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
+        """
 
-            if resp.status_code == 200 or resp.status_code == 404:
-                return r
-            else:
-                r = self.get_elines()
+        return self.patch_entries(
+            self.ctrl.get_config_url() + "/lumina-flowmanager-eline:elines",
+            'eline', names, operation='remove', chunk_size=chunk_size,
+            workers=workers)
 
-        return r
+    @operation
+    def delete_elines(self):
+        return Operation(
+            'DELETE',
+            self.ctrl.get_config_url() + "/lumina-flowmanager-eline:elines",
+            reread=self.get_elines.build(self))
 
     def get_tap_url(self, eline, endpoint, config=True):
         '''get the base tap url'''
-        return(self.ctrl.get_req_url(config) +
-               "/lumina-flowmanager-eline:elines/eline/{}/{}/taps".format(
+        return (self.ctrl.get_req_url(config) +
+                "/lumina-flowmanager-eline:elines/eline/{}/{}/taps".format(
                     eline, endpoint))
 
+    @operation
     def get_taps(self, eline, endpoint=None, config=True):
         """ get taps from Flow Manager """
 
-        # Grab the taps for an endpoint
-        resp = self.ctrl.http_get_request(
-                  self.get_tap_url(eline, endpoint, config))
-
-        # Setup the return dict
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-
-            if resp.status_code == 200:
-                r[endpoint] = json.loads(resp.content)
-
-        return r
+        return Operation('GET', self.get_tap_url(eline, endpoint, config),
+                         parsers={endpoint: whole})
 
+    @operation
     def get_tap(self, eline, endpoint, path_name, config=True):
         """ Get a Flow Manager tap given the eline name and path-name
 
@@ -588,23 +737,12 @@ class Client():
 
         """
 
-        resp = self.ctrl.http_get_request(
-                   self.get_tap_url(eline, endpoint, config) +
-                   "/tap/{}".format(path_name))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-            if resp.status_code == 200:
-                tap = json.loads(resp.content).get('lumina-flowmanager-eline-tap:tap')
-                if tap:
-                    r['tap'] = tap[0]
-                else:
-                    r['tap'] = None
-
-        return r
+        return Operation(
+            'GET', self.get_tap_url(eline, endpoint, config) +
+            "/tap/{}".format(path_name),
+            parsers={'tap': first('lumina-flowmanager-eline-tap:tap')})
 
+    @operation
     def add_tap(self, eline, endpoint, **kwargs):
         """ Add or create a tap via Flow Manager.
 
@@ -639,24 +777,12 @@ class Client():
         if not tap:
             raise FlowManagerClientException('didn\'t get any tap properties')
 
-        # Make call to Flow Manager
         payload = {"tap": [tap]}
-        resp = self.ctrl.http_put_request(
-                 self.get_tap_url(eline, endpoint) +
-                 "/tap/{}".format(tap['path-name']),
-                 json.dumps(payload))
-
-        # Check response
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-
-            # if (resp.status_code == 200) or (resp.status_code == 201):
-            #     r = self.get_tap(eline, endpoint, tap['path-name'])
-
-        return r
+        return Operation(
+            'PUT', self.get_tap_url(eline, endpoint) +
+            "/tap/{}".format(tap['path-name']), json.dumps(payload))
 
+    @operation
     def delete_tap(self, eline, endpoint, path_name):
         """ Delete a tap via Flow Manager.
 
@@ -667,22 +793,11 @@ class Client():
 
         """
 
-        resp = self.ctrl.http_delete_request(
-                   self.get_tap_url(eline, endpoint) +
-                   "/tap/{}".format(path_name))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-
-            if resp.status_code == 200 or resp.status_code == 404:
-                return r
-        else:
-            r = self.get_tap(eline, endpoint, path_name)
-
-        return r
+        return Operation(
+            'DELETE', self.get_tap_url(eline, endpoint) +
+            "/tap/{}".format(path_name))
 
+    @operation
     def delete_taps(self, eline, endpoint):
         """ Delete a taps via Flow Manager.
 
@@ -691,61 +806,40 @@ class Client():
         :return: response keywords (see add_tap for description)
         """
 
-        resp = self.ctrl.http_delete_request(
-                   self.get_tap_url(eline, endpoint))
+        return Operation('DELETE', self.get_tap_url(eline, endpoint),
+                         reread=self.get_taps.build(self, eline, endpoint))
 
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-
-            if resp.status_code == 200 or resp.status_code == 404:
-                return r
-            else:
-                r = self.get_taps(eline, endpoint)
-
-        return r
+    @operation
+    def get_etrees(self, config=True, fields=None, depth=None):
+        """ get etrees from Flow Manager
 
-    def get_etrees(self, config=True):
-        """ get etrees from Flow Manager """
-        resp = self.ctrl.http_get_request(
-                   self.ctrl.get_req_url(config)+"/lumina-flowmanager-etree:etrees")
+        :param fields: RESTCONF fields selection (see lfmcli.fields)
+        :param depth: RESTCONF depth limit
 
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-
-            if resp.status_code == 200:
-                r['etrees'] = json.loads(resp.content)
-
-        return r
+        """
+        return Operation(
+            'GET', self.ctrl.get_req_url(config) +
+            "/lumina-flowmanager-etree:etrees" + self.query(fields, depth),
+            parsers={'etrees': whole}, fields=fields, depth=depth)
 
-    def get_etree(self, name, config=True):
+    @operation
+    def get_etree(self, name, config=True, fields=None, depth=None):
         """ Get a Flow Manager etree given the etree name
 
         :param name: etree name to get
+        :param fields: RESTCONF fields selection (see lfmcli.fields)
+        :param depth: RESTCONF depth limit
         :return: response keywords (see add_etree for description)
 
         """
 
-        resp = self.ctrl.http_get_request(
-                   self.ctrl.get_req_url(config) +
-                   "/lumina-flowmanager-etree:etrees/etree/{}".format(name))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-            if resp.status_code == 200:
-                etree = json.loads(resp.content).get('etree')
-                if etree:
-                    r['etree'] = etree[0]
-                else:
-                    r['etree'] = None
-
-        return r
+        return Operation(
+            'GET', self.ctrl.get_req_url(config) +
+            "/lumina-flowmanager-etree:etrees/etree/{}".format(name) +
+            self.query(fields, depth),
+            parsers={'etree': first('etree')}, fields=fields, depth=depth)
 
+    @operation
     def get_etree_stats(self, name):
         """ Get a Flow Manager etree stats given the etree name
 
@@ -760,24 +854,54 @@ class Client():
             }
         }
 
-        resp = self.ctrl.http_post_request(
-                   self.ctrl.get_operations_url() +
-                   "/lumina-flowmanager-etree:get-stats",
-                   json.dumps(data))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-            if resp.status_code == 200:
-                output = json.loads(resp.content).get('output')
-                if output:
-                    r['output'] = output
-                else:
-                    r['output'] = {}
+        return Operation(
+            'POST', self.ctrl.get_operations_url() +
+            "/lumina-flowmanager-etree:get-stats", json.dumps(data),
+            idempotent=True, parsers={'output': child('output', {})})
 
-        return r
+    @staticmethod
+    def stats_names(kind, r):
+        """ Returns the service names of a get_elines or get_etrees result
+            (see iter_stats).
+        """
+
+        if r.get('status_code') not in (200, 404):
+            raise FlowManagerClientException(
+                'cannot list {}s: {}'.format(kind, r.get('status_code')))
+        container = r.get(kind + 's', {}).get(kind + 's', {})
+        return [entry['name'] for entry in container.get(kind, [])]
+
+    @staticmethod
+    def stats_result(name, r):
+        """ Returns the stats dict (see iter_stats) of a get-stats result """
+
+        error = None
+        if r.get('status_code') != 200:
+            error = r.get('content') or 'no response'
+            if isinstance(error, bytes):
+                error = error.decode('utf-8', 'replace')
+        return {'name': name, 'status_code': r.get('status_code'),
+                'output': r.get('output'), 'error': error}
+
+    def iter_eline_stats(self, names=None, workers=8):
+        """ Get the stats of many (default all) elines concurrently.
+
+        :return: generator of stats dicts (see iter_stats for description)
+
+        """
+
+        return self.iter_stats('eline', names, workers)
+
+    def iter_etree_stats(self, names=None, workers=8):
+        """ Get the stats of many (default all) etrees concurrently.
+
+        :return: generator of stats dicts (see iter_stats for description)
+
+        """
+
+        return self.iter_stats('etree', names, workers)
 
+    @operation
     def add_etree(self, **kwargs):
         """ Add or create a etree via Flow Manager.
 
@@ -807,24 +931,30 @@ class Client():
             raise FlowManagerClientException(
                     'didn\'t get any etree properties')
 
-        # Make call to Flow Manager
         payload = {"etree": [etree]}
-        resp = self.ctrl.http_put_request(
-                 self.ctrl.get_config_url() +
-                 "/lumina-flowmanager-etree:etrees/etree/{}".format(etree['name']),
-                 json.dumps(payload))
+        return Operation(
+            'PUT', self.ctrl.get_config_url() +
+            "/lumina-flowmanager-etree:etrees/etree/{}".format(etree['name']),
+            json.dumps(payload))
 
-        # Check response
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
+    def add_etrees(self, etrees, chunk_size=None, workers=1):
+        """ Add or create many etrees via Flow Manager.
 
-            # if (resp.status_code == 200) or (resp.status_code == 201):
-            #     r = self.get_etree(etree['name'])
+        Etrees are merged into the etrees container in chunks of
+        chunk_size per request (see patch_entries).
 
-        return r
+        :param etrees: list of etree keywords (see add_etree)
+        :param chunk_size: etrees per request
+        :param workers: requests sent concurrently
+        :return: per etree results (see patch_entries for description)
 
+        """
+
+        return self.patch_entries(
+            self.ctrl.get_config_url() + "/lumina-flowmanager-etree:etrees",
+            'etree', etrees, chunk_size=chunk_size, workers=workers)
+
+    @operation
     def delete_etree(self, name):
         """ Delete a etree via Flow Manager.
 
@@ -833,38 +963,37 @@ class Client():
 
         """
 
-        resp = self.ctrl.http_delete_request(
-                   self.ctrl.get_config_url() +
-                   "/lumina-flowmanager-etree:etrees/etree/{}".format(name))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
+        return Operation(
+            'DELETE', self.ctrl.get_config_url() +
+            "/lumina-flowmanager-etree:etrees/etree/{}".format(name))
 
-            if resp.status_code == 200 or resp.status_code == 404:
-                return r
-        else:
-            r = self.get_etree(name)
+    def remove_etrees(self, names, chunk_size=None, workers=1):
+        """ Delete many etrees via Flow Manager.
 
-        return r
+        Etrees are removed from the etrees container in chunks of
+        chunk_size per request (see patch_entries), names that don't exist
+        are ignored.
 
-    def delete_etrees(self):
-        resp = self.ctrl.http_delete_request(
-                   self.ctrl.get_config_url()+"/lumina-flowmanager-etree:etrees")
+        :param names: list of etree names
+        :param chunk_size: etrees per request
+        :param workers: requests sent concurrently
+        :return: per etree results (see patch_entries for description)
 
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
+        """
 
-            if resp.status_code == 200 or resp.status_code == 404:
-                return r
-            else:
-                r = self.get_etrees()
+        return self.patch_entries(
+            self.ctrl.get_config_url() + "/lumina-flowmanager-etree:etrees",
+            'etree', names, operation='remove', chunk_size=chunk_size,
+            workers=workers)
 
-        return r
+    @operation
+    def delete_etrees(self):
+        return Operation(
+            'DELETE',
+            self.ctrl.get_config_url() + "/lumina-flowmanager-etree:etrees",
+            reread=self.get_etrees.build(self))
 
+    @operation
     def get_etree_leaf(self, etree_name, node, config=True):
         """ Get a Flow Manager etree leaf given the etree name
 
@@ -874,24 +1003,13 @@ class Client():
 
         """
 
-        resp = self.ctrl.http_get_request(
-                   self.ctrl.get_req_url(config) +
-                   "/lumina-flowmanager-etree:etrees/etree/{}/leaves/leaf/{}".format(
-                       etree_name, node))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-            if resp.status_code == 200:
-                leaf = json.loads(resp.content).get('leaf')
-                if leaf:
-                    r['leaf'] = leaf[0]
-                else:
-                    r['leaf'] = None
-
-        return r
+        return Operation(
+            'GET', self.ctrl.get_req_url(config) +
+            "/lumina-flowmanager-etree:etrees/etree" +
+            "/{}/leaves/leaf/{}".format(etree_name, node),
+            parsers={'leaf': first('leaf')})
 
+    @operation
     def add_etree_leaf(self, etree_name, leaf):
         """ Add or create an etree leaf node via Flow Manager.
 
@@ -918,24 +1036,14 @@ class Client():
         if not leaf:
             raise FlowManagerClientException('didn\'t get any leaf properties')
 
-        # Make call to Flow Manager
         payload = {"leaf": [leaf]}
-        resp = self.ctrl.http_put_request(
-                 self.ctrl.get_config_url() +
-                 "/lumina-flowmanager-etree:etrees/etree/{}/leaves/leaf/{}".format(
-                    etree_name, leaf['node']), json.dumps(payload))
-
-        # Check response
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-
-            # if (resp.status_code == 200) or (resp.status_code == 201):
-            #     r = self.get_etree_leaf(etree_name, leaf['node'])
-
-        return r
+        return Operation(
+            'PUT', self.ctrl.get_config_url() +
+            "/lumina-flowmanager-etree:etrees/etree" +
+            "/{}/leaves/leaf/{}".format(etree_name, leaf['node']),
+            json.dumps(payload))
 
+    @operation
     def delete_etree_leaf(self, etree_name, node):
         """ Delete an etree leaf via Flow Manager.
 
@@ -945,72 +1053,44 @@ class Client():
 
         """
 
-        resp = self.ctrl.http_delete_request(
-                   self.ctrl.get_config_url() +
-                   "/lumina-flowmanager-etree:etrees/etree/{}/leaves/leaf/{}".format(
-                    etree_name, node))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-
-            if resp.status_code == 200 or resp.status_code == 404:
-                return r
-        else:
-            r = self.get_etree_leaf(etree_name, node)
-
-        return r
+        return Operation(
+            'DELETE', self.ctrl.get_config_url() +
+            "/lumina-flowmanager-etree:etrees/etree" +
+            "/{}/leaves/leaf/{}".format(etree_name, node))
 
-    def get_ofnode(self, node):
+    @operation
+    def get_ofnode(self, node, fields=None, depth=None):
         """ Get a Flow Manager OF Node given the node id
 
         :param node: openflow node id
+        :param fields: RESTCONF fields selection (see lfmcli.fields)
+        :param depth: RESTCONF depth limit
         :return: response keywords (see add_etree for description)
 
         """
 
-        resp = self.ctrl.http_get_request(
-                   self.ctrl.get_req_url(False) +
-                   "/opendaylight-inventory:nodes/node/{}".format(node))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-            if resp.status_code == 200:
-                node = json.loads(resp.content).get('node')
-                if node:
-                    r['node'] = node[0]
-                else:
-                    r['node'] = None
-
-        return r
+        return Operation(
+            'GET', self.ctrl.get_req_url(False) +
+            "/opendaylight-inventory:nodes/node/{}".format(node) +
+            self.query(fields, depth),
+            parsers={'node': first('node')}, fields=fields, depth=depth)
 
-    def get_ofnodes(self):
+    @operation
+    def get_ofnodes(self, fields=None, depth=None):
         """ Get All OF Nodes given the node id
 
+        :param fields: RESTCONF fields selection (see lfmcli.fields)
+        :param depth: RESTCONF depth limit
         @return: response keywords
 
         """
 
-        resp = self.ctrl.http_get_request(
-                   self.ctrl.get_req_url(False) +
-                   "/opendaylight-inventory:nodes")
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-            if resp.status_code == 200:
-                nodes = json.loads(resp.content).get('nodes')
-                if nodes:
-                    r['nodes'] = nodes['node']
-                else:
-                    r['nodes'] = []
-
-        return r
+        return Operation(
+            'GET', self.ctrl.get_req_url(False) +
+            "/opendaylight-inventory:nodes" + self.query(fields, depth),
+            parsers={'nodes': inventory_nodes}, fields=fields, depth=depth)
 
+    @operation
     def get_ofnode_connector(self, node, conn_id):
         """ Get an OF Node connector given the node id and connector id.
 
@@ -1020,24 +1100,13 @@ class Client():
 
         """
 
-        resp = self.ctrl.http_get_request(
-                   self.ctrl.get_req_url(False) +
-                   "/opendaylight-inventory:nodes/node/{}".format(node) +
-                   "/node-connector/{}".format(conn_id))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-            if resp.status_code == 200:
-                connector = json.loads(resp.content).get('node-connector')
-                if connector:
-                    r['node-connector'] = connector[0]
-                else:
-                    r['node-connector'] = None
-
-        return r
+        return Operation(
+            'GET', self.ctrl.get_req_url(False) +
+            "/opendaylight-inventory:nodes/node/{}".format(node) +
+            "/node-connector/{}".format(conn_id),
+            parsers={'node-connector': first('node-connector')})
 
+    @operation
     def get_ofnode_connector_stats(self, node, conn_id):
         """ Get an OF Node connector's stats given the node id and
             connector id.
@@ -1048,44 +1117,353 @@ class Client():
 
         """
 
-        resp = self.ctrl.http_get_request(
-                   self.ctrl.get_req_url(False) +
-                   "/opendaylight-inventory:nodes/node/{}".format(node) +
-                   "/node-connector/{}/flow-capable-node-connector-statistics".
-                   format(conn_id))
-
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
-            if resp.status_code == 200:
-                stats = json.loads(resp.content).get(OFNODE_CONN_STATS)
-                if stats:
-                    r['stats'] = stats
-                else:
-                    r['stats'] = None
+        return Operation(
+            'GET', self.ctrl.get_req_url(False) +
+            "/opendaylight-inventory:nodes/node/{}".format(node) +
+            "/node-connector/{}/flow-capable-node-connector-statistics".
+            format(conn_id),
+            parsers={'stats': child(OFNODE_CONN_STATS, None)})
 
-        return r
+    @operation
+    def get_ofnode_ids(self):
+        """ Get the ids of the OF Nodes from the flow:1 topology, without
+            reading the whole inventory.
+
+        @return: response keywords ('nodes': list of node ids,
+                 'connectors': {node id: list of its connector ids})
+
+        """
 
+        return Operation(
+            'GET', self.ctrl.get_req_url(False) +
+            "/network-topology:network-topology/topology/flow:1",
+            parsers={'nodes': topology_node_ids,
+                     'connectors': topology_connector_ids})
 
+    @staticmethod
+    def connector_stats(node):
+        """ Returns the stats dicts (see iter_connector_stats) of the
+            connectors of an inventory node.
+        """
+
+        return [{'name': connector['id'], 'node': node['id'],
+                 'port-name': connector.get('flow-node-inventory:name'),
+                 'status_code': 200,
+                 'output': connector.get(OFNODE_CONN_STATS) or {},
+                 'error': None}
+                for connector in node.get('node-connector', [])]
+
+    @staticmethod
+    def read_error(url, status_code, content):
+        """ Returns the exception of a failed iter_entries read """
+        return FlowManagerClientException('cannot read {}: {} {}'.format(
+            url, status_code, content))
+
+    def iter_paths(self, config=True):
+        """ Get the paths one at a time (see iter_entries) """
+        return self.iter_entries(
+            self.ctrl.get_req_url(config) + "/lumina-flowmanager-path:paths",
+            ('paths', 'path'))
+
+    def iter_treepaths(self, config=True):
+        """ Get the treepaths one at a time (see iter_entries) """
+        return self.iter_entries(
+            self.ctrl.get_req_url(config) +
+            "/lumina-flowmanager-tree-path:treepaths",
+            ('treepaths', 'treepath'))
+
+    def iter_elines(self, config=True):
+        """ Get the elines one at a time (see iter_entries) """
+        return self.iter_entries(
+            self.ctrl.get_req_url(config) +
+            "/lumina-flowmanager-eline:elines",
+            ('elines', 'eline'))
+
+    def iter_etrees(self, config=True):
+        """ Get the etrees one at a time (see iter_entries) """
+        return self.iter_entries(
+            self.ctrl.get_req_url(config) +
+            "/lumina-flowmanager-etree:etrees",
+            ('etrees', 'etree'))
+
+    def iter_nodes(self):
+        """ Get the OF Nodes of the inventory one at a time (see
+            iter_entries)
+        """
+        return self.iter_entries(
+            self.ctrl.get_req_url(False) + "/opendaylight-inventory:nodes",
+            ('nodes', 'node'))
+
+    @operation
     def get_controller_status(self):
-        """ Delete a etree via Flow Manager.
+        """ Get the system status of the controller.
 
-        :param name: name of etree to delete
-        :return: response keywords (see add_etree for description)
+        :return: response keywords, the status document is the 'content'
 
         """
 
-        resp = self.ctrl.http_get_request(
-                   self.ctrl.get_operational_url() +
-                   "/lumina-controller-status:system-status")
+        return Operation(
+            'GET', self.ctrl.get_operational_url() +
+            "/lumina-controller-status:system-status", keep_content=True)
 
-        r = {}
-        if resp is not None:
-            r['status_code'] = resp.status_code
-            r['content'] = resp.content
 
-            if resp.status_code == 200:
-                return r
+# -----------------------------------------------------------------------------
+# Class 'Client'
+# -----------------------------------------------------------------------------
+class Client(BaseClient):
+    """Class that represents a Flowmanager service """
 
-        return r
+    def __init__(self, **kwargs):
+        """Initializes this object properties."""
+        self.ctrl = Controller(**kwargs)
+
+    def close(self):
+        """ Closes the pooled connections to Flow Manager. """
+        self.ctrl.close()
+
+    def check_members(self):
+        """ Health checks the controller cluster members (see Controller) """
+        return self.ctrl.check_members()
+
+    def set_cache_mode(self, mode):
+        """ Sets how reads use the state cache (see lfmcli.cache.MODES) """
+        self.ctrl.cache_mode = mode
+
+    def clear_cache(self):
+        """ Drops the cached reads of this controller. """
+        if self.ctrl.cache is not None:
+            self.ctrl.cache.clear()
+
+    def send(self, op):
+        """ Sends the request of an Operation, reads through the state
+            cache, and returns the response.
+        """
+        if op.method == 'GET':
+            return self.ctrl.http_get_request(op.url, headers=op.headers)
+        return self.ctrl.http_request(op.method, op.url, data=op.data,
+                                      headers=op.headers,
+                                      idempotent=op.idempotent)
+
+    def perform(self, op):
+        """ Sends an Operation and returns its Result dict. """
+        resp = self.send(op)
+        if op.reread is not None and resp is not None and \
+                resp.status_code not in (200, 404):
+            return self.perform(op.reread)
+        return self.operation_result(op, resp)
+
+    def patch_entries(self, url, list_name, entries, key='name',
+                      operation='merge', chunk_size=None, workers=1):
+        """ Writes many entries of a config list with YANG-Patch.
+
+        Entries are sent in chunks of chunk_size edits (default
+        'bulk_chunk_size'), one PATCH of the list container per chunk and up
+        to workers chunks at a time. A chunk is one datastore transaction:
+        the controller applies all of its edits or none.
+
+        :param url: config url of the container holding the list
+        :param list_name: list name (i.e. 'eline')
+        :param entries: list entries (dicts) for merge, create and replace,
+                        key values for delete and remove
+        :param key: key leaf of the list
+        :param operation: YANG-Patch operation of every edit
+        :param chunk_size: edits per request
+        :param workers: chunks sent concurrently
+        :return: returns a resp dict (See below)
+
+        Response Dict:
+          'status_code': 200 if every entry was written, else the http
+                         response status code of the first failed chunk
+          'requests': number of PATCH requests sent
+          'errors': number of entries not written
+          'results': per entry dicts, in entries order
+            'name': entry key
+            'ok': True if the entry was written
+            'status_code': http response status code of its chunk
+            'error': error message or None
+
+        """
+
+        chunks = self.patch_operations(url, list_name, entries, key,
+                                       operation, chunk_size)
+
+        def send(index):
+            keys, op = chunks[index]
+            try:
+                resp = self.send(op)
+            except (requests.exceptions.RequestException,
+                    CircuitOpenException) as e:
+                return index, self.patch_failed(keys, str(e))
+
+            return index, self.patch_results(resp, keys)
+
+        chunk_results = dict(run_parallel(send, range(len(chunks)), workers))
+        return self.patch_report([chunk_results[index]
+                                  for index in range(len(chunks))])
+
+    def iter_stats(self, kind, names=None, workers=8):
+        """ Get the stats of many elines or etrees concurrently.
+
+        :param kind: 'eline' or 'etree'
+        :param names: service names, default every service (from one list
+                      request)
+        :param workers: get-stats requests sent concurrently
+        :return: generator of stats dicts (See below), as they complete
+
+        Stats Dict:
+          'name': service name
+          'status_code': http response status code (None if not sent)
+          'output': get-stats output, None on errors
+          'error': error message or None
+
+        """
+
+        if names is None:
+            names = self.stats_names(
+                kind, getattr(self, 'get_{}s'.format(kind))())
+
+        get_stats = getattr(self, 'get_{}_stats'.format(kind))
+
+        def get(name):
+            try:
+                r = get_stats(name)
+            except (requests.exceptions.RequestException,
+                    CircuitOpenException) as e:
+                r = {'status_code': None, 'content': str(e)}
+            return self.stats_result(name, r)
+
+        return run_parallel(get, names, workers)
+
+    def watch_stats(self, kind, name, interval=5, count=None):
+        """ Sample the stats of an eline or etree periodically.
+
+        The samples reuse the pooled connection of this client. Each yielded
+        dict holds the counter deltas and rates (per second) since the
+        previous successful sample, a counter reset is counted from zero.
+
+        :param kind: 'eline' or 'etree'
+        :param name: service name
+        :param interval: seconds between samples
+        :param count: number of samples, default forever
+        :return: generator of watch dicts (see lfmcli.stats.watch)
+
+        """
+
+        get_stats = getattr(self, 'get_{}_stats'.format(kind))
+
+        def sample():
+            try:
+                r = get_stats(name)
+            except (requests.exceptions.RequestException,
+                    CircuitOpenException) as e:
+                return None, str(e)
+            if r.get('status_code') != 200:
+                return None, 'get-stats failed: {}'.format(
+                    r.get('status_code'))
+            return r.get('output'), None
+
+        return watch(sample, interval, count)
+
+    def watch_eline_stats(self, name, interval=5, count=None):
+        """ Sample the stats of an eline periodically.
+
+        :return: generator of watch dicts (see watch_stats for description)
+
+        """
+
+        return self.watch_stats('eline', name, interval, count)
+
+    def watch_etree_stats(self, name, interval=5, count=None):
+        """ Sample the stats of an etree periodically.
+
+        :return: generator of watch dicts (see watch_stats for description)
+
+        """
+
+        return self.watch_stats('etree', name, interval, count)
+
+    def iter_connector_stats(self, nodes=None, workers=8):
+        """ Get the stats of every connector of many OF Nodes.
+
+        Without nodes, when the flow:1 topology has at most
+        'inventory_max_nodes' nodes (or can't be read), the stats come from
+        one read of the whole inventory. Explicit nodes, larger topologies
+        and a failed inventory read of known nodes are read node by node,
+        up to workers nodes at a time, a node that can't be read gives an
+        error dict.
+
+        :param nodes: node ids, default every node of the flow:1 topology
+        :param workers: node requests sent concurrently
+        :return: generator of stats dicts (See below)
+
+        Stats Dict:
+          'name': connector id (node id for a node error)
+          'node': node id
+          'port-name': connector port name
+          'status_code': http response status code (None if not sent)
+          'output': connector statistics, None on errors
+          'error': error message or None
+
+        """
+
+        if nodes is None:
+            r = self.get_ofnode_ids()
+            ids = r['nodes'] if r.get('status_code') == 200 else None
+            if ids is None or \
+                    len(ids) <= self.ctrl.config['inventory_max_nodes']:
+                try:
+                    r = self.get_ofnodes()
+                except (requests.exceptions.RequestException,
+                        CircuitOpenException):
+                    r = {}
+                if r.get('status_code') == 200:
+                    return (stats for node in r['nodes']
+                            for stats in self.connector_stats(node))
+                if ids is None:
+                    raise FlowManagerClientException(
+                        'cannot read the inventory: {}'.format(
+                            r.get('status_code')))
+            nodes = ids
+
+        def get(node):
+            try:
+                r = self.get_ofnode(node)
+            except (requests.exceptions.RequestException,
+                    CircuitOpenException) as e:
+                r = {'status_code': None, 'content': str(e)}
+            if r.get('status_code') == 200 and r.get('node'):
+                return self.connector_stats(r['node'])
+            error = r.get('content') or 'no response'
+            if isinstance(error, bytes):
+                error = error.decode('utf-8', 'replace')
+            return [{'name': node, 'node': node, 'port-name': None,
+                     'status_code': r.get('status_code'), 'output': None,
+                     'error': error}]
+
+        return (stats for results in run_parallel(get, nodes, workers)
+                for stats in results)
+
+    def iter_entries(self, url, path, chunk_size=65536):
+        """ Get the entries of a list, one at a time.
+
+        The response body is parsed as it arrives (see lfmcli.jsonstream),
+        so memory does not grow with the number of entries.
+
+        :param url: url of the container read
+        :param path: member names leading to the list in the body
+        :param chunk_size: bytes read at a time
+        :return: generator of list entries (nothing on 404)
+        :raise FlowManagerClientException: on other error statuses
+
+        """
+
+        resp = self.ctrl.http_stream_request(url)
+        try:
+            if resp.status_code == 404:
+                return
+            if resp.status_code != 200:
+                raise self.read_error(url, resp.status_code, resp.content)
+            for entry in iter_list(resp.iter_content(chunk_size), path):
+                yield entry
+        finally:
+            resp.close()
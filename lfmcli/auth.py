@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import time
+
+from requests.auth import AuthBase, HTTPBasicAuth
+
+
+class TokenAuthException(Exception):
+    """Raised when the controller does not grant a token"""
+
+    def __init__(self, msg):
+        self.msg = msg
+
+    def __str__(self):
+        return repr(self.msg)
+
+
+# -----------------------------------------------------------------------------
+# Class 'TokenAuth'
+# -----------------------------------------------------------------------------
+class TokenAuth(AuthBase):
+    """ Bearer token authentication against the controller AAA.
+
+    A token is requested once from the oauth2 token endpoint (password
+    grant) and sent on every request until it expires. Tokens are cached in
+    memory and, when cache_file is given, on disk so the next CLI run reuses
+    them. Thread safe.
+
+    post is the function sending the token request, with the signature of
+    requests.post.
+
+    """
+
+    # Refresh the token this many seconds before it expires
+    EXPIRY_MARGIN = 30
+
+    def __init__(self, post, token_url, user, password, scope='sdn',
+                 cache_file=None, verify=True, timeout=30):
+        self.post = post
+        self.token_url = token_url
+        self.user = user
+        self.password = password
+        self.scope = scope
+        self.cache_file = cache_file
+        self.verify = verify
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.token = None
+        self.expires_at = 0
+        self.loaded = False
+
+    def __call__(self, r):
+        r.headers['Authorization'] = 'Bearer ' + self.get_token()
+        return r
+
+    def cache_key(self):
+        return '{} {}'.format(self.token_url, self.user)
+
+    def get_token(self):
+        """ Returns a valid token, requesting a new one if needed. """
+        with self.lock:
+            if not self.loaded:
+                self.load()
+                self.loaded = True
+            if self.token is None or \
+                    time.time() >= self.expires_at - self.EXPIRY_MARGIN:
+                self.fetch()
+            return self.token
+
+    def invalidate(self, token=None):
+        """ Drops the cached token (if it is still token) after a 401. """
+        with self.lock:
+            if token is None or token == self.token:
+                self.token = None
+                self.expires_at = 0
+
+    def fetch(self):
+        resp = self.post(
+            self.token_url,
+            data={'grant_type': 'password', 'username': self.user,
+                  'password': self.password, 'scope': self.scope},
+            headers={'content-type': 'application/x-www-form-urlencoded',
+                     'accept': 'application/json'},
+            auth=HTTPBasicAuth(self.user, self.password),
+            verify=self.verify, timeout=self.timeout)
+
+        if resp.status_code not in (200, 201):
+            raise TokenAuthException('token request to {} failed: {}'.format(
+                self.token_url, resp.status_code))
+
+        grant = resp.json()
+        self.token = grant['access_token']
+        self.expires_at = time.time() + int(grant.get('expires_in', 3600))
+        self.save()
+
+    def load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file) as f:
+                entry = json.load(f).get(self.cache_key())
+        except (IOError, OSError, ValueError):
+            return
+        if entry:
+            self.token = entry['access_token']
+            self.expires_at = entry['expires_at']
+
+    def save(self):
+        if not self.cache_file:
+            return
+        try:
+            with open(self.cache_file) as f:
+                tokens = json.load(f)
+        except (IOError, OSError, ValueError):
+            tokens = {}
+
+        now = time.time()
+        tokens = dict((key, entry) for key, entry in tokens.items()
+                      if entry.get('expires_at', 0) > now)
+        tokens[self.cache_key()] = {'access_token': self.token,
+                                    'expires_at': self.expires_at}
+
+        # Written owner readable only then moved in place, the disk cache is
+        # best effort
+        tmp = '{}.{}'.format(self.cache_file, os.getpid())
+        try:
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(tokens, f)
+            os.rename(tmp, self.cache_file)
+        except (IOError, OSError):
+            pass
@@ -0,0 +1,388 @@
+""" Throughput and latency benchmark of lfmcli.api.Client.
+
+Runs the main Client operations against a local FakeFlowManager (default)
+or a real controller and reports ops/sec and latency percentiles per
+operation as JSON, so runs can be compared between releases or transport
+settings. Objects created on the controller are named 'lfmbench-*' and
+deleted by the run.
+"""
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+from lfmcli.api import Client
+from lfmcli.fakeserver import FakeFlowManager
+from lfmcli.parallel import run_parallel
+
+PREFIX = 'lfmbench'
+
+# Path of the measured elines and etrees
+PATH = '{}-path'.format(PREFIX)
+
+OPERATIONS = ('path', 'treepath', 'eline', 'etree', 'tap', 'ofnode', 'cli',
+              'startup')
+
+# lfm invocations measured by the startup operation (no controller request)
+STARTUP_COMMANDS = ('--help', 'eline --help')
+
+# Modules lfm only imports for the commands using them
+HEAVY_MODULES = ('requests', 'yaml', 'topology', 'lfmcli.api',
+                 'lfmcli.controller')
+
+# lfm command writing the HEAVY_MODULES it imported to stderr on exit
+STARTUP_PROBE = '''
+import atexit, sys
+atexit.register(lambda: sys.stderr.write('\\n' + ' '.join(
+    name for name in {!r} if name in sys.modules)))
+from lfmcli.cli import cli
+cli()
+'''.format(HEAVY_MODULES)
+
+
+def percentile(values, pct):
+    """ Returns the pct percentile (nearest rank) of sorted values. """
+    if not values:
+        return None
+    rank = int(round(pct / 100.0 * len(values) + 0.5)) - 1
+    return values[min(max(rank, 0), len(values) - 1)]
+
+
+def summarize(name, latencies, errors, seconds, workers):
+    """ Returns the result dict of a measured operation. """
+    latencies = sorted(latencies)
+    count = len(latencies)
+    result = {'name': name, 'count': count, 'errors': errors,
+              'workers': workers, 'seconds': round(seconds, 6),
+              'ops_per_sec': round(count / seconds, 2) if seconds else None,
+              'latency_ms': None}
+    if count:
+        result['latency_ms'] = dict(
+            (key, round(value * 1000, 3)) for key, value in (
+                ('min', latencies[0]),
+                ('mean', sum(latencies) / count),
+                ('p50', percentile(latencies, 50)),
+                ('p95', percentile(latencies, 95)),
+                ('p99', percentile(latencies, 99)),
+                ('max', latencies[-1])))
+    return result
+
+
+# -----------------------------------------------------------------------------
+# Class 'Bench'
+# -----------------------------------------------------------------------------
+class Bench(object):
+    """ Measures Client operations.
+
+    :param config: Client (controller) config
+    :param count: number of objects created per operation
+    :param workers: concurrent requests
+    :param endpoints: (switch-port, switch-port) used by elines and etrees
+    """
+
+    def __init__(self, config, count=100, workers=1,
+                 endpoints=('openflow:1:1', 'openflow:2:1'), log=None):
+        self.config = config
+        self.count = count
+        self.workers = workers
+        self.endpoints = endpoints
+        self.log = log or (lambda msg: None)
+        self.fm = Client(config=config)
+        self.results = []
+
+    def measure(self, name, func, items, workers=None):
+        """ Calls func on every item and records the operation result.
+
+        A call fails when it raises or returns a status code other than
+        200/201.
+
+        """
+        workers = workers or self.workers
+
+        def timed(item):
+            start = time.time()
+            try:
+                r = func(item)
+                ok = r.get('status_code') in (200, 201)
+            except Exception:
+                ok = False
+            return ok, time.time() - start
+
+        latencies = []
+        errors = 0
+        start = time.time()
+        for ok, latency in run_parallel(timed, items, workers):
+            latencies.append(latency)
+            if not ok:
+                errors += 1
+        result = summarize(name, latencies, errors, time.time() - start,
+                           workers)
+        self.results.append(result)
+        self.log('{name}: {ops_per_sec} ops/s, {errors} errors'.format(
+            **result))
+        return result
+
+    def names(self, kind):
+        return ['{}-{}-{}'.format(PREFIX, kind, i) for i in range(self.count)]
+
+    def path(self, name):
+        return {'name': name, 'provider': 'sr',
+                'endpoint1': {'node': self.endpoints[0].rsplit(':', 1)[0]},
+                'endpoint2': {'node': self.endpoints[1].rsplit(':', 1)[0]}}
+
+    @contextlib.contextmanager
+    def paths(self, names):
+        """ Creates the paths the measured services refer to (not measured)
+        and deletes them at the end.
+        """
+        fm = self.fm
+        for r in run_parallel(lambda name: fm.add_path(path=self.path(name)),
+                              names, self.workers):
+            if r.get('status_code') not in (200, 201, 204):
+                self.log('path setup failed: {} {}'.format(
+                    r.get('status_code'), r.get('content')))
+        try:
+            yield
+        finally:
+            list(run_parallel(fm.delete_path, names, self.workers))
+
+    def bench_path(self):
+        fm = self.fm
+        names = self.names('path')
+        self.measure('path.add', lambda name: fm.add_path(
+            path=self.path(name)), names)
+        self.measure('path.get', fm.get_path, names)
+        self.measure('path.delete', fm.delete_path, names)
+
+    def bench_treepath(self):
+        fm = self.fm
+        name = '{}-treepath'.format(PREFIX)
+        fm.add_treepath(treepath={
+            'name': name, 'provider': 'sr',
+            'root': {'node': self.endpoints[0].rsplit(':', 1)[0]},
+            'leaves': {'leaf': []}})
+        nodes = ['openflow:{}'.format(i + 1) for i in range(self.count)]
+        self.measure('treepath.leaf.add', lambda node: fm.add_treepath_leaf(
+            name, node, {'node': node, 'constraints': {}}), nodes)
+        self.measure('treepath.leaf.get',
+                     lambda node: fm.get_treepath_leaf(name, node), nodes)
+        self.measure('treepath.leaf.delete',
+                     lambda node: fm.delete_treepath_leaf(name, node), nodes)
+        fm.delete_treepath(name)
+
+    def eline(self, name):
+        return {'name': name, 'path-name': PATH,
+                'provider': 'sr', 'bidirectional': 'true',
+                'endpoint1': {'switch-port': self.endpoints[0]},
+                'endpoint2': {'switch-port': self.endpoints[1]}}
+
+    def bench_eline(self):
+        fm = self.fm
+        names = self.names('eline')
+        with self.paths([PATH]):
+            self.measure('eline.add',
+                         lambda name: fm.add_eline(eline=self.eline(name)),
+                         names)
+            self.measure('eline.get', fm.get_eline, names)
+            self.measure('eline.stats', fm.get_eline_stats, names)
+            self.measure('eline.list', lambda i: fm.get_elines(),
+                         range(max(self.count // 10, 1)))
+            self.measure('eline.delete', fm.delete_eline, names)
+
+    def bench_etree(self):
+        fm = self.fm
+        names = self.names('etree')
+        with self.paths([PATH]):
+            self.measure('etree.add', lambda name: fm.add_etree(etree={
+                'name': name, 'path-name': PATH, 'provider': 'sr',
+                'root': {'switch-port': self.endpoints[0]},
+                'leaves': [{'leaf': {'switch-port': self.endpoints[1]}}]}),
+                names)
+            self.measure('etree.get', fm.get_etree, names)
+            self.measure('etree.stats', fm.get_etree_stats, names)
+            self.measure('etree.delete', fm.delete_etree, names)
+
+    def bench_tap(self):
+        fm = self.fm
+        eline = '{}-tap-eline'.format(PREFIX)
+        names = self.names('tap')
+        # taps refer to a path of their name
+        with self.paths([PATH] + names):
+            fm.add_eline(eline=self.eline(eline))
+            self.measure('tap.add', lambda name: fm.add_tap(
+                eline, 'endpoint1', tap={'path-name': name, 'egress': {
+                    'action': [{'order': 3, 'output-action': {
+                        'output-node-connector': '1'}}]}}), names)
+            self.measure('tap.get',
+                         lambda name: fm.get_tap(eline, 'endpoint1', name),
+                         names)
+            self.measure('tap.delete',
+                         lambda name: fm.delete_tap(eline, 'endpoint1', name),
+                         names)
+            fm.delete_eline(eline)
+
+    def bench_ofnode(self, runs=10, name='ofnode.list'):
+        self.measure(name, lambda i: self.fm.get_ofnodes(), range(runs),
+                     workers=1)
+
+    def bench_cli(self, commands, runs=10):
+        """ Measures end to end 'lfm' invocations (process start included).
+        """
+        handle, topology = tempfile.mkstemp(suffix='.yml')
+        with os.fdopen(handle, 'w') as f:
+            yaml.safe_dump({
+                'controllers': [{
+                    'name': PREFIX, 'ip': self.config['ip'],
+                    'port': self.config['port'],
+                    'user': self.config['user'],
+                    'password': self.config['password'],
+                    'protocol': self.config.get('protocol', 'http')}],
+                'hosts': [], 'interfaces': [], 'links': [], 'switches': []},
+                f, default_flow_style=False)
+
+        env = cli_env()
+        try:
+            for command in commands:
+                args = [sys.executable, '-c',
+                        'from lfmcli.cli import cli; cli()',
+                        '--topology', topology] + command.split()
+
+                def run(i):
+                    with open(os.devnull, 'w') as devnull:
+                        code = subprocess.call(args, stdout=devnull,
+                                               stderr=devnull, env=env)
+                    return {'status_code': 200 if code == 0 else code}
+
+                self.measure('cli.' + command.replace(' ', '.'), run,
+                             range(runs), workers=1)
+        finally:
+            os.remove(topology)
+
+    def bench_startup(self, commands=STARTUP_COMMANDS, runs=10):
+        """ Measures 'lfm' invocations sending no request (process start,
+        imports and command lookup), and records the HEAVY_MODULES each one
+        imports in the 'imports' of its result.
+        """
+        env = cli_env()
+        for command in commands:
+            args = [sys.executable, '-c', 'from lfmcli.cli import cli; cli()'
+                    ] + command.split()
+
+            def run(i):
+                with open(os.devnull, 'w') as devnull:
+                    code = subprocess.call(args, stdout=devnull,
+                                           stderr=devnull, env=env)
+                return {'status_code': 200 if code == 0 else code}
+
+            result = self.measure('startup.' + command.replace(' ', '.'),
+                                  run, range(runs), workers=1)
+
+            probe = subprocess.Popen(
+                [sys.executable, '-c', STARTUP_PROBE] + command.split(),
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+            err = probe.communicate()[1].decode('utf-8', 'replace')
+            result['imports'] = err.rsplit('\n', 1)[-1].split()
+
+    def report(self, **settings):
+        """ Returns the machine readable report of the run. """
+        return {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ',
+                                           time.gmtime()),
+                'python': platform.python_version(),
+                'target': '{}:{}'.format(self.config['ip'],
+                                         self.config['port']),
+                'settings': settings,
+                'count': self.count,
+                'workers': self.workers,
+                'pool': self.fm.get_pool_stats(),
+                'results': self.results}
+
+
+def cli_env():
+    """ Returns the environment of lfm processes using the lfmcli package
+    of this process, even if not installed.
+    """
+    return dict(os.environ, PYTHONPATH=os.pathsep.join(
+        [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))] +
+        [p for p in [os.environ.get('PYTHONPATH')] if p]))
+
+
+def startup_regressions(report, max_ms=None):
+    """ Returns the messages of the startup results of a report whose p50
+    latency is above max_ms, that failed or that imported HEAVY_MODULES.
+    """
+    messages = []
+    for result in report['results']:
+        if not result['name'].startswith('startup.'):
+            continue
+        if result['errors']:
+            messages.append('{name}: {errors} failed runs'.format(**result))
+        if result['imports']:
+            messages.append('{}: imports {}'.format(
+                result['name'], ', '.join(result['imports'])))
+        p50 = (result['latency_ms'] or {}).get('p50')
+        if max_ms is not None and p50 is not None and p50 > max_ms:
+            messages.append('{}: p50 {}ms above {}ms'.format(
+                result['name'], p50, max_ms))
+    return messages
+
+
+def run(config=None, operations=OPERATIONS, count=100, workers=1,
+        inventory_sizes=(10, 100, 1000), connectors=4, ofnode_runs=10,
+        cli_commands=('eline list', 'ofnode list'), cli_runs=10,
+        client_options=None, fake_options=None, log=None):
+    """ Runs the benchmark and returns its report dict.
+
+    Without config a FakeFlowManager is started (one per inventory size for
+    the ofnode operation, see fake_options for its FakeFlowManager
+    arguments). client_options are extra Client config properties (pool
+    size, retries...) used in both cases.
+
+    """
+    config = dict(config, **(client_options or {})) if config else None
+    client_options = client_options or {}
+    fake_options = fake_options or {}
+    servers = []
+
+    def fake(nodes):
+        server = FakeFlowManager(nodes=nodes, connectors=connectors,
+                                 **fake_options).start()
+        servers.append(server)
+        return server.client_config(**client_options)
+
+    try:
+        bench = Bench(config or fake(max(inventory_sizes or (10,))), count,
+                      workers, log=log)
+        for operation in operations:
+            if operation == 'ofnode' and config is None:
+                main = bench.fm
+                for size in inventory_sizes:
+                    bench.fm = Client(config=fake(size))
+                    bench.bench_ofnode(ofnode_runs,
+                                       'ofnode.list.{}'.format(size))
+                    bench.fm.close()
+                bench.fm = main
+            elif operation == 'ofnode':
+                bench.bench_ofnode(ofnode_runs)
+            elif operation == 'cli':
+                bench.bench_cli(cli_commands, cli_runs)
+            elif operation == 'startup':
+                bench.bench_startup(runs=cli_runs)
+            else:
+                getattr(bench, 'bench_' + operation)()
+
+        settings = dict((key, value) for key, value in bench.config.items()
+                        if key not in ('user', 'password'))
+        return bench.report(**settings)
+    finally:
+        for server in servers:
+            server.stop()
+
+
+def dumps(report):
+    return json.dumps(report, sort_keys=True, indent=4)
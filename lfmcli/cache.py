@@ -0,0 +1,141 @@
+""" On-disk cache of controller reads.
+
+RESTCONF GET responses are kept in a SQLite file, keyed by controller and
+url, so that read heavy tooling (the list and get commands) can answer
+without a controller round trip. Writes sent by the client invalidate the
+cached resources they touch, in both datastores, and entries older than the
+ttl are not served.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.lfm', 'cache.sqlite')
+
+# refresh: read the controller and update the cache
+# cached: serve fresh cache entries, read the controller otherwise
+# off: bypass the cache (writes still invalidate it)
+MODES = ('refresh', 'cached', 'off')
+
+DATASTORES = ('/config/', '/operational/')
+
+
+def resource_path(url):
+    """ Returns the datastore independent path of a RESTCONF data url
+    without its query (i.e. 'lumina-flowmanager-eline:elines/eline/e1'), or
+    None.
+    """
+    url = url.split('?')[0]
+    for datastore in DATASTORES:
+        base, sep, path = url.partition('/restconf' + datastore)
+        if sep:
+            return path.rstrip('/')
+    return None
+
+
+# -----------------------------------------------------------------------------
+# Class 'CachedResponse'
+# -----------------------------------------------------------------------------
+class CachedResponse(object):
+    """ Response served from the cache, age is its age in seconds. """
+
+    def __init__(self, status_code, content, age):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {}
+        self.age = age
+
+
+# -----------------------------------------------------------------------------
+# Class 'StateCache'
+# -----------------------------------------------------------------------------
+class StateCache(object):
+    """ SQLite cache of RESTCONF GET responses.
+
+    :param path: cache file, shared by every controller
+    :param controller: key of the controller (i.e. 'ip:port')
+    :param ttl: seconds a response is served from the cache
+    """
+
+    def __init__(self, path=None, controller='', ttl=300):
+        self.path = path or DEFAULT_PATH
+        self.controller = controller
+        self.ttl = ttl
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        if not os.path.exists(self.path):
+            # controller state, readable by its owner only
+            os.close(os.open(self.path, os.O_WRONLY | os.O_CREAT, 0o600))
+
+        self.db = sqlite3.connect(self.path, timeout=30,
+                                  check_same_thread=False)
+        with self.lock:
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'controller TEXT, url TEXT, resource TEXT, stored REAL, '
+                'status INTEGER, content BLOB, PRIMARY KEY (controller, url))')
+            self.db.execute(
+                'CREATE INDEX IF NOT EXISTS responses_resource '
+                'ON responses (controller, resource)')
+            self.db.commit()
+
+    def get(self, url, ttl=None):
+        """ Returns the CachedResponse of url, or None if missing or older
+        than ttl (default the cache ttl).
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self.lock:
+            row = self.db.execute(
+                'SELECT stored, status, content FROM responses '
+                'WHERE controller = ? AND url = ?',
+                (self.controller, url)).fetchone()
+        if row is None:
+            return None
+        age = time.time() - row[0]
+        if age > ttl:
+            return None
+        return CachedResponse(row[1], bytes(row[2]), age)
+
+    def put(self, url, resp):
+        """ Stores the response of a GET of url. """
+        resource = resource_path(url)
+        if resource is None:
+            return
+        with self.lock:
+            self.db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                (self.controller, url, resource, time.time(),
+                 resp.status_code, sqlite3.Binary(resp.content)))
+            self.db.commit()
+
+    def invalidate(self, url):
+        """ Drops the cached resources a write to url may have changed: the
+        resource, its descendants and its ancestors, in both datastores.
+        """
+        resource = resource_path(url)
+        if resource is None:
+            return
+        with self.lock:
+            self.db.execute(
+                'DELETE FROM responses WHERE controller = ? AND ('
+                'resource = ? OR '
+                'substr(resource, 1, ?) = ? OR '
+                'substr(?, 1, length(resource) + 1) = resource || \'/\')',
+                (self.controller, resource, len(resource) + 1,
+                 resource + '/', resource))
+            self.db.commit()
+
+    def clear(self):
+        """ Drops every cached response of the controller. """
+        with self.lock:
+            self.db.execute('DELETE FROM responses WHERE controller = ?',
+                            (self.controller,))
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -1,28 +1,96 @@
+import importlib
+
 import click
 from context import pass_context
-from commands import *
+from output import FORMATS
+
+# name: (module of lfmcli.commands, attribute) of the built-in commands,
+# imported when the command is run or listed
+COMMANDS = {
+    'path': ('cmd_path', 'path'),
+    'eline': ('cmd_eline', 'eline'),
+    'treepath': ('cmd_treepath', 'treepath'),
+    'etree': ('cmd_etree', 'etree'),
+    'tap': ('cmd_tap', 'tap'),
+    'ofnode': ('cmd_ofnode', 'ofnode'),
+    'controller': ('cmd_controller', 'controller'),
+    'fake-server': ('cmd_fakeserver', 'fake_server'),
+    'bench': ('cmd_bench', 'bench'),
+    'apply': ('cmd_apply', 'apply'),
+    'sync': ('cmd_sync', 'sync'),
+    'snapshot': ('cmd_snapshot', 'snapshot'),
+}
+
+# Entry points group of the commands added by other packages, i.e. in
+# their setup.py: entry_points={'lfmcli.commands': ['name=module:command']}
+PLUGIN_GROUP = 'lfmcli.commands'
+
+_plugins = None
+
+
+def plugins():
+    """ Returns {name: entry point} of the plugin commands """
+    global _plugins
+    if _plugins is None:
+        try:
+            from importlib.metadata import entry_points
+        except ImportError:
+            import pkg_resources
+            points = pkg_resources.iter_entry_points(PLUGIN_GROUP)
+        else:
+            points = entry_points()
+            points = points.select(group=PLUGIN_GROUP) \
+                if hasattr(points, 'select') else \
+                points.get(PLUGIN_GROUP, [])
+        _plugins = dict((point.name, point) for point in points)
+    return _plugins
 
 
-@click.group(name='lfm')
+class LazyGroup(click.Group):
+    """ Group loading its commands on first use: the built-in COMMANDS,
+    then the PLUGIN_GROUP entry points (only read for names that are not
+    built-in, and to list the commands).
+    """
+
+    def list_commands(self, ctx):
+        return sorted(set(self.commands) | set(COMMANDS) | set(plugins()))
+
+    def get_command(self, ctx, name):
+        if name not in self.commands:
+            if name in COMMANDS:
+                module, attr = COMMANDS[name]
+                command = getattr(importlib.import_module(
+                    'lfmcli.commands.' + module), attr)
+            elif name in plugins():
+                command = plugins()[name].load()
+            else:
+                return None
+            self.commands[name] = command
+        return self.commands[name]
+
+
+@click.group(name='lfm', cls=LazyGroup)
 @click.option('--topology',
               type=click.Path(exists=True, resolve_path=True),
               help='Topology File')
 @click.option('--insecure',
               is_flag=True,
               help="Does not verify HTTPS connection")
+@click.option('--output', '-o',
+              type=click.Choice(FORMATS), default='json-pretty',
+              help="Output format, ndjson and json-compact print list "
+                   "entries as they are read")
+@click.option('--sort-keys',
+              is_flag=True,
+              help="Sort the keys of ndjson and json-compact output")
 @pass_context
-def cli(ctx, topology=None, insecure=False):
+def cli(ctx, topology=None, insecure=False, output='json-pretty',
+        sort_keys=False):
     """Flow Manager CLI"""
     ctx.set_verify(not insecure)
+    ctx.set_output(output, sort_keys)
     if topology is not None:
         ctx.set_topology(topology)
 
-cli.add_command(cmd_path.path)
-cli.add_command(cmd_eline.eline)
-cli.add_command(cmd_treepath.treepath)
-cli.add_command(cmd_etree.etree)
-cli.add_command(cmd_tap.tap)
-cli.add_command(cmd_ofnode.ofnode)
-
 if __name__ == "__main__":
-    cli()
\ No newline at end of file
+    cli()
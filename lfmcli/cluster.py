@@ -0,0 +1,147 @@
+import itertools
+import threading
+import time
+
+from lfmcli.retry import CircuitBreaker, CircuitOpenException
+
+
+# -----------------------------------------------------------------------------
+# Class 'Member'
+# -----------------------------------------------------------------------------
+class Member(object):
+    """ A controller cluster member.
+
+    The member health is tracked by its own circuit breaker: a member whose
+    breaker is open is skipped until 'reset' seconds pass, then a single
+    request probes it again.
+
+    """
+
+    def __init__(self, ip, port, protocol='http', threshold=1, reset=10):
+        self.ip = ip
+        self.port = port
+        self.protocol = protocol
+        self.breaker = CircuitBreaker(threshold, reset, ip)
+        # cluster member name (member-1...), learnt on leader discovery
+        self.name = None
+
+    def get_root_url(self):
+        return ("{}://{}:{}").format(self.protocol, self.ip, self.port)
+
+    def get_base_url(self):
+        return self.get_root_url() + "/restconf"
+
+    def is_healthy(self):
+        return self.breaker.state != CircuitBreaker.OPEN
+
+    def to_dict(self):
+        return {'ip': self.ip, 'port': self.port, 'protocol': self.protocol,
+                'name': self.name, 'state': self.breaker.state,
+                'failures': self.breaker.failures}
+
+
+# -----------------------------------------------------------------------------
+# Class 'MemberSet'
+# -----------------------------------------------------------------------------
+class MemberSet(object):
+    """ Round robin selection over the healthy cluster members. """
+
+    def __init__(self, members):
+        self.members = members
+        self.lock = threading.Lock()
+        self.counter = itertools.count()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls([Member(m['ip'], m.get('port', config['port']),
+                           m.get('protocol', config['protocol']),
+                           config['member_failures'],
+                           config['health_interval'])
+                    for m in config['members']])
+
+    def __len__(self):
+        return len(self.members)
+
+    def __iter__(self):
+        return iter(self.members)
+
+    def next_member(self):
+        """ Returns the next member able to take a request, or None.
+
+        Members are tried in round robin order, the ones whose breaker is
+        open are skipped. None means every member is down.
+
+        """
+        if not self.members:
+            return None
+
+        with self.lock:
+            start = next(self.counter)
+
+        for i in range(len(self.members)):
+            member = self.members[(start + i) % len(self.members)]
+            try:
+                member.breaker.allow()
+            except CircuitOpenException:
+                continue
+            return member
+
+        return None
+
+
+# -----------------------------------------------------------------------------
+# Class 'LeaderCache'
+# -----------------------------------------------------------------------------
+class LeaderCache(object):
+    """ Caches which member leads each config shard.
+
+    Leaders are kept 'ttl' seconds. A cached leader whose breaker opened
+    (it failed a request) is dropped so writes fall back to the configured
+    ip until the next discovery, so is the leader of a write that failed
+    (see invalidate).
+
+    Discovery runs outside the lock, one at a time per shard: while a
+    thread discovers, the others keep the previous leader (or None).
+
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.leaders = {}
+        self.discovering = set()
+
+    def get(self, shard, discover):
+        """ Returns the leader member of shard or None if unknown.
+
+        :param shard: config shard name
+        :param discover: function(shard) returning the leader member or None,
+                         called when the cached entry expired
+
+        """
+        with self.lock:
+            leader, expires = self.leaders.get(shard, (None, 0))
+            if leader is not None and not leader.is_healthy():
+                expires = time.time() + leader.breaker.reset_timeout
+                leader = None
+                self.leaders[shard] = (leader, expires)
+            if time.time() < expires or shard in self.discovering:
+                return leader
+            self.discovering.add(shard)
+
+        try:
+            leader = discover(shard)
+            with self.lock:
+                self.leaders[shard] = (leader, time.time() + self.ttl)
+        finally:
+            with self.lock:
+                self.discovering.discard(shard)
+
+        return leader
+
+    def invalidate(self, shard=None):
+        with self.lock:
+            if shard is None:
+                self.leaders.clear()
+            else:
+                self.leaders.pop(shard, None)
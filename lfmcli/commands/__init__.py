@@ -1 +0,0 @@
-__all__ = ["cmd_eline","cmd_etree","cmd_ofnode","cmd_path","cmd_tap","cmd_treepath","cmd_controller"]
@@ -0,0 +1,56 @@
+import click
+from lfmcli.context import pass_context
+
+
+@click.command()
+@click.option('--filename', '-f', type=click.File('r'), required=True,
+              help="YAML or JSON manifest of paths, treepaths, elines, "
+                   "etrees and taps ('-' for stdin)")
+@click.option('--workers', type=click.INT, default=8,
+              help="Concurrent requests")
+@click.option('--bulk', is_flag=True, default=False,
+              help="Merge paths, treepaths, elines and etrees with chunked "
+                   "YANG-Patch requests")
+@click.option('--chunk-size', type=click.INT,
+              help="Entries per YANG-Patch request (with --bulk)")
+@click.option('--validate', is_flag=True, default=False,
+              help="Check the nodes and switch-ports against the inventory "
+                   "first")
+@click.option('--quiet', '-q', is_flag=True, default=False,
+              help="Only print the summary")
+@pass_context
+def apply(ctx, filename, workers, bulk, chunk_size, validate, quiet):
+    """Create the services of a manifest"""
+    from lfmcli.manifest import ManifestException, apply_manifest, \
+        load_manifest
+
+    try:
+        manifest = load_manifest(filename)
+    except ManifestException as e:
+        raise click.BadParameter(e.msg, param_hint='--filename')
+
+    inventory = None
+    if validate:
+        from lfmcli.inventory import Inventory, InventoryException
+        try:
+            inventory = Inventory.from_client(ctx.fm)
+        except InventoryException as e:
+            raise click.ClickException(e.msg)
+
+    def progress(result):
+        if not quiet:
+            click.echo('{status:8} {kind:9} {name}'.format(**result),
+                       err=True)
+
+    report = apply_manifest(ctx.fm, manifest, workers=workers, bulk=bulk,
+                            chunk_size=chunk_size, progress=progress,
+                            inventory=inventory)
+
+    for error in report['errors']:
+        click.echo('{kind} {name}: {status_code} {error}'.format(**error),
+                   err=True)
+    click.echo('{items} items in {seconds}s ({items_per_sec} items/s): '
+               '{ok} ok, {failed} failed, {skipped} skipped'.format(**report))
+
+    if report['failed'] or report['skipped']:
+        click.get_current_context().exit(1)
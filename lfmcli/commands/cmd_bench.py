@@ -0,0 +1,79 @@
+import click
+from lfmcli.context import pass_context
+
+OPERATIONS = ('path', 'treepath', 'eline', 'etree', 'tap', 'ofnode', 'cli',
+              'startup')
+
+
+def parse_settings(settings):
+    """ Parses KEY=VALUE options, values are YAML (numbers, lists...) """
+    import yaml
+
+    props = {}
+    for setting in settings:
+        key, sep, value = setting.partition('=')
+        if not sep:
+            raise click.BadParameter('{} is not KEY=VALUE'.format(setting))
+        props[key] = yaml.safe_load(value)
+    return props
+
+
+@click.command()
+@click.option('--fake/--controller', default=True,
+              help="Run against a local fake server (default) or the "
+                   "--topology controller")
+@click.option('--operation', '-o', 'operations', multiple=True,
+              type=click.Choice(OPERATIONS),
+              help="Operations to run (default all)")
+@click.option('--count', type=click.INT, default=100,
+              help="Objects created per operation")
+@click.option('--workers', type=click.INT, default=1,
+              help="Concurrent requests")
+@click.option('--inventory-sizes', type=click.STRING, default='10,100,1000',
+              help="Fake inventory sizes (nodes) for ofnode list")
+@click.option('--connectors', type=click.INT, default=4,
+              help="Fake node connectors per node")
+@click.option('--ofnode-runs', type=click.INT, default=10,
+              help="ofnode list calls per inventory size")
+@click.option('--cli-runs', type=click.INT, default=10,
+              help="Runs of each end to end lfm command")
+@click.option('--max-startup-ms', type=click.FLOAT,
+              help="Exit with 1 when the p50 of a startup command is above "
+                   "this, or it imports a module it does not need")
+@click.option('--latency', type=click.STRING, multiple=True,
+              help="Fake server [ROUTE=]SECONDS latency")
+@click.option('--set', 'settings', type=click.STRING, multiple=True,
+              help="KEY=VALUE controller config (e.g. pool_maxsize=20)")
+@click.option('--output', type=click.File('w'), default='-',
+              help="JSON report file (default stdout)")
+@pass_context
+def bench(ctx, fake, operations, count, workers, inventory_sizes, connectors,
+          ofnode_runs, cli_runs, max_startup_ms, latency, settings,
+          output):
+    """Client throughput and latency benchmark"""
+    from lfmcli import bench as lfmbench
+    from lfmcli.fakeserver import parse_latency, parse_route_values
+
+    try:
+        sizes = [int(size) for size in inventory_sizes.split(',') if size]
+        latency = parse_route_values(latency, parse_latency)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+    report = lfmbench.run(
+        config=None if fake else ctx.controller,
+        operations=operations or OPERATIONS, count=count, workers=workers,
+        inventory_sizes=sizes, connectors=connectors,
+        ofnode_runs=ofnode_runs, cli_runs=cli_runs,
+        client_options=parse_settings(settings),
+        fake_options={'latency': latency},
+        log=lambda msg: click.echo(msg, err=True))
+
+    output.write(lfmbench.dumps(report) + '\n')
+
+    if max_startup_ms is not None:
+        regressions = lfmbench.startup_regressions(report, max_startup_ms)
+        for message in regressions:
+            click.echo(message, err=True)
+        if regressions:
+            click.get_current_context().exit(1)
@@ -19,3 +19,14 @@ def get_status(ctx):
     else:
         click.echo("No system status found")
 
+
+@controller.command(name='members')
+@pass_context
+def get_members(ctx):
+    fm = ctx.fm
+    members = fm.check_members()
+
+    if len(members) > 0:
+        ctx.print_json(members)
+    else:
+        click.echo("No cluster members configured")
@@ -1,5 +1,8 @@
 import click
-from lfmcli.context import pass_context
+from lfmcli.context import cache_option, pass_context
+from lfmcli.commands.selection import batch_options, delete_selected, \
+    make_selector, read_options, selector_options
+from lfmcli.commands.reporting import echo_all_stats, echo_entries, echo_watch
 
 
 @click.group()
@@ -8,10 +11,16 @@ def eline():
 
 
 @eline.command(name='list')
+@read_options
+@cache_option
 @pass_context
-def lst(ctx):
+def lst(ctx, fields, depth):
+    if ctx.output != 'json-pretty':
+        return echo_entries(ctx, 'elines', "No E-Lines Found",
+                            fields, depth)
+
     fm = ctx.fm
-    result = fm.get_elines()
+    result = fm.get_elines(fields=fields, depth=depth)
     elines = result.get('elines')
 
     if elines is not None and len(elines) > 0:
@@ -22,10 +31,12 @@ def lst(ctx):
 
 @eline.command()
 @click.argument('name', type=click.STRING)
+@read_options
+@cache_option
 @pass_context
-def get(ctx, name):
+def get(ctx, name, fields, depth):
     fm = ctx.fm
-    result = fm.get_eline(name)
+    result = fm.get_eline(name, fields=fields, depth=depth)
     elines = [result.get('eline')]
 
     if elines is not None and len(elines) > 0:
@@ -35,8 +46,32 @@ def get(ctx, name):
 
 
 @eline.command()
-@click.argument('name', type=click.STRING)
-def stats(ctx, name):
+@click.argument('name', type=click.STRING, required=False)
+@click.option('--all', 'all_', is_flag=True, default=False,
+              help="Stats of every E-Line")
+@click.option('--workers', type=click.INT, default=8,
+              help="Concurrent requests (with --all)")
+@click.option('--format', 'fmt', type=click.Choice(['table', 'ndjson']),
+              default='table', help="Output of --all")
+@click.option('--watch', type=click.FLOAT,
+              help="Print the deltas and rates every WATCH seconds")
+@click.option('--count', type=click.INT,
+              help="Number of --watch samples (default until interrupted)")
+@pass_context
+def stats(ctx, name, all_, workers, fmt, watch, count):
+    if all_ == (name is not None):
+        raise click.UsageError("Give either NAME or --all")
+    if all_ and watch:
+        raise click.UsageError("--watch samples one E-Line, not --all")
+    if count is not None and not watch:
+        raise click.UsageError("--count needs --watch")
+    if all_:
+        echo_all_stats(ctx.fm.iter_eline_stats, workers, fmt)
+        return
+    if watch:
+        echo_watch(name, ctx.fm.watch_eline_stats(name, watch, count))
+        return
+
     fm = ctx.fm
     result = fm.get_eline_stats(name)
 
@@ -58,6 +93,7 @@ def stats(ctx, name):
 @click.option('--bidirectional', type=click.BOOL, is_flag=True,
               help="Unidirectional/Bidirectional", default=True)
 @click.option('--provider', type=click.Choice(['sr', 'mpls']), default='sr')
+@pass_context
 def add(ctx, name, path_name, source_port, destination_port,
               source_segmentation_id, destination_segmentation_id,
               ether_type, bidirectional, provider):
@@ -102,7 +138,14 @@ def add(ctx, name, path_name, source_port, destination_port,
 
 
 @eline.command()
-def purge(ctx):
+@batch_options
+@pass_context
+def purge(ctx, batch_size, workers):
+    if batch_size:
+        delete_selected(ctx, 'elines', 'E-Lines', make_selector(),
+                        workers, batch_size)
+        return
+
     fm = ctx.fm
     result = fm.delete_elines()
 
@@ -116,8 +159,19 @@ def purge(ctx):
 
 
 @eline.command()
-@click.argument('name', type=click.STRING)
-def delete(ctx, name):
+@click.argument('name', type=click.STRING, required=False)
+@selector_options
+@pass_context
+def delete(ctx, name, prefix, regex, provider, node, segmentation_id,
+           dry_run, batch_size, workers):
+    selector = make_selector(prefix, regex, provider, node, segmentation_id)
+    if bool(selector) == (name is not None):
+        raise click.UsageError("Give either NAME or selector options")
+    if selector:
+        delete_selected(ctx, 'elines', 'E-Lines', selector, workers,
+                        batch_size, dry_run)
+        return
+
     fm = ctx.fm
     result = fm.delete_eline(name)
 
@@ -1,15 +1,24 @@
 import click
-from lfmcli.context import pass_context
+from lfmcli.context import cache_option, pass_context
+from lfmcli.commands.selection import batch_options, delete_selected, \
+    make_selector, read_options, selector_options
+from lfmcli.commands.reporting import echo_all_stats, echo_entries, echo_watch
 
 @click.group()
 def etree():
     pass
 
 @etree.command(name='list')
+@read_options
+@cache_option
 @pass_context
-def lst(ctx):
+def lst(ctx, fields, depth):
+    if ctx.output != 'json-pretty':
+        return echo_entries(ctx, 'etrees', "No E-Trees Found",
+                            fields, depth)
+
     fm = ctx.fm
-    result = fm.get_etrees()
+    result = fm.get_etrees(fields=fields, depth=depth)
     etrees = result.get('etrees')
 
     if etrees is not None and len(etrees) > 0:
@@ -19,10 +28,12 @@ def lst(ctx):
 
 @etree.command()
 @click.argument('name', type=click.STRING)
+@read_options
+@cache_option
 @pass_context
-def get(ctx, name):
+def get(ctx, name, fields, depth):
     fm = ctx.fm
-    result = fm.get_etree(name)
+    result = fm.get_etree(name, fields=fields, depth=depth)
     etrees = [result.get('etree')]
 
     if etrees is not None and len(etrees) > 0:
@@ -32,9 +43,32 @@ def get(ctx, name):
 
 
 @etree.command()
-@click.argument('name', type=click.STRING)
+@click.argument('name', type=click.STRING, required=False)
+@click.option('--all', 'all_', is_flag=True, default=False,
+              help="Stats of every E-Tree")
+@click.option('--workers', type=click.INT, default=8,
+              help="Concurrent requests (with --all)")
+@click.option('--format', 'fmt', type=click.Choice(['table', 'ndjson']),
+              default='table', help="Output of --all")
+@click.option('--watch', type=click.FLOAT,
+              help="Print the deltas and rates every WATCH seconds")
+@click.option('--count', type=click.INT,
+              help="Number of --watch samples (default until interrupted)")
 @pass_context
-def stats(ctx, name):
+def stats(ctx, name, all_, workers, fmt, watch, count):
+    if all_ == (name is not None):
+        raise click.UsageError("Give either NAME or --all")
+    if all_ and watch:
+        raise click.UsageError("--watch samples one E-Tree, not --all")
+    if count is not None and not watch:
+        raise click.UsageError("--count needs --watch")
+    if all_:
+        echo_all_stats(ctx.fm.iter_etree_stats, workers, fmt)
+        return
+    if watch:
+        echo_watch(name, ctx.fm.watch_etree_stats(name, watch, count))
+        return
+
     fm = ctx.fm
     result = fm.get_etree_stats(name)
 
@@ -98,8 +132,14 @@ def add(ctx, name, path_name, root_port, leaf_port,
 
 
 @etree.command()
+@batch_options
 @pass_context
-def purge(ctx):
+def purge(ctx, batch_size, workers):
+    if batch_size:
+        delete_selected(ctx, 'etrees', 'E-Trees', make_selector(),
+                        workers, batch_size)
+        return
+
     fm = ctx.fm
     result = fm.delete_etrees()
 
@@ -112,9 +152,19 @@ def purge(ctx):
         click.echo("Cannot remove E-Trees")
 
 @etree.command()
-@click.argument('name', type=click.STRING)
+@click.argument('name', type=click.STRING, required=False)
+@selector_options
 @pass_context
-def delete(ctx, name):
+def delete(ctx, name, prefix, regex, provider, node, segmentation_id,
+           dry_run, batch_size, workers):
+    selector = make_selector(prefix, regex, provider, node, segmentation_id)
+    if bool(selector) == (name is not None):
+        raise click.UsageError("Give either NAME or selector options")
+    if selector:
+        delete_selected(ctx, 'etrees', 'E-Trees', selector, workers,
+                        batch_size, dry_run)
+        return
+
     fm = ctx.fm
     result = fm.delete_etree(name)
 
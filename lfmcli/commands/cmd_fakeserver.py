@@ -0,0 +1,51 @@
+import click
+
+
+@click.command(name='fake-server')
+@click.option('--host', type=click.STRING, default='127.0.0.1',
+              help="Address to listen on")
+@click.option('--port', type=click.INT, default=8181, help="Port to listen on")
+@click.option('--nodes', type=click.INT, default=10,
+              help="Number of openflow nodes in the inventory")
+@click.option('--connectors', type=click.INT, default=4,
+              help="Node connectors per node")
+@click.option('--tables', type=click.INT, default=0,
+              help="Flow tables (with statistics) per node")
+@click.option('--latency', type=click.STRING, multiple=True,
+              help="[ROUTE=]SECONDS or [ROUTE=]MIN-MAX added to requests")
+@click.option('--error-rate', type=click.STRING, multiple=True,
+              help="[ROUTE=]RATE of requests failing with --error-code")
+@click.option('--error-code', type=click.INT, default=503,
+              help="HTTP status of injected failures")
+@click.option('--user', type=click.STRING, help="Require this user")
+@click.option('--password', type=click.STRING, help="Require this password")
+@click.option('--ignore-query-params', is_flag=True, default=False,
+              help="Ignore the fields and depth of reads")
+def fake_server(host, port, nodes, connectors, tables, latency,
+                error_rate, error_code, user, password, ignore_query_params):
+    """Runs an in-memory stand-in Flow Manager.
+
+    Routes for --latency and --error-rate: path, treepath, eline, etree,
+    tap, stats, inventory, status, token, jolokia, other or * (default).
+    """
+    from lfmcli.fakeserver import FakeFlowManager, parse_latency, \
+        parse_route_values
+
+    try:
+        latency = parse_route_values(latency, parse_latency)
+        error_rate = parse_route_values(error_rate)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+    server = FakeFlowManager(host=host, port=port, nodes=nodes,
+                             connectors=connectors, tables=tables,
+                             latency=latency, error_rate=error_rate,
+                             error_code=error_code, user=user,
+                             password=password,
+                             query_params=not ignore_query_params)
+    click.echo("Fake Flow Manager listening on {}:{}".format(host,
+                                                             server.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
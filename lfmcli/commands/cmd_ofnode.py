@@ -1,5 +1,7 @@
 import click
-from lfmcli.context import pass_context
+from lfmcli.context import cache_option, pass_context
+from lfmcli.commands.selection import read_options
+from lfmcli.commands.reporting import echo_all_stats, echo_entries
 
 
 @click.group()
@@ -8,10 +10,16 @@ def ofnode():
 
 
 @ofnode.command(name='list')
+@read_options
+@cache_option
 @pass_context
-def lst(ctx):
+def lst(ctx, fields, depth):
+    if ctx.output != 'json-pretty':
+        return echo_entries(ctx, 'nodes', "No OF Nodes Found",
+                            fields, depth)
+
     fm = ctx.fm
-    result = fm.get_ofnodes()
+    result = fm.get_ofnodes(fields=fields, depth=depth)
     nodes = result.get('nodes')
 
     if nodes is not None and len(nodes) > 0:
@@ -22,12 +30,43 @@ def lst(ctx):
 
 @ofnode.command()
 @click.argument('node', type=click.STRING)
+@read_options
+@cache_option
 @pass_context
-def get(ctx, node):
+def get(ctx, node, fields, depth):
     fm = ctx.fm
-    result = fm.get_ofnode(node)
+    result = fm.get_ofnode(node, fields=fields, depth=depth)
     nodes = [result.get('node')]
     if nodes is not None and len(nodes) > 0:
         ctx.print_json(nodes)
     else:
-        click.echo("OF node {} not found".format(node))
\ No newline at end of file
+        click.echo("OF node {} not found".format(node))
+
+@ofnode.command()
+@click.argument('node', type=click.STRING, required=False)
+@click.argument('connector', type=click.STRING, required=False)
+@click.option('--all', 'all_', is_flag=True, default=False,
+              help="Stats of every connector of every OF node")
+@click.option('--workers', type=click.INT, default=8,
+              help="Concurrent node requests (large inventories)")
+@click.option('--format', 'fmt', type=click.Choice(['table', 'ndjson']),
+              default='table', help="Output of NODE or --all")
+@pass_context
+def stats(ctx, node, connector, all_, workers, fmt):
+    if all_ == (node is not None):
+        raise click.UsageError("Give either NODE [CONNECTOR] or --all")
+    fm = ctx.fm
+
+    if connector is None:
+        nodes = None if all_ else [node]
+        echo_all_stats(
+            lambda workers: fm.iter_connector_stats(nodes, workers),
+            workers, fmt)
+        return
+
+    result = fm.get_ofnode_connector_stats(node, connector)
+    stats = result.get('stats')
+    if stats is None:
+        click.echo("No stats found for connector {}".format(connector))
+    else:
+        ctx.print_json(stats)
@@ -0,0 +1,76 @@
+import time
+
+import click
+from lfmcli.context import pass_context
+
+
+@click.group()
+def snapshot():
+    pass
+
+
+@snapshot.command()
+@click.option('--filename', '-f', type=click.Path(dir_okay=False),
+              required=True, help="Snapshot file to write (gzip json)")
+@click.option('--workers', type=click.INT, default=8,
+              help="Concurrent requests")
+@click.option('--tap-reads', is_flag=True, default=False,
+              help="Read the taps of every eline endpoint on their own "
+                   "instead of with the elines")
+@pass_context
+def export(ctx, filename, workers, tap_reads):
+    """Save the services of the controller"""
+    from lfmcli.manifest import KINDS
+    from lfmcli.snapshot import SnapshotException, export_snapshot, \
+        write_snapshot
+
+    start = time.time()
+    try:
+        snap = export_snapshot(ctx.fm, workers=workers, tap_reads=tap_reads)
+    except SnapshotException as e:
+        raise click.ClickException(e.msg)
+    write_snapshot(snap, filename)
+
+    click.echo('{} in {}s: {}'.format(
+        filename, round(time.time() - start, 3),
+        ', '.join('{} {}'.format(snap['counts'][kind], kind)
+                  for kind in KINDS)))
+
+
+@snapshot.command()
+@click.option('--filename', '-f', type=click.Path(exists=True,
+                                                  dir_okay=False),
+              required=True, help="Snapshot file written by export")
+@click.option('--workers', type=click.INT, default=8,
+              help="Concurrent requests")
+@click.option('--chunk-size', type=click.INT,
+              help="Entries per YANG-Patch request")
+@click.option('--quiet', '-q', is_flag=True, default=False,
+              help="Only print the summary")
+@pass_context
+def restore(ctx, filename, workers, chunk_size, quiet):
+    """Create the services of a snapshot"""
+    from lfmcli.snapshot import SnapshotException, read_snapshot, \
+        restore_snapshot
+
+    try:
+        snap = read_snapshot(filename)
+    except SnapshotException as e:
+        raise click.BadParameter(e.msg, param_hint='--filename')
+
+    def progress(result):
+        if not quiet:
+            click.echo('{status:8} {kind:9} {name}'.format(**result),
+                       err=True)
+
+    report = restore_snapshot(ctx.fm, snap, workers=workers,
+                              chunk_size=chunk_size, progress=progress)
+
+    for error in report['errors']:
+        click.echo('{kind} {name}: {status_code} {error}'.format(**error),
+                   err=True)
+    click.echo('{items} items in {seconds}s ({items_per_sec} items/s): '
+               '{ok} ok, {failed} failed, {skipped} skipped'.format(**report))
+
+    if report['failed'] or report['skipped']:
+        click.get_current_context().exit(1)
@@ -0,0 +1,45 @@
+import click
+from lfmcli.context import pass_context
+
+
+@click.command()
+@click.option('--filename', '-f', type=click.File('r'), required=True,
+              help="YAML or JSON manifest of the desired services "
+                   "('-' for stdin)")
+@click.option('--prune', is_flag=True, default=False,
+              help="Delete the services missing from the manifest")
+@click.option('--dry-run', is_flag=True, default=False,
+              help="Only print the changes")
+@click.option('--workers', type=click.INT, default=8,
+              help="Concurrent requests")
+@pass_context
+def sync(ctx, filename, prune, dry_run, workers):
+    """Reconcile the services with a manifest"""
+    from lfmcli.manifest import ManifestException, load_manifest
+    from lfmcli.reconcile import ReconcileException, sync as reconcile
+
+    try:
+        manifest = load_manifest(filename)
+    except ManifestException as e:
+        raise click.BadParameter(e.msg, param_hint='--filename')
+
+    def progress(result):
+        click.echo('{status:8} {kind:9} {name}'.format(**result), err=True)
+
+    try:
+        report = reconcile(ctx.fm, manifest, prune=prune, dry_run=dry_run,
+                           workers=workers, progress=progress)
+    except ReconcileException as e:
+        raise click.ClickException(e.msg)
+
+    if dry_run:
+        for action in report['actions']:
+            click.echo('{op:8} {kind:9} {name}'.format(**action))
+    for error in report['errors']:
+        click.echo('{kind} {name}: {status_code} {error}'.format(**error),
+                   err=True)
+    click.echo('{create} to create, {update} to update, {delete} to delete, '
+               '{unchanged} unchanged ({seconds}s)'.format(**report))
+
+    if report['failed'] or report['skipped']:
+        click.get_current_context().exit(1)
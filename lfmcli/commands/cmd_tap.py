@@ -1,5 +1,5 @@
 import click
-from lfmcli.context import pass_context
+from lfmcli.context import cache_option, pass_context
 
 
 @click.group()
@@ -10,6 +10,7 @@ def tap():
 @tap.command()
 @click.argument('eline-name', type=click.STRING)
 @click.argument('endpoint', type=click.STRING)
+@cache_option
 @pass_context
 def get(ctx, eline_name, endpoint):
     fm = ctx.fm
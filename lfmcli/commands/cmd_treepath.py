@@ -1,5 +1,8 @@
 import click
-from lfmcli.context import pass_context
+from lfmcli.context import cache_option, pass_context
+from lfmcli.commands.reporting import echo_entries
+from lfmcli.commands.selection import batch_options, delete_selected, \
+    make_selector, read_options, selector_options
 
 
 @click.group()
@@ -8,10 +11,16 @@ def treepath():
 
 
 @treepath.command(name='list')
+@read_options
+@cache_option
 @pass_context
-def lst(ctx):
+def lst(ctx, fields, depth):
+    if ctx.output != 'json-pretty':
+        return echo_entries(ctx, 'treepaths', "No Treepaths found",
+                            fields, depth)
+
     fm = ctx.fm
-    result = fm.get_treepaths()
+    result = fm.get_treepaths(fields=fields, depth=depth)
     paths = result.get('treepaths')
 
     if paths is not None and len(paths) > 0:
@@ -22,10 +31,12 @@ def lst(ctx):
 
 @treepath.command()
 @click.argument('name', type=click.STRING)
+@read_options
+@cache_option
 @pass_context
-def get(ctx, name):
+def get(ctx, name, fields, depth):
     fm = ctx.fm
-    result = fm.get_treepath(name)
+    result = fm.get_treepath(name, fields=fields, depth=depth)
     paths = [result.get('treepaths')]
 
     if paths is not None and len(paths) > 0:
@@ -87,8 +98,14 @@ def add(ctx, self, name, root_switch,
 
 
 @treepath.command()
+@batch_options
 @pass_context
-def purge(ctx):
+def purge(ctx, batch_size, workers):
+    if batch_size:
+        delete_selected(ctx, 'treepaths', 'Treepaths', make_selector(),
+                        workers, batch_size)
+        return
+
     fm = ctx.fm
     result = fm.delete_treepaths()
 
@@ -102,9 +119,19 @@ def purge(ctx):
 
 
 @treepath.command()
-@click.argument('name', type=click.STRING)
+@click.argument('name', type=click.STRING, required=False)
+@selector_options
 @pass_context
-def delete(ctx, name):
+def delete(ctx, name, prefix, regex, provider, node, segmentation_id,
+           dry_run, batch_size, workers):
+    selector = make_selector(prefix, regex, provider, node, segmentation_id)
+    if bool(selector) == (name is not None):
+        raise click.UsageError("Give either NAME or selector options")
+    if selector:
+        delete_selected(ctx, 'treepaths', 'Treepaths', selector, workers,
+                        batch_size, dry_run)
+        return
+
     fm = ctx.fm
     result = fm.delete_treepath(name)
 
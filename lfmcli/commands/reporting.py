@@ -0,0 +1,82 @@
+import click
+
+
+def echo_entries(ctx, kind, empty, fields=None, depth=None):
+    """ Echoes the entries of a list command in the --output format
+
+    Entries are streamed (see Client.iter_elines) unless fields, depth or
+    cached reads need the whole response.
+
+    :param kind: 'paths', 'treepaths', 'elines', 'etrees' or 'nodes'
+    :param empty: message when there is no entry
+    """
+    from lfmcli.api import FlowManagerClientException
+    from lfmcli.reconcile import ReconcileException, live_entries
+
+    fm = ctx.fm
+    cached = fm.ctrl.cache is not None and fm.ctrl.cache_mode == 'cached'
+    try:
+        if fields or depth or cached:
+            if kind == 'nodes':
+                r = fm.get_ofnodes(fields=fields, depth=depth)
+                entries = r['nodes'] if r.get('status_code') == 200 else \
+                    live_entries(r, kind)
+            else:
+                r = getattr(fm, 'get_' + kind)(fields=fields, depth=depth)
+                entries = live_entries(r, kind)
+        else:
+            entries = getattr(fm, 'iter_' + kind)()
+        count = ctx.print_entries(entries)
+    except (FlowManagerClientException, ReconcileException) as e:
+        raise click.ClickException(e.msg)
+
+    if not count:
+        click.echo(empty, err=True)
+
+
+def echo_all_stats(iter_stats, workers, fmt):
+    """ Echoes the stats of every service (or connector) as ndjson or a
+    table
+
+    :param iter_stats: Client.iter_eline_stats, iter_etree_stats or a
+                       function of workers returning stats dicts
+    """
+    from lfmcli.api import FlowManagerClientException
+    from lfmcli.stats import write_stats
+
+    try:
+        count, errors = write_stats(iter_stats(workers=workers), fmt,
+                                    click.echo)
+    except FlowManagerClientException as e:
+        raise click.ClickException(e.msg)
+
+    click.echo("{} results, {} errors".format(count, errors), err=True)
+    if errors:
+        click.get_current_context().exit(1)
+
+
+def echo_watch(name, samples):
+    """ Echoes watch dicts (see Client.watch_stats) until interrupted """
+    import time
+
+    try:
+        for sample in samples:
+            header = '{} {}'.format(
+                time.strftime('%H:%M:%S', time.localtime(sample['time'])),
+                name)
+            if sample['error']:
+                click.echo('{} error: {}'.format(header, sample['error']))
+            elif sample['deltas'] is None:
+                click.echo('{} baseline, {} counters'.format(
+                    header, len(sample['counters'])))
+            else:
+                click.echo('{} ({:.2f}s)'.format(header, sample['seconds']))
+                width = max([len(key) for key in sample['deltas']] + [0])
+                for key in sorted(sample['deltas']):
+                    delta = sample['deltas'][key]
+                    click.echo('  {}  {:>14}  {:>14.1f}/s{}'.format(
+                        key.ljust(width), '+{}'.format(delta['delta']),
+                        delta['rate'] or 0,
+                        '  (reset)' if delta['reset'] else ''))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,103 @@
+import click
+
+
+def selector_options(func):
+    """ Adds the selector options of the bulk delete commands """
+    for option in reversed((
+            click.option('--prefix', type=click.STRING,
+                         help="Name prefix"),
+            click.option('--regex', type=click.STRING,
+                         help="Regular expression searched in the name"),
+            click.option('--provider', type=click.Choice(['sr', 'mpls'])),
+            click.option('--node', type=click.STRING,
+                         help="Node id of an endpoint (i.e. openflow:1)"),
+            click.option('--segmentation-id', type=click.STRING,
+                         help="Segmentation id (VLAN) ID or MIN-MAX range "
+                              "of an endpoint"),
+            click.option('--dry-run', is_flag=True, default=False,
+                         help="Only list the matching names"))):
+        func = option(func)
+    return batch_options(func)
+
+
+def batch_options(func):
+    """ Adds the concurrency options of the bulk delete commands """
+    func = click.option('--batch-size', type=click.IntRange(min=1),
+                        help="Delete in batches of that many entries per "
+                             "request")(func)
+    return click.option('--workers', type=click.INT, default=8,
+                        help="Concurrent requests")(func)
+
+
+def check_fields(click_ctx, param, value):
+    from lfmcli.fields import parse_fields
+
+    if value:
+        try:
+            parse_fields(value)
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+    return value
+
+
+def read_options(func):
+    """ Adds the RESTCONF fields and depth options of the list and get
+    commands
+    """
+    func = click.option('--depth', type=click.IntRange(1),
+                        help="Levels of the resource to read")(func)
+    return click.option('--fields', type=click.STRING,
+                        callback=check_fields,
+                        help="RESTCONF fields to read, i.e. "
+                             "'eline(name;endpoint1)'")(func)
+
+
+def make_selector(prefix=None, regex=None, provider=None, node=None,
+                  segmentation_id=None):
+    from lfmcli.selector import Selector, parse_range
+
+    try:
+        segmentation_ids = parse_range(segmentation_id) \
+            if segmentation_id is not None else None
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'--segmentation-id'")
+    for option, value in (('--prefix', prefix), ('--node', node)):
+        if value is not None and not value.strip():
+            raise click.BadParameter('empty value',
+                                     param_hint="'{}'".format(option))
+    try:
+        return Selector(prefix=prefix, regex=regex, provider=provider,
+                        node=node, segmentation_ids=segmentation_ids)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def delete_selected(ctx, kind, label, selector, workers=8, batch_size=None,
+                    dry_run=False):
+    """ Deletes the entries of kind matching selector, with progress """
+    from lfmcli.reconcile import ReconcileException
+    from lfmcli.selector import delete_names
+
+    try:
+        names = selector.select(ctx.fm, kind)
+    except ReconcileException as e:
+        raise click.ClickException(e.msg)
+
+    if dry_run or not names:
+        for name in names:
+            click.echo(name)
+        click.echo("{} {} matching".format(len(names), label))
+        return
+
+    with click.progressbar(length=len(names),
+                           label="Removing {}".format(label)) as bar:
+        report = delete_names(ctx.fm, kind, names, workers=workers,
+                              batch_size=batch_size,
+                              progress=lambda result: bar.update(1))
+
+    for error in report['errors']:
+        click.echo('{name}: {status_code} {error}'.format(**error), err=True)
+    click.echo("{} {} removed, {} failed".format(report['deleted'], label,
+                                                 report['failed']))
+    if report['failed']:
+        click.get_current_context().exit(1)
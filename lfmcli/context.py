@@ -1,10 +1,19 @@
 import click
 import json
-from api import Client as fmclient
-from topology import api as topology_api
+from output import write_entries, write_value
 
 CONTEXT_SETTINGS = dict(auto_envvar_prefix='FLOW_MANAGER')
 
+# Optional controller properties passed as is to the Controller
+TRANSPORT_PROPS = ('pool_connections', 'pool_maxsize', 'pool_block',
+                   'keep_alive', 'retries', 'backoff_factor', 'backoff_max',
+                   'retry_statuses', 'retry_rpc', 'breaker_threshold',
+                   'breaker_reset', 'member_failures', 'health_interval',
+                   'leader_routing', 'leader_ttl', 'shard_map', 'auth',
+                   'token_url', 'token_scope', 'token_cache',
+                   'bulk_chunk_size', 'inventory_max_nodes', 'cache',
+                   'cache_ttl', 'cache_mode', 'lean', 'lean_content')
+
 
 class Context(object):
 
@@ -20,9 +29,20 @@ class Context(object):
           'timeout': 5,
           'verify': self.verify
         }
-        self.fm = fmclient(**{'config':self.controller})
+        self._fm = None
+        self.output = 'json-pretty'
+        self.sort_keys = False
+
+    @property
+    def fm(self):
+        """ Client of the controller, built when a command first uses it """
+        if self._fm is None:
+            from api import Client as fmclient
+            self._fm = fmclient(**{'config':self.controller})
+        return self._fm
 
     def set_topology(self, topology_file):
+        from topology import api as topology_api
         self.topology = topology_api.read_topology(topology_file)
         if self.topology.controllers:
             controller = self.topology.controllers[0]
@@ -35,17 +55,64 @@ class Context(object):
             self.controller['password'] = controller['password']
             self.controller['protocol'] = controller['protocol']
             self.controller['port'] = controller['port']
-            self.fm = fmclient(**{'config':self.controller})
+            for prop in TRANSPORT_PROPS:
+                if prop in controller:
+                    self.controller[prop] = controller[prop]
+            if len(self.topology.controllers) > 1:
+                self.controller['members'] = [
+                    {'ip': member['ip'],
+                     'port': member.get('port', controller['port']),
+                     'protocol': member.get('protocol',
+                                            controller['protocol'])}
+                    for member in self.topology.controllers]
+            self._fm = None
 
     def set_verify(self, verify):
         self.verify = verify
         self.controller['verify'] = verify
 
+    def set_output(self, output, sort_keys=False):
+        self.output = output
+        self.sort_keys = sort_keys
+
     def print_json(self, result):
+        if self.output != 'json-pretty':
+            self.write(write_value, result)
+            return
         print json.dumps(result,
                          default=lambda o: o.__dict__,
                          sort_keys=True,
                          indent=4)
 
+    def print_entries(self, entries):
+        """ Prints list entries as they come (see lfmcli.output) """
+        return self.write(write_entries, entries)
+
+    def write(self, writer, value):
+        if self.output == 'json-compact':
+            count = writer(value, self.output,
+                           lambda text: click.echo(text, nl=False),
+                           self.sort_keys)
+            click.echo()
+            return count
+        return writer(value, self.output, click.echo, self.sort_keys)
+
+
+pass_context = click.make_pass_decorator(Context, ensure=True)
+
+
+def set_cache_mode(click_ctx, param, value):
+    if value is None:
+        return
+    ctx = click_ctx.ensure_object(Context)
+    if ctx.fm.ctrl.cache is None:
+        raise click.UsageError("No cache configured (controller 'cache' "
+                               "property of the topology)")
+    ctx.fm.set_cache_mode('cached' if value else 'refresh')
+
 
-pass_context = click.make_pass_decorator(Context, ensure=True)
\ No newline at end of file
+cache_option = click.option(
+    '--cached/--refresh', default=None, expose_value=False,
+    callback=set_cache_mode,
+    help="Answer from the local cache when fresh / read the controller and "
+         "update the cache")
\ No newline at end of file
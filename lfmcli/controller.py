@@ -1,7 +1,95 @@
 import json
+import threading
+import time
 import requests
 
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from requests.packages.urllib3.connectionpool import HTTPConnectionPool, \
+    HTTPSConnectionPool
+
+from lfmcli.auth import TokenAuth
+from lfmcli.cache import MODES as CACHE_MODES, StateCache
+from lfmcli.cluster import LeaderCache, MemberSet
+from lfmcli.retry import CircuitBreaker, CircuitOpenException, RetryPolicy
+
+JOLOKIA_READ = "/jolokia/read/org.opendaylight.controller:" \
+               "type=DistributedConfigDatastore,"
+
+
+# -----------------------------------------------------------------------------
+# Class 'ConnectionStats'
+# -----------------------------------------------------------------------------
+class ConnectionStats(object):
+    """ Thread safe counters for the connection pool of a Controller. """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+
+    def incr(self, counter):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def to_dict(self):
+        """ Returns a snapshot of the counters.
+
+        'requests' is the number of requests sent, 'connections' the number
+        of new connections opened and 'reused' the number of requests sent
+        over an already established (keep-alive) connection.
+
+        """
+        with self.lock:
+            return {'requests': self.requests,
+                    'connections': self.connections,
+                    'reused': max(self.requests - self.connections, 0)}
+
+
+def _counting_pool(base, stats):
+    """ Returns a urllib3 pool class that counts new connections. """
+
+    class CountingPool(base):
+
+        def _new_conn(self):
+            stats.incr('connections')
+            return base._new_conn(self)
+
+    return CountingPool
+
+
+# -----------------------------------------------------------------------------
+# Class 'PoolAdapter'
+# -----------------------------------------------------------------------------
+class PoolAdapter(HTTPAdapter):
+    """ HTTP adapter keeping keep-alive connections in a bounded pool.
+
+    Established connections (and so their TLS sessions) are reused across
+    requests, requests beyond the pool size either wait for a free
+    connection (pool_block) or use a throw away one.
+
+    """
+
+    def __init__(self, stats, **kwargs):
+        self.stats = stats
+        super(PoolAdapter, self).__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(PoolAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool(HTTPConnectionPool, self.stats),
+            'https': _counting_pool(HTTPSConnectionPool, self.stats)}
+
+    def send(self, request, **kwargs):
+        self.stats.incr('requests')
+        return super(PoolAdapter, self).send(request, **kwargs)
+
+
+def json_default(o):
+    """ json.dumps default hook that skips the transport internals. """
+    if hasattr(o, 'to_dict'):
+        return o.to_dict()
+    return o.__dict__
 
 
 # -----------------------------------------------------------------------------
@@ -22,18 +110,51 @@ class Controller():
         self.default_headers = {
             'content-type': 'application/json', 'accept': 'application/json'}
 
+        self.stats = ConnectionStats()
+        self.session = None
+        self.session_lock = threading.Lock()
+
+        self.retry = RetryPolicy.from_config(self.config)
+        self.breaker = CircuitBreaker(self.config['breaker_threshold'],
+                                      self.config['breaker_reset'],
+                                      self.config['ip'])
+        self.members = MemberSet.from_config(self.config)
+        self.leaders = LeaderCache(self.config['leader_ttl'])
+        self.auth = self.make_auth()
+        self.cache = self.make_cache()
+        self.cache_mode = self.config['cache_mode']
+
     def check_config(self, cfg):
         """Check properties and supply defaults."""
 
         req_props = ['ip', 'port', 'user', 'password']
 
         # defaults
-        props = {'protocol': 'http', 'timeout': 30, 'verify': True}
+        props = {'protocol': 'http', 'timeout': 30, 'verify': True,
+                 'pool_connections': 10, 'pool_maxsize': 10,
+                 'pool_block': False, 'keep_alive': True,
+                 'retries': 3, 'backoff_factor': 0.5, 'backoff_max': 10,
+                 'retry_statuses': [502, 503, 504], 'retry_rpc': False,
+                 'breaker_threshold': 5, 'breaker_reset': 30,
+                 'members': [], 'member_failures': 1, 'health_interval': 10,
+                 'leader_routing': True, 'leader_ttl': 60, 'shard_map': {},
+                 'auth': 'basic', 'token_url': None, 'token_scope': 'sdn',
+                 'token_cache': None, 'bulk_chunk_size': 500,
+                 'inventory_max_nodes': 1000, 'cache': None,
+                 'cache_ttl': 300, 'cache_mode': 'refresh', 'lean': False,
+                 'lean_content': False}
 
         for prop in req_props:
             if prop not in cfg:
                 raise Exception('can\'t find property {0}'.format(prop))
 
+        if cfg.get('auth', 'basic') not in ('basic', 'token'):
+            raise Exception('unknown auth {0}'.format(cfg['auth']))
+
+        if cfg.get('cache_mode', 'refresh') not in CACHE_MODES:
+            raise Exception('unknown cache_mode {0}'.format(
+                cfg['cache_mode']))
+
         # Update defaults with given props
         props.update(cfg)
 
@@ -47,9 +168,14 @@ class Controller():
         """ Returns string representation of this object. """
         return self.__str__()
 
+    def to_dict(self):
+        """ Returns dict representation of this object. """
+        return {'config': self.config,
+                'default_headers': self.default_headers}
+
     def to_json(self):
         """ Returns JSON representation of this object. """
-        return json.dumps(self, default=lambda o: o.__dict__, sort_keys=True,
+        return json.dumps(self, default=json_default, sort_keys=True,
                           indent=4)
 
     def brief_json(self):
@@ -62,6 +188,295 @@ class Controller():
         return json.dumps(d, default=lambda o: o.__dict__, sort_keys=True,
                           indent=4)
 
+    def make_auth(self):
+        """ Returns the requests auth for the configured 'auth' mode.
+
+        'basic' sends the credentials on every request, 'token' gets a
+        bearer token from 'token_url' (the controller oauth2 endpoint by
+        default) and reuses it until it expires, see TokenAuth.
+
+        """
+        if self.config['auth'] == 'token':
+            token_url = self.config['token_url'] or \
+                ("{}://{}:{}/oauth2/token").format(self.config['protocol'],
+                                                   self.config['ip'],
+                                                   self.config['port'])
+            return TokenAuth(lambda *args, **kwargs:
+                             self.get_session().post(*args, **kwargs),
+                             token_url,
+                             self.config['user'], self.config['password'],
+                             scope=self.config['token_scope'],
+                             cache_file=self.config['token_cache'],
+                             verify=self.config['verify'],
+                             timeout=self.config['timeout'])
+
+        return HTTPBasicAuth(self.config['user'], self.config['password'])
+
+    def make_cache(self):
+        """ Returns the StateCache of 'cache' (True for the default file),
+            or None.
+        """
+        if not self.config['cache']:
+            return None
+        return StateCache(
+            None if self.config['cache'] is True else self.config['cache'],
+            '{}:{}'.format(self.config['ip'], self.config['port']),
+            self.config['cache_ttl'])
+
+    def get_session(self):
+        """ Returns the pooled session shared by every request.
+
+        The session is created on first use, its adapter holds up to
+        'pool_connections' host pools of 'pool_maxsize' connections each.
+
+        """
+        with self.session_lock:
+            if self.session is None:
+                adapter = PoolAdapter(
+                    self.stats,
+                    pool_connections=self.config['pool_connections'],
+                    pool_maxsize=self.config['pool_maxsize'],
+                    pool_block=self.config['pool_block'])
+                session = requests.Session()
+                session.auth = self.auth
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self.session = session
+
+        return self.session
+
+    def get_pool_stats(self):
+        """ Returns the connection reuse counters (see ConnectionStats). """
+        return self.stats.to_dict()
+
+    def close(self):
+        """ Closes every pooled connection. """
+        with self.session_lock:
+            if self.session is not None:
+                self.session.close()
+                self.session = None
+
+    def is_read(self, method, url, idempotent=False):
+        """ Returns True for requests any cluster member can serve.
+
+        Those are the operational datastore reads and the RPCs flagged as
+        idempotent (get-stats).
+
+        """
+        if method == 'GET':
+            return url.startswith(self.get_operational_url())
+        if method == 'POST' and idempotent:
+            return url.startswith(self.get_operations_url())
+        return False
+
+    def is_write(self, method, url):
+        """ Returns True for config datastore writes. """
+        return method in ('PUT', 'DELETE', 'PATCH', 'POST') and \
+            url.startswith(self.get_config_url())
+
+    def get_shard(self, url):
+        """ Returns the config shard holding the module of a config url.
+
+        Modules live in the 'default' shard unless mapped otherwise by the
+        'shard_map' config property ({module: shard}).
+
+        """
+        module = url[len(self.get_config_url()):].lstrip('/').split(':')[0]
+        return self.config['shard_map'].get(module, 'default')
+
+    def jolokia_read(self, member, mbean):
+        """ Reads a datastore MBean attributes from a member's jolokia. """
+        resp = self.get_session().get(member.get_root_url() + JOLOKIA_READ +
+                                      mbean,
+                                      auth=HTTPBasicAuth(
+                                          self.config['user'],
+                                          self.config['password']),
+                                      headers=self.default_headers,
+                                      verify=self.config['verify'],
+                                      timeout=self.config['timeout'])
+        if resp.status_code != 200:
+            return {}
+        return resp.json().get('value') or {}
+
+    def discover_leader(self, shard):
+        """ Returns the member leading the config shard, None if unknown.
+
+        Each healthy member is asked (through jolokia) for the raft state of
+        its local replica of the shard.
+
+        """
+        for member in self.members:
+            if not member.is_healthy():
+                continue
+            try:
+                if member.name is None:
+                    member.name = self.jolokia_read(
+                        member, "Category=ShardManager,"
+                        "name=shard-manager-config").get('MemberName')
+                if member.name is None:
+                    continue
+                state = self.jolokia_read(
+                    member, "Category=Shards,name={}-shard-{}-config".format(
+                        member.name, shard)).get('RaftState')
+            except (requests.exceptions.RequestException, ValueError):
+                continue
+
+            if state == 'Leader':
+                return member
+
+        return None
+
+    def route(self, method, url, idempotent=False):
+        """ Picks where to send a request.
+
+        Reads are spread round robin over the healthy 'members', config
+        writes go straight to the leader of the module's shard (see
+        discover_leader). The rest, and everything while those are down or
+        unknown, go to the configured ip.
+
+        :return: (url, breaker) the url to send the request to and the
+                 circuit breaker recording its outcome
+        :raises CircuitOpenException: the configured ip is failing
+
+        """
+        member = None
+        if len(self.members):
+            if self.is_read(method, url, idempotent):
+                member = self.members.next_member()
+            elif self.config['leader_routing'] and self.is_write(method, url):
+                member = self.leaders.get(self.get_shard(url),
+                                          self.discover_leader)
+                try:
+                    if member is not None:
+                        member.breaker.allow()
+                except CircuitOpenException:
+                    member = None
+
+        if member is not None:
+            return (member.get_base_url() + url[len(self.get_base_url()):],
+                    member.breaker)
+
+        self.breaker.allow()
+        return url, self.breaker
+
+    def leader_failed(self, method, url, breaker):
+        """ Drops the cached shard leader of a write that failed on it, the
+        next write discovers the leader again.
+        """
+        if breaker is not self.breaker and self.is_write(method, url):
+            self.leaders.invalidate(self.get_shard(url))
+
+    def check_members(self):
+        """ Health checks every cluster member.
+
+        :return: list of member dicts (ip, port, protocol, state, failures)
+
+        """
+        for member in self.members:
+            try:
+                resp = self.get_session().get(
+                    member.get_base_url() +
+                    "/operational/lumina-controller-status:system-status",
+                    headers=self.default_headers,
+                    verify=self.config['verify'],
+                    timeout=self.config['timeout'])
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout):
+                member.breaker.record_failure()
+                continue
+
+            if resp.status_code == 200:
+                member.breaker.record_success()
+            else:
+                member.breaker.record_failure()
+
+        return [member.to_dict() for member in self.members]
+
+    def http_request(self, method, url, data=None, headers=None,
+                     timeout=None, idempotent=False, stream=False):
+        """ Sends an HTTP request over the pooled session
+            and returns the response.
+
+        Idempotent methods (and RPCs flagged idempotent when 'retry_rpc' is
+        set) are retried with exponential backoff on connection errors,
+        timeouts and 'retry_statuses'. While the circuit breaker is open
+        requests fail fast with CircuitOpenException. Reads are load balanced
+        over the cluster members and writes sent to the shard leader (see
+        route), a retry goes to the next healthy member or the configured ip.
+        With token auth a 401 gets a new token and the request sent again.
+
+        :param string method: HTTP method (GET, POST, PUT, DELETE)
+        :param string url: The complete url including protocol
+        :param string data: The data to include in the body of the request.
+        :param dict headers: The headers to include in the request.
+        :param string timeout: Pass a timeout for longlived queries
+        :param bool idempotent: The request (RPC) has no side effect
+        :param bool stream: Read the body when it is iterated
+        :return: The response from the http request.
+        :rtype: `requests.response`
+
+        """
+
+        if headers is None:
+            headers = self.default_headers
+
+        if timeout is None:
+            timeout = self.config['timeout']
+
+        if not self.config['keep_alive']:
+            headers = dict(headers, connection='close')
+
+        if self.cache is not None and method != 'GET':
+            # whatever the outcome, the resource may have changed
+            self.cache.invalidate(url)
+
+        retryable = self.retry.is_retryable(method, idempotent)
+        refreshed = False
+        attempt = 0
+        while True:
+            target, breaker = self.route(method, url, idempotent)
+            retry_after = None
+            try:
+                resp = self.get_session().request(
+                    method, target, data=data, headers=headers,
+                    verify=self.config['verify'], timeout=timeout,
+                    stream=stream)
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout):
+                breaker.record_failure()
+                self.leader_failed(method, url, breaker)
+                if not retryable or attempt >= self.retry.retries:
+                    raise
+            except Exception:
+                # never leave a half open breaker without an outcome
+                breaker.record_failure()
+                self.leader_failed(method, url, breaker)
+                raise
+            else:
+                if resp.status_code == 401 and not refreshed and \
+                        isinstance(self.auth, TokenAuth):
+                    # token expired or revoked on the controller, which
+                    # answered: the probe of a half open breaker succeeded
+                    breaker.record_success()
+                    refreshed = True
+                    self.auth.invalidate(
+                        resp.request.headers['Authorization'][7:])
+                    continue
+
+                if not self.retry.is_retryable_status(resp.status_code):
+                    breaker.record_success()
+                    return resp
+
+                breaker.record_failure()
+                self.leader_failed(method, url, breaker)
+                if not retryable or attempt >= self.retry.retries:
+                    return resp
+                retry_after = resp.headers.get('retry-after')
+                resp.close()
+
+            time.sleep(self.retry.backoff(attempt, retry_after))
+            attempt += 1
+
     def http_get_request(self, url, headers=None, timeout=None):
         """ Sends HTTP GET request to a remote server
             and returns the response.
@@ -85,16 +500,46 @@ class Controller():
         if timeout is None:
             timeout = self.config['timeout']
 
-        resp = requests.get(url,
-                            auth=HTTPBasicAuth(self.config['user'],
-                                               self.config['password']),
-                            data=None, headers=headers,
-                            verify=self.config['verify'],
-                            timeout=timeout)
+        use_cache = self.cache is not None and self.cache_mode != 'off'
+        if use_cache and self.cache_mode == 'cached':
+            resp = self.cache.get(url)
+            if resp is not None:
+                return resp
+
+        resp = self.http_request('GET', url, data=None, headers=headers,
+                                 timeout=timeout)
+
+        if use_cache and resp.status_code == 200:
+            self.cache.put(url, resp)
 
         return (resp)
 
-    def http_post_request(self, url, data, headers=None):
+    def http_stream_request(self, url, headers=None, timeout=None):
+        """ Sends HTTP GET request to a remote server
+            and returns the response before reading its body.
+
+        The body is read while iterating the response (i.e.
+        resp.iter_content), close the response when done. The state cache
+        is not used.
+
+        :param string url: The complete url including protocol
+        :param dict headers: The headers to include in the request.
+        :param string timeout: Pass a timeout for longlived queries
+        :return: The response from the http request.
+        :rtype: `requests.response`
+
+        """
+
+        if headers is None:
+            headers = self.default_headers
+
+        if timeout is None:
+            timeout = self.config['timeout']
+
+        return self.http_request('GET', url, data=None, headers=headers,
+                                 timeout=timeout, stream=True)
+
+    def http_post_request(self, url, data, headers=None, idempotent=False):
         """ Sends HTTP POST request to a remote server
             and returns the response.
 
@@ -103,6 +548,8 @@ class Controller():
         :param string data: The data to include in the body of the request.
                             Typically set to None.
         :param dict headers: The headers to include in the request.
+        :param bool idempotent: The RPC has no side effect and may be
+                                retried if 'retry_rpc' is set
         :return: The response from the http request.
         :rtype: None or `requests.response`
             <http://docs.python-requests.org/en/latest/api/#requests.Response>
@@ -114,12 +561,9 @@ class Controller():
 
         resp = None
 
-        resp = requests.post(url,
-                             auth=HTTPBasicAuth(self.config['user'],
-                                                self.config['password']),
-                             data=data, headers=headers,
-                             verify=self.config['verify'],
-                             timeout=self.config['timeout'])
+        resp = self.http_request('POST', url, data=data, headers=headers,
+                                 timeout=self.config['timeout'],
+                                 idempotent=idempotent)
 
         return (resp)
 
@@ -143,12 +587,35 @@ class Controller():
 
         resp = None
 
-        resp = requests.put(url,
-                            auth=HTTPBasicAuth(self.config['user'],
-                                               self.config['password']),
-                            data=data, headers=headers,
-                            verify=self.config['verify'],
-                            timeout=self.config['timeout'])
+        resp = self.http_request('PUT', url, data=data, headers=headers,
+                                 timeout=self.config['timeout'])
+
+        return (resp)
+
+    def http_patch_request(self, url, data, headers=None, idempotent=False):
+        """ Sends HTTP PATCH request to a remote server
+            and returns the response.
+
+        :param string url: The complete url including protocol:
+                           http://www.example.com/path/to/resource
+        :param string data: The data to include in the body of the request.
+        :param dict headers: The headers to include in the request.
+        :param bool idempotent: The patch only merges/removes data and may be
+                                retried
+        :return: The response from the http request.
+        :rtype: None or `requests.response`
+            <http://docs.python-requests.org/en/latest/api/#requests.Response>
+
+        """
+
+        if headers is None:
+            headers = self.default_headers
+
+        resp = None
+
+        resp = self.http_request('PATCH', url, data=data, headers=headers,
+                                 timeout=self.config['timeout'],
+                                 idempotent=idempotent)
 
         return (resp)
 
@@ -172,12 +639,8 @@ class Controller():
 
         resp = None
 
-        resp = requests.delete(url,
-                               auth=HTTPBasicAuth(self.config['user'],
-                                                  self.config['password']),
-                               data=data, headers=headers,
-                               verify=self.config['verify'],
-                               timeout=self.config['timeout'])
+        resp = self.http_request('DELETE', url, data=data, headers=headers,
+                                 timeout=self.config['timeout'])
 
         return (resp)
 
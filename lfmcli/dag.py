@@ -0,0 +1,178 @@
+""" Concurrent execution of operations depending on each other.
+
+Operations are added to a Dag with the keys of the operations they depend
+on, then run by execute: every operation whose dependencies succeeded is
+started right away (up to workers at a time), and the operations depending
+on a failed one are skipped, the rest of the graph going on::
+
+    dag = Dag()
+    dag.add(('paths', 'p1'), path)
+    dag.add(('elines', 'e1'), eline, depends=[('paths', 'p1')])
+    for key, result in execute(dag, create, workers=16):
+        ...
+
+Dependencies that are not in the graph are taken as already satisfied.
+"""
+import sys
+from multiprocessing.pool import ThreadPool
+
+try:
+    from Queue import Queue
+except ImportError:
+    from queue import Queue
+
+
+if sys.version_info[0] >= 3:
+    def reraise(exc_info):
+        """ Raises an exception again with its original traceback """
+        raise exc_info[1].with_traceback(exc_info[2])
+else:
+    exec('def reraise(exc_info):\n'
+         '    """ Raises an exception again with its original traceback'
+         ' """\n'
+         '    raise exc_info[0], exc_info[1], exc_info[2]\n')
+
+
+class DagException(Exception):
+    """Invalid graph of operations"""
+
+    def __init__(self, msg):
+        self.msg = msg
+
+    def __str__(self):
+        return repr(self.msg)
+
+
+# -----------------------------------------------------------------------------
+# Class 'Dag'
+# -----------------------------------------------------------------------------
+class Dag(object):
+    """ Operations (any item) by key, and the keys they depend on """
+
+    def __init__(self):
+        self.items = {}
+        self.depends = {}
+        self.keys = []
+
+    def add(self, key, item, depends=()):
+        """ Adds an operation.
+
+        :param key: unique hashable key of the operation
+        :param item: value passed to the function run by execute
+        :param depends: keys of the operations to run first
+        :raise DagException: on a duplicate key
+
+        """
+        if key in self.items:
+            raise DagException('duplicate operation {!r}'.format(key))
+        self.items[key] = item
+        self.depends[key] = list(depends)
+        self.keys.append(key)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def dependents(self):
+        """ Returns {key: keys of the operations depending on it}.
+
+        :raise DagException: when the dependencies have a cycle
+
+        """
+        dependents = dict((key, []) for key in self.keys)
+        remaining = {}
+        for key in self.keys:
+            depends = set(dep for dep in self.depends[key] if dep in self)
+            remaining[key] = len(depends)
+            for dep in depends:
+                dependents[dep].append(key)
+
+        # Kahn's algorithm, what is left is on a cycle
+        ready = [key for key in self.keys if not remaining[key]]
+        while ready:
+            for dependent in dependents[ready.pop()]:
+                remaining[dependent] -= 1
+                if not remaining[dependent]:
+                    ready.append(dependent)
+        cycle = [key for key in self.keys if remaining[key]]
+        if cycle:
+            raise DagException('dependency cycle between {}'.format(
+                ', '.join(repr(key) for key in cycle)))
+        return dependents
+
+
+def execute(dag, func, workers=8, ok=None, skip=None):
+    """ Runs the operations of a dag in dependency order.
+
+    Results are yielded as they complete, the dependents of an operation
+    are started once its result was consumed. Exceptions raised by func
+    stop the run and are propagated, func should catch the ones that only
+    fail its operation.
+
+    :param dag: Dag of the operations
+    :param func: function called with the item of each operation
+    :param workers: number of concurrent calls, 1 runs them in the caller
+    :param ok: function of (key, result), whether the dependents of key
+               may run (default: always)
+    :param skip: function of (key, item, failed keys) giving the result of
+                 a skipped operation (default: None), skipped operations
+                 count as failed
+    :return: generator of (key, result), for every operation
+    :raise DagException: when the dependencies have a cycle
+
+    """
+    ok = ok or (lambda key, result: True)
+    skip = skip or (lambda key, item, failed: None)
+    dependents = dag.dependents()
+    remaining = dict((key, len(set(dep for dep in dag.depends[key]
+                                   if dep in dag)))
+                     for key in dag.keys)
+    pending = set(dag.keys)
+    done = Queue()
+
+    def call(key):
+        try:
+            done.put((key, func(dag.items[key]), False, None))
+        except Exception:
+            done.put((key, None, False, sys.exc_info()))
+
+    pool = ThreadPool(workers) if workers > 1 else None
+
+    def start(key):
+        pending.discard(key)
+        if pool is None:
+            call(key)
+        else:
+            pool.apply_async(call, (key,))
+
+    def cancel(key, failed):
+        pending.discard(key)
+        done.put((key, skip(key, dag.items[key], failed), True, None))
+
+    try:
+        for key in dag.keys:
+            if not remaining[key]:
+                start(key)
+
+        for _ in range(len(dag)):
+            key, result, skipped, error = done.get()
+            if error is not None:
+                reraise(error)
+            yield key, result
+
+            succeeded = not skipped and ok(key, result)
+            for dependent in dependents[key]:
+                if dependent not in pending:
+                    continue
+                if not succeeded:
+                    cancel(dependent, [key])
+                    continue
+                remaining[dependent] -= 1
+                if not remaining[dependent]:
+                    start(dependent)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
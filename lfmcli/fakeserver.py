@@ -0,0 +1,691 @@
+""" In-memory stand-in for a Flow Manager controller.
+
+Serves the RESTCONF resources used by lfmcli.api.Client (lumina-flowmanager
+paths, treepaths, elines, etrees and taps, their get-stats RPCs, the
+opendaylight-inventory nodes, the flow:1 network-topology nodes and
+lumina-controller-status) plus the oauth2
+token endpoint and the jolokia shard MBeans. Per route latency and error
+rates can be injected to benchmark and load test the client offline::
+
+    with FakeFlowManager(nodes=5000, connectors=20) as server:
+        fm = Client(config=server.client_config())
+
+or from the command line ``lfm fake-server --nodes 5000 --connectors 20``.
+"""
+import base64
+import collections
+import json
+import random
+import threading
+import time
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urllib import unquote
+    from urlparse import parse_qs
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, unquote
+
+from lfmcli.fields import select
+
+INVENTORY = 'opendaylight-inventory:nodes'
+TOPOLOGY = 'network-topology:network-topology'
+CONTROLLER_STATUS = 'lumina-controller-status:system-status'
+OFNODE_CONN_STATS = \
+    'opendaylight-port-statistics:flow-capable-node-connector-statistics'
+
+# Key leaf of every YANG list the client addresses
+LIST_KEYS = {'path': 'name', 'treepath': 'name', 'eline': 'name',
+             'etree': 'name', 'leaf': 'node', 'tap': 'path-name',
+             'node': 'id', 'node-connector': 'id', 'topology': 'topology-id'}
+
+# List names answered with their augmentation prefix
+RESPONSE_NAMES = {'tap': 'lumina-flowmanager-eline-tap:tap'}
+
+# Route (used for latency and error injection) of each top level module
+MODULE_ROUTES = {'lumina-flowmanager-path': 'path',
+                 'lumina-flowmanager-tree-path': 'treepath',
+                 'lumina-flowmanager-eline': 'eline',
+                 'lumina-flowmanager-etree': 'etree',
+                 'opendaylight-inventory': 'inventory',
+                 'network-topology': 'inventory',
+                 'lumina-controller-status': 'status'}
+
+ROUTES = ('path', 'treepath', 'eline', 'etree', 'tap', 'stats', 'inventory',
+          'status', 'token', 'jolokia', 'other')
+
+
+class FakeServerException(Exception):
+    """Fake server request error, turned into a RESTCONF error reply"""
+
+    def __init__(self, status, tag, msg):
+        self.status = status
+        self.tag = tag
+        self.msg = msg
+
+    def __str__(self):
+        return repr(self.msg)
+
+
+def parse_route_values(specs, convert=float):
+    """ Parses ROUTE=VALUE options into a {route: value} dict.
+
+    A spec without route ('0.01') or with route '*' sets the default used
+    by every route.
+
+    """
+    values = {}
+    for spec in specs or ():
+        route, _, value = spec.rpartition('=')
+        route = route or '*'
+        if route != '*' and route not in ROUTES:
+            raise ValueError('unknown route {}, one of {}'.format(
+                route, ', '.join(ROUTES)))
+        values[route] = convert(value)
+    return values
+
+
+def parse_latency(value):
+    """ Parses 'SECONDS' or 'MIN-MAX' into a (min, max) tuple. """
+    low, _, high = value.partition('-')
+    return (float(low), float(high or low))
+
+
+def merge_node(old, new, name=None):
+    """ Merges new into old (RESTCONF merge), list entries by their key. """
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            old[key] = merge_node(old[key], value, key.split(':')[-1]) \
+                if key in old else value
+        return old
+
+    key_leaf = LIST_KEYS.get(name)
+    if isinstance(old, list) and isinstance(new, list) and key_leaf:
+        index = dict((str(entry.get(key_leaf)), i)
+                     for i, entry in enumerate(old))
+        for entry in new:
+            i = index.get(str(entry.get(key_leaf)))
+            if i is None:
+                old.append(entry)
+            else:
+                old[i] = merge_node(old[i], entry)
+        return old
+
+    return new
+
+
+# -----------------------------------------------------------------------------
+# Class 'Datastore'
+# -----------------------------------------------------------------------------
+class Datastore(object):
+    """ RESTCONF style JSON tree addressed by url segments. """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.roots = {}
+
+    @staticmethod
+    def child_key(node, name):
+        """ Returns the key of child name in node, ignoring module prefix. """
+        if name in node:
+            return name
+        for key in node:
+            if key.split(':')[-1] == name:
+                return key
+        return None
+
+    def walk(self, segments, create=False):
+        """ Returns (parent, key, list name) of the node segments point to.
+
+        parent[key] is the addressed node, list name is set when it is a
+        list entry. Returns None when the node does not exist (and create is
+        not set).
+
+        """
+        name = segments[0]
+        if name not in self.roots:
+            if not create:
+                return None
+            self.roots[name] = {}
+
+        parent, key, list_name = self.roots, name, None
+        i = 1
+        while i < len(segments):
+            node = parent[key]
+            segment = segments[i]
+            child = self.child_key(node, segment)
+            if segment in LIST_KEYS and i + 1 < len(segments):
+                if child is None:
+                    if not create:
+                        return None
+                    child = segment
+                    node[child] = []
+                entries = node[child]
+                value = unquote(segments[i + 1])
+                key_leaf = LIST_KEYS[segment]
+                index = None
+                for j, entry in enumerate(entries):
+                    if str(entry.get(key_leaf)) == value:
+                        index = j
+                        break
+                if index is None:
+                    if not create:
+                        return None
+                    entries.append({key_leaf: value})
+                    index = len(entries) - 1
+                parent, key, list_name = entries, index, segment
+                i += 2
+            else:
+                if child is None:
+                    if not create:
+                        return None
+                    child = segment
+                    node[child] = {}
+                parent, key, list_name = node, child, None
+                i += 1
+
+        return parent, key, list_name
+
+    def get(self, segments):
+        with self.lock:
+            found = self.walk(segments)
+            if found is None:
+                raise FakeServerException(404, 'data-missing',
+                                          'Request could not be completed '
+                                          'because the relevant data model '
+                                          'content does not exist')
+            parent, key, list_name = found
+            if list_name is not None:
+                return {RESPONSE_NAMES.get(list_name, list_name):
+                        [parent[key]]}
+            if parent is self.roots:
+                return {key.split(':')[-1]: parent[key]}
+            return {key: parent[key]}
+
+    def put(self, segments, body):
+        if not isinstance(body, dict) or len(body) != 1:
+            raise FakeServerException(400, 'malformed-message',
+                                      'Expected a single top level node')
+        value = list(body.values())[0]
+        with self.lock:
+            existed = self.walk(segments) is not None
+            parent, key, list_name = self.walk(segments, create=True)
+            if list_name is not None:
+                if not isinstance(value, list) or len(value) != 1:
+                    raise FakeServerException(400, 'malformed-message',
+                                              'Expected a single list entry')
+                value = value[0]
+            parent[key] = value
+            return existed
+
+    def merge(self, segments, body):
+        if not isinstance(body, dict) or len(body) != 1:
+            raise FakeServerException(400, 'malformed-message',
+                                      'Expected a single top level node')
+        value = list(body.values())[0]
+        with self.lock:
+            parent, key, list_name = self.walk(segments, create=True)
+            if list_name is not None:
+                if not isinstance(value, list) or len(value) != 1:
+                    raise FakeServerException(400, 'malformed-message',
+                                              'Expected a single list entry')
+                value = value[0]
+            parent[key] = merge_node(parent[key], value,
+                                     str(key).split(':')[-1])
+
+    def delete(self, segments):
+        with self.lock:
+            found = self.walk(segments)
+            if found is None:
+                raise FakeServerException(404, 'data-missing',
+                                          'Data does not exist')
+            parent, key, list_name = found
+            del parent[key]
+
+
+# -----------------------------------------------------------------------------
+# Class 'FakeFlowManager'
+# -----------------------------------------------------------------------------
+class FakeFlowManager(object):
+    """ Threaded HTTP server emulating a Flow Manager controller.
+
+    :param nodes: number of openflow nodes in the inventory
+    :param connectors: node connectors (ports) per node
+    :param tables: flow tables (with statistics) per node
+    :param latency: {route: (min, max)} seconds added to each request,
+                    route '*' applies to every route
+    :param error_rate: {route: rate} ratio of requests failing with
+                       error_code, route '*' applies to every route
+    :param user: when set (with password) requests must authenticate
+    :param query_params: apply the fields and depth query parameters of
+                         reads (False to behave like older controllers)
+
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, nodes=10, connectors=4,
+                 tables=0, latency=None, error_rate=None, error_code=503,
+                 user=None, password=None, seed=None, query_params=True):
+        self.host = host
+        self.query_params = query_params
+        self.latency = latency or {}
+        self.error_rate = error_rate or {}
+        self.error_code = error_code
+        self.user = user
+        self.password = password
+        self.random = random.Random(seed)
+        self.config = Datastore()
+        self.operational = Datastore()
+        self.created = {}
+        self.tokens = set()
+        self.counters = collections.Counter()
+        self.counters_lock = threading.Lock()
+        self.inventory_body = None
+        self.thread = None
+
+        self.operational.roots[INVENTORY] = {
+            'node': [self.make_node(i, connectors, tables)
+                     for i in range(1, nodes + 1)]}
+        self.operational.roots[TOPOLOGY] = {'topology': [{
+            'topology-id': 'flow:1',
+            'node': [{'node-id': node['id'], 'termination-point': [
+                {'tp-id': connector['id']}
+                for connector in node['node-connector']]}
+                for node in self.operational.roots[INVENTORY]['node']]}]}
+        self.operational.roots[CONTROLLER_STATUS] = {
+            'status': 'ACTIVE', 'started': time.time()}
+
+        self.httpd = ThreadingHTTPServer((host, port), FakeRequestHandler)
+        self.httpd.fake = self
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    def client_config(self, **kwargs):
+        """ Returns a Client config pointing at this server. """
+        config = {'ip': self.host, 'port': self.port,
+                  'user': self.user or 'admin',
+                  'password': self.password or 'admin',
+                  'protocol': 'http'}
+        config.update(kwargs)
+        return config
+
+    def make_node(self, i, connectors, tables):
+        node_id = 'openflow:{}'.format(i)
+        node = {
+            'id': node_id,
+            'flow-node-inventory:manufacturer': 'Nicira, Inc.',
+            'flow-node-inventory:hardware': 'Open vSwitch',
+            'flow-node-inventory:software': '2.5.0',
+            'flow-node-inventory:ip-address': '10.{}.{}.{}'.format(
+                (i >> 16) & 255, (i >> 8) & 255, i & 255),
+            'node-connector': []}
+
+        for j in range(1, connectors + 1):
+            packets = self.random.randint(0, 10 ** 9)
+            node['node-connector'].append({
+                'id': '{}:{}'.format(node_id, j),
+                'flow-node-inventory:port-number': j,
+                'flow-node-inventory:name': 's{}-eth{}'.format(i, j),
+                'flow-node-inventory:hardware-address':
+                    '02:00:{:02x}:{:02x}:{:02x}:{:02x}'.format(
+                        (i >> 8) & 255, i & 255, (j >> 8) & 255, j & 255),
+                'flow-node-inventory:current-speed': 10000000,
+                'flow-node-inventory:state': {
+                    'link-down': False, 'blocked': False, 'live': True},
+                OFNODE_CONN_STATS: {
+                    'packets': {'received': packets,
+                                'transmitted': packets // 2},
+                    'bytes': {'received': packets * 512,
+                              'transmitted': packets * 256},
+                    'receive-drops': 0, 'transmit-drops': 0,
+                    'receive-errors': 0, 'transmit-errors': 0,
+                    'duration': {'second': 3600, 'nanosecond': 0}}})
+
+        if tables:
+            node['flow-node-inventory:table'] = [{
+                'id': t,
+                'opendaylight-flow-table-statistics:'
+                'flow-table-statistics': {
+                    'active-flows': self.random.randint(0, 1000),
+                    'packets-looked-up': self.random.randint(0, 10 ** 9),
+                    'packets-matched': self.random.randint(0, 10 ** 9)}}
+                for t in range(tables)]
+
+        return node
+
+    def start(self):
+        """ Serves requests from a background thread. """
+        self.thread = threading.Thread(target=self.httpd.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def count(self, route):
+        with self.counters_lock:
+            self.counters[route] += 1
+
+    def get_counters(self):
+        """ Returns the number of requests served per route. """
+        with self.counters_lock:
+            return dict(self.counters)
+
+    def inject(self, route):
+        """ Sleeps the route latency, raises the injected errors. """
+        low, high = self.latency.get(route, self.latency.get('*', (0, 0)))
+        if high > 0:
+            time.sleep(self.random.uniform(low, high))
+
+        rate = self.error_rate.get(route, self.error_rate.get('*', 0))
+        if rate and self.random.random() < rate:
+            raise FakeServerException(self.error_code, 'operation-failed',
+                                      'Injected failure')
+
+    def stats(self, kind, name):
+        """ Returns get-stats RPC output, counters grow with service age. """
+        with self.config.lock:
+            created = self.created.get((kind, name))
+            if created is None:
+                raise FakeServerException(404, 'data-missing',
+                                          '{} {} does not exist'.format(
+                                              kind, name))
+        elapsed = time.time() - created
+        rate = 1000 + hash(name) % 1000
+        packets = int(elapsed * rate)
+        endpoint = {'packets': packets, 'bytes': packets * 512}
+        if kind == 'eline':
+            return {'name': name, 'endpoint1': endpoint,
+                    'endpoint2': dict(endpoint)}
+        return {'name': name, 'root': endpoint, 'leaves': [endpoint]}
+
+    def track(self, segments, deleted=False):
+        """ Keeps the creation time of services (for their stats). """
+        with self.config.lock:
+            for kind in ('eline', 'etree'):
+                if segments[0] != 'lumina-flowmanager-{0}:{0}s'.format(kind):
+                    continue
+                if len(segments) == 1:
+                    if deleted:
+                        for key in [k for k in self.created if k[0] == kind]:
+                            del self.created[key]
+                    else:
+                        root = self.config.roots.get(segments[0], {})
+                        for entry in root.get(kind, []):
+                            self.created.setdefault((kind, entry['name']),
+                                                    time.time())
+                elif len(segments) == 3:
+                    key = (kind, unquote(segments[2]))
+                    if deleted:
+                        self.created.pop(key, None)
+                    else:
+                        self.created.setdefault(key, time.time())
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeRequestHandler(BaseHTTPRequestHandler):
+    """ Maps HTTP requests onto the FakeFlowManager datastores. """
+
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def fake(self):
+        return self.server.fake
+
+    def reply(self, status, body=None, content_type='application/json'):
+        data = b'' if body is None else \
+            body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def reply_read(self, body):
+        """ Replies to a read, applying its fields and depth """
+        query = parse_qs(self.path.partition('?')[2])
+        fields = query.get('fields', [None])[0]
+        depth = query.get('depth', [None])[0]
+        if self.fake.query_params and (fields or depth):
+            if isinstance(body, bytes):
+                body = json.loads(body.decode('utf-8'))
+            try:
+                body = select(body, fields,
+                              int(depth) if depth else None)
+            except ValueError as e:
+                raise FakeServerException(400, 'invalid-value', str(e))
+        return self.reply(200, body)
+
+    def reply_error(self, error):
+        self.reply(error.status, {'errors': {'error': [{
+            'error-type': 'application', 'error-tag': error.tag,
+            'error-message': error.msg}]}})
+
+    def read_body(self):
+        """ Returns the request body, read once per request """
+        if self.body is None:
+            length = int(self.headers.get('Content-Length') or 0)
+            data = self.rfile.read(length) if length else b''
+            self.body = data.decode('utf-8')
+        return self.body
+
+    def read_json(self):
+        data = self.read_body()
+        if not data:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            raise FakeServerException(400, 'malformed-message',
+                                      'Invalid JSON body')
+
+    def authorized(self):
+        if self.fake.user is None:
+            return True
+        auth = self.headers.get('Authorization') or ''
+        if auth.startswith('Bearer '):
+            return auth[7:] in self.fake.tokens
+        if auth.startswith('Basic '):
+            expected = '{}:{}'.format(self.fake.user, self.fake.password)
+            return base64.b64decode(auth[6:]).decode('utf-8') == expected
+        return False
+
+    def route(self, path):
+        if path.startswith('/oauth2/'):
+            return 'token'
+        if path.startswith('/jolokia/'):
+            return 'jolokia'
+        if not path.startswith('/restconf/'):
+            return 'other'
+        if path.endswith(':get-stats'):
+            return 'stats'
+        if '/taps' in path:
+            return 'tap'
+        module = path.split('/')[3].split(':')[0] if path.count('/') > 2 \
+            else ''
+        return MODULE_ROUTES.get(module, 'other')
+
+    def handle_method(self, method):
+        path = self.path.split('?')[0]
+        route = self.route(path)
+        self.fake.count(route)
+        # the body is read before any reply, whatever the outcome, or it
+        # would be parsed as the next request of the keep-alive connection
+        self.body = None
+        self.read_body()
+        try:
+            self.fake.inject(route)
+            if route == 'token':
+                return self.token()
+            if not self.authorized():
+                return self.reply(401, {'errors': {'error': [{
+                    'error-type': 'protocol', 'error-tag': 'access-denied',
+                    'error-message': 'Unauthorized'}]}})
+            if route == 'jolokia':
+                return self.jolokia(path)
+            if not path.startswith('/restconf/'):
+                raise FakeServerException(404, 'invalid-value',
+                                          'Unknown resource')
+            return self.restconf(method, path)
+        except FakeServerException as e:
+            return self.reply_error(e)
+
+    def do_GET(self):
+        self.handle_method('GET')
+
+    def do_PUT(self):
+        self.handle_method('PUT')
+
+    def do_POST(self):
+        self.handle_method('POST')
+
+    def do_DELETE(self):
+        self.handle_method('DELETE')
+
+    def do_PATCH(self):
+        self.handle_method('PATCH')
+
+    def token(self):
+        token = '{:032x}'.format(self.fake.random.getrandbits(128))
+        self.fake.tokens.add(token)
+        self.reply(200, {'access_token': token, 'token_type': 'Bearer',
+                         'expires_in': 3600})
+
+    def jolokia(self, path):
+        if 'Category=ShardManager' in path:
+            value = {'MemberName': 'member-1', 'LocalShards': []}
+        elif 'Category=Shards' in path:
+            value = {'RaftState': 'Leader', 'Leader': 'member-1'}
+        else:
+            value = {}
+        self.reply(200, {'status': 200, 'value': value})
+
+    def yang_patch(self, segments):
+        """ Applies a YANG-Patch atomically, every edit or none. """
+        body = self.read_json() or {}
+        patch = body.get('ietf-yang-patch:yang-patch')
+        if not isinstance(patch, dict):
+            raise FakeServerException(400, 'malformed-message',
+                                      'Expected a yang-patch')
+
+        config = self.fake.config
+        edits = []
+        failed = False
+        with config.lock:
+            for edit in patch.get('edit', []):
+                target = segments + [s for s in edit.get('target', '').
+                                     split('/') if s]
+                exists = config.walk(target) is not None
+                operation = edit.get('operation')
+                error = None
+                if operation not in ('create', 'merge', 'replace', 'delete',
+                                     'remove'):
+                    error = ('operation-not-supported',
+                             'Unsupported operation {}'.format(operation))
+                elif operation == 'create' and exists:
+                    error = ('data-exists', 'Data already exists')
+                elif operation == 'delete' and not exists:
+                    error = ('data-missing', 'Data does not exist')
+                failed = failed or error is not None
+                edits.append((edit, target, error))
+
+            if not failed:
+                for edit, target, error in edits:
+                    operation = edit['operation']
+                    if operation in ('create', 'replace'):
+                        config.put(target, edit.get('value'))
+                    elif operation == 'merge':
+                        config.merge(target, edit.get('value'))
+                    elif config.walk(target) is not None:
+                        config.delete(target)
+                    self.fake.track(target,
+                                    deleted=operation in ('delete', 'remove'))
+
+        status = {'patch-id': patch.get('patch-id')}
+        if not failed:
+            status['ok'] = [None]
+            return self.reply(200, {'ietf-yang-patch:yang-patch-status':
+                                    status})
+
+        status['edit-status'] = {'edit': [
+            {'edit-id': edit.get('edit-id'), 'ok': [None]}
+            if error is None else
+            {'edit-id': edit.get('edit-id'), 'errors': {'error': [{
+                'error-type': 'application', 'error-tag': error[0],
+                'error-message': error[1]}]}}
+            for edit, target, error in edits]}
+        return self.reply(409, {'ietf-yang-patch:yang-patch-status': status})
+
+    def restconf(self, method, path):
+        segments = [s for s in path.split('/')[2:] if s]
+        if len(segments) < 2:
+            raise FakeServerException(404, 'invalid-value',
+                                      'Unknown resource')
+        datastore, segments = segments[0], segments[1:]
+
+        if datastore == 'operations' and method == 'POST':
+            kind = segments[0].split(':')[0].split('-')[-1]
+            if segments[0].endswith(':get-stats') and \
+                    kind in ('eline', 'etree'):
+                body = self.read_json() or {}
+                name = body.get('input', {}).get('name')
+                return self.reply(200, {'output': self.fake.stats(kind,
+                                                                  name)})
+            raise FakeServerException(404, 'operation-not-supported',
+                                      'Unknown RPC')
+
+        if datastore == 'operational' and method == 'GET':
+            if segments[0] in (INVENTORY, TOPOLOGY, CONTROLLER_STATUS):
+                if segments == [INVENTORY]:
+                    # the inventory never changes, serialize it once
+                    if self.fake.inventory_body is None:
+                        self.fake.inventory_body = json.dumps(
+                            self.fake.operational.get(segments)).encode()
+                    return self.reply_read(self.fake.inventory_body)
+                return self.reply_read(self.fake.operational.get(segments))
+            # services are realized as soon as they are configured
+            return self.reply_read(self.fake.config.get(segments))
+
+        if datastore != 'config':
+            raise FakeServerException(405, 'operation-not-supported',
+                                      'Method not allowed')
+
+        if method == 'GET':
+            return self.reply_read(self.fake.config.get(segments))
+        if method == 'PUT':
+            existed = self.fake.config.put(segments, self.read_json())
+            self.fake.track(segments)
+            return self.reply(200 if existed else 201)
+        if method == 'DELETE':
+            self.fake.config.delete(segments)
+            self.fake.track(segments, deleted=True)
+            return self.reply(200)
+        if method == 'PATCH':
+            return self.yang_patch(segments)
+
+        raise FakeServerException(405, 'operation-not-supported',
+                                  'Method not allowed')
@@ -0,0 +1,145 @@
+""" RESTCONF field selection and depth limiting.
+
+Reads of the Client take the RESTCONF 'fields' and 'depth' query
+parameters (RFC 8040 4.8.2 and 4.8.3), relative to the resource read::
+
+    fm.get_elines(fields='eline(name;endpoint1/switch-port)')
+    fm.get_ofnodes(fields='node(id;node-connector(id))')
+    fm.get_eline('e1', depth=2)
+
+The selection is applied again to the parsed body (see select), for the
+controllers ignoring the parameters.
+"""
+try:
+    from urllib import quote
+except ImportError:
+    from urllib.parse import quote
+
+
+def parse_fields(expr):
+    """ Parses a fields expression ('a;b/c;d(e;f)') to a tree: dict of
+    node name: tree of its selected children, or None for all of them.
+
+    :raise ValueError: on a malformed expression
+
+    """
+    tree, pos = parse_list(expr, 0)
+    if pos != len(expr):
+        raise ValueError('unexpected {!r} at {} of fields {!r}'.format(
+            expr[pos], pos, expr))
+    return tree
+
+
+def parse_list(expr, pos):
+    tree = {}
+    while True:
+        start = pos
+        while pos < len(expr) and expr[pos] not in ';()':
+            pos += 1
+        path = expr[start:pos].strip()
+        names = path.split('/')
+        if not all(names):
+            raise ValueError('empty node name at {} of fields {!r}'.format(
+                start, expr))
+        children = None
+        if pos < len(expr) and expr[pos] == '(':
+            children, pos = parse_list(expr, pos + 1)
+            if pos >= len(expr) or expr[pos] != ')':
+                raise ValueError('missing ) in fields {!r}'.format(expr))
+            pos += 1
+        for name in reversed(names[1:]):
+            children = {name: children}
+        merge(tree, names[0], children)
+        if pos < len(expr) and expr[pos] == ';':
+            pos += 1
+            continue
+        return tree, pos
+
+
+def merge(tree, name, children):
+    if name in tree and (tree[name] is None or children is None):
+        tree[name] = None
+    elif name in tree:
+        for child, grandchildren in children.items():
+            merge(tree[name], child, grandchildren)
+    else:
+        tree[name] = children
+
+
+def matches(key, name):
+    """ Whether a json member name matches a node name of the fields, the
+    module prefix is optional in the fields.
+    """
+    return key == name or (':' not in name and
+                           key.split(':', 1)[-1] == name)
+
+
+def project(value, tree):
+    """ Returns the members of value (a container, list entry or list)
+    selected by a fields tree.
+    """
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [project(entry, tree) for entry in value]
+    if not isinstance(value, dict):
+        return value
+    selected = {}
+    for key, child in value.items():
+        for name, children in tree.items():
+            if matches(key, name):
+                selected[key] = project(child, children)
+                break
+    return selected
+
+
+def limit_depth(value, depth):
+    """ Returns value with depth levels of data nodes: the members of value
+    are at level 1, list entries at the level of their list. Containers of
+    the last level are kept empty.
+    """
+    if isinstance(value, list):
+        return [limit_depth(entry, depth) for entry in value]
+    if not isinstance(value, dict):
+        return value
+    if depth < 1:
+        return {}
+    return dict((key, limit_depth(child, depth - 1))
+                for key, child in value.items())
+
+
+def select(body, fields=None, depth=None):
+    """ Applies fields and depth to the body of a read: a dict holding the
+    resource read (i.e. {'lumina-flowmanager-eline:elines': {...}}).
+    """
+    tree = parse_fields(fields) if fields else None
+    selected = {}
+    for key, resource in body.items():
+        if tree is not None:
+            resource = project(resource, tree)
+        if depth is not None:
+            resource = limit_depth(resource, depth - 1)
+        selected[key] = resource
+    return selected
+
+
+def selecting(parse, fields=None, depth=None):
+    """ Returns a body parser (see lfmcli.result) applying select first """
+    def parse_selected(body):
+        return parse(select(body, fields, depth))
+    return parse_selected
+
+
+def query(fields=None, depth=None):
+    """ Returns the query string ('?fields=...&depth=...') of a read, or ''
+    """
+    params = []
+    if fields:
+        parse_fields(fields)
+        params.append('fields=' + quote(fields, safe='/:()'))
+    if depth is not None:
+        if int(depth) < 1:
+            raise ValueError('depth must be at least 1, not {}'.format(
+                depth))
+        params.append('depth={}'.format(int(depth)))
+    return '?' + '&'.join(params) if params else ''
@@ -0,0 +1,212 @@
+""" Indexed in-memory copy of the OF nodes inventory.
+
+Built from one Client.get_ofnodes read, an Inventory resolves nodes and
+connectors by node id, connector id (switch-port, i.e. 'openflow:1:3'),
+port name or hardware address with dict lookups::
+
+    inventory = Inventory.from_client(fm)
+    inventory.connector('openflow:1:3')
+    inventory.unknown_endpoints(eline)
+
+and re-reads only the nodes that were added, removed or whose connectors
+changed (see refresh).
+
+Nodes and connectors are kept as lfmcli.models Node and NodeConnector,
+sharing their repeated strings.
+"""
+from lfmcli.models import Node
+from lfmcli.parallel import run_parallel
+from lfmcli.selector import endpoint_leaves
+
+NAME = 'flow-node-inventory:name'
+HARDWARE_ADDRESS = 'flow-node-inventory:hardware-address'
+
+
+class InventoryException(Exception):
+    """Inventory can't be read"""
+
+    def __init__(self, msg):
+        self.msg = msg
+
+    def __str__(self):
+        return repr(self.msg)
+
+
+def leaf(model, attr, name):
+    """ Returns a leaf of an inventory model, its attribute or else the
+    leaf without module prefix kept in its extra leaves.
+    """
+    value = getattr(model, attr)
+    if value is None and model.extra:
+        value = model.extra.get(name.split(':', 1)[-1])
+    return value
+
+
+# -----------------------------------------------------------------------------
+# Class 'Inventory'
+# -----------------------------------------------------------------------------
+class Inventory(object):
+    """ OF nodes and connectors indexed by their keys.
+
+    :param nodes: opendaylight-inventory node entries
+    """
+
+    def __init__(self, nodes=()):
+        # strings shared by the models of the inventory
+        self.strings = {}
+        self.nodes = {}
+        self.connectors = {}
+        self.connector_nodes = {}
+        self.port_names = {}
+        self.hardware_addresses = {}
+        for node in nodes:
+            self.add_node(node)
+
+    @classmethod
+    def from_client(cls, fm):
+        """ Builds the inventory from one inventory read of a Client. """
+        r = fm.get_ofnodes()
+        if r.get('status_code') != 200:
+            raise InventoryException('cannot read the inventory: {}'.format(
+                r.get('status_code')))
+        return cls(r['nodes'])
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, node_id):
+        return node_id in self.nodes
+
+    def add_node(self, node):
+        """ Adds (or replaces) a node entry and indexes its connectors. """
+        node = Node.from_restconf(node, self.strings)
+        self.remove_node(node.id)
+        self.nodes[node.id] = node
+        for connector in node.connectors or []:
+            connector_id = connector.id
+            self.connectors[connector_id] = connector
+            self.connector_nodes[connector_id] = node.id
+            name = leaf(connector, 'name', NAME)
+            if name is not None:
+                self.port_names.setdefault(name, {})[node.id] = connector_id
+            address = leaf(connector, 'hardware_address', HARDWARE_ADDRESS)
+            if address is not None:
+                self.hardware_addresses[address.lower()] = connector_id
+
+    def remove_node(self, node_id):
+        """ Removes a node and its connectors from the indexes. """
+        node = self.nodes.pop(node_id, None)
+        if node is None:
+            return
+        for connector in node.connectors or []:
+            self.connectors.pop(connector.id, None)
+            self.connector_nodes.pop(connector.id, None)
+            name = leaf(connector, 'name', NAME)
+            nodes = self.port_names.get(name, {})
+            nodes.pop(node_id, None)
+            if not nodes:
+                self.port_names.pop(name, None)
+            address = leaf(connector, 'hardware_address', HARDWARE_ADDRESS)
+            if address is not None and self.hardware_addresses.get(
+                    address.lower()) == connector.id:
+                del self.hardware_addresses[address.lower()]
+
+    def node(self, node_id):
+        """ Returns the Node of a node id, or None """
+        return self.nodes.get(node_id)
+
+    def connector(self, connector_id):
+        """ Returns the NodeConnector of a connector id (switch-port), or
+        None
+        """
+        return self.connectors.get(connector_id)
+
+    def connector_node(self, connector_id):
+        """ Returns the node id of a connector id, or None """
+        return self.connector_nodes.get(connector_id)
+
+    def port(self, name, node_id=None):
+        """ Returns the connector id of a port name, or None.
+
+        Without node_id the name must be unique in the inventory.
+
+        """
+        nodes = self.port_names.get(name, {})
+        if node_id is not None:
+            return nodes.get(node_id)
+        if len(nodes) == 1:
+            return list(nodes.values())[0]
+        return None
+
+    def hardware_address(self, address):
+        """ Returns the connector id of a hardware (MAC) address, or None """
+        return self.hardware_addresses.get(address.lower())
+
+    def resolve(self, value):
+        """ Returns the connector id of a connector id, hardware address or
+        unique port name, or None.
+        """
+        if value in self.connectors:
+            return value
+        return self.hardware_address(value) or self.port(value)
+
+    def unknown_endpoints(self, entry):
+        """ Returns the nodes and switch-ports of a service entry (path,
+        treepath, eline, etree) missing from the inventory.
+        """
+        unknown = []
+        for key, value in endpoint_leaves(entry):
+            if key == 'node' and value not in self.nodes:
+                unknown.append(value)
+            elif key == 'switch-port' and value not in self.connectors:
+                unknown.append(value)
+        return unknown
+
+    def refresh(self, fm, nodes=None, workers=8):
+        """ Re-reads some nodes instead of the whole inventory.
+
+        By default the nodes added to or removed from the flow:1 topology
+        since the last read, and the nodes whose termination points (in the
+        topology) are not the connectors of the inventory. Nodes that no
+        longer exist are removed. Changes of the connector leaves (state,
+        name...) aren't seen in the topology, re-read those nodes by id.
+
+        :param fm: lfmcli.api.Client
+        :param nodes: node ids to re-read
+        :param workers: node requests sent concurrently
+        :return: dict of 'added', 'updated' and 'removed' node ids
+
+        """
+        changes = {'added': [], 'updated': [], 'removed': []}
+        if nodes is None:
+            r = fm.get_ofnode_ids()
+            if r.get('status_code') != 200:
+                raise InventoryException(
+                    'cannot read the flow:1 topology: {}'.format(
+                        r.get('status_code')))
+            current = set(r['nodes'])
+            for node_id in [n for n in self.nodes if n not in current]:
+                self.remove_node(node_id)
+                changes['removed'].append(node_id)
+            connectors = r.get('connectors') or {}
+            nodes = [n for n in r['nodes'] if n not in self.nodes or (
+                n in connectors and set(connectors[n]) !=
+                set(c.id for c in self.nodes[n].connectors or []))]
+
+        def get(node_id):
+            return node_id, fm.get_ofnode(node_id)
+
+        for node_id, r in run_parallel(get, nodes, workers):
+            if r.get('status_code') == 200 and r.get('node'):
+                changes['updated' if node_id in self.nodes
+                        else 'added'].append(node_id)
+                self.add_node(r['node'])
+            elif r.get('status_code') == 404:
+                if node_id in self.nodes:
+                    self.remove_node(node_id)
+                    changes['removed'].append(node_id)
+            else:
+                raise InventoryException('cannot read node {}: {}'.format(
+                    node_id, r.get('status_code')))
+
+        return changes
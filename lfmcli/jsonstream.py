@@ -0,0 +1,132 @@
+""" Incremental parsing of the list entries of a json document.
+
+The entries of one list are decoded as the chunks of the document arrive,
+holding a single entry (and a chunk) in memory at a time::
+
+    for eline in iter_list(resp.iter_content(65536), ('elines', 'eline')):
+        ...
+
+The path names the members leading to the list, module prefixes are
+optional (see lfmcli.fields.matches).
+"""
+import codecs
+import json
+
+from lfmcli.fields import matches
+
+WHITESPACE = ' \t\n\r'
+NUMBER = '0123456789+-.eE'
+
+
+class JsonStreamException(ValueError):
+    """Malformed json document"""
+
+    def __init__(self, msg):
+        self.msg = msg
+
+    def __str__(self):
+        return repr(self.msg)
+
+
+# -----------------------------------------------------------------------------
+# Class 'Reader'
+# -----------------------------------------------------------------------------
+class Reader(object):
+    """ Buffer of the text of a document read chunk by chunk.
+
+    :param chunks: iterable of bytes (utf-8) or text
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.json = json.JSONDecoder()
+        self.buf = u''
+        self.pos = 0
+        self.eof = False
+
+    def more(self):
+        """ Appends the next chunk to the buffer, False at the end """
+        for chunk in self.chunks:
+            if isinstance(chunk, bytes):
+                chunk = self.decoder.decode(chunk)
+            if chunk:
+                self.buf = self.buf[self.pos:] + chunk
+                self.pos = 0
+                return True
+        self.eof = True
+        return False
+
+    def peek(self):
+        """ Returns the next non whitespace character, or None at the end """
+        while True:
+            while self.pos < len(self.buf) and \
+                    self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more():
+                return None
+
+    def expect(self, chars):
+        """ Consumes the next character, one of chars """
+        char = self.peek()
+        if char is None or char not in chars:
+            raise JsonStreamException('expected {} at {!r}'.format(
+                ' or '.join(chars), self.buf[self.pos:self.pos + 20]))
+        self.pos += 1
+        return char
+
+    def value(self):
+        """ Decodes the next json value """
+        self.peek()
+        while True:
+            try:
+                value, end = self.json.raw_decode(self.buf, self.pos)
+            except ValueError as e:
+                if self.eof:
+                    raise JsonStreamException(str(e))
+            else:
+                # a number may go on in the next chunk
+                if self.eof or (end < len(self.buf) and
+                                self.buf[end] not in NUMBER):
+                    self.pos = end
+                    return value
+            self.more()
+
+
+def find(reader, path):
+    """ Consumes the document up to the value of path, returns False when
+    there is no such value.
+    """
+    for name in path:
+        if reader.peek() != '{':
+            return False
+        reader.expect('{')
+        while True:
+            if reader.peek() == '}':
+                return False
+            key = reader.value()
+            reader.expect(':')
+            if matches(key, name):
+                break
+            reader.value()
+            if reader.expect(',}') == '}':
+                return False
+    return True
+
+
+def iter_list(chunks, path):
+    """ Yields the entries of the list at path of a json document read by
+    chunks. Nothing is yielded if the document has no such list.
+    """
+    reader = Reader(chunks)
+    if not find(reader, path) or reader.peek() != '[':
+        return
+    reader.expect('[')
+    if reader.peek() == ']':
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(',]') == ']':
+            return
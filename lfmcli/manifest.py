@@ -0,0 +1,297 @@
+""" Declarative manifests of Flow Manager services.
+
+A manifest is a YAML (or JSON) document listing the services to provision::
+
+    paths:
+      - name: p1
+        endpoint1: {node: 'openflow:1'}
+        endpoint2: {node: 'openflow:2'}
+    treepaths: []
+    elines:
+      - name: e1
+        path-name: p1
+        endpoint1: {switch-port: 'openflow:1:1'}
+        endpoint2: {switch-port: 'openflow:2:1'}
+    etrees: []
+    taps:
+      - eline: e1
+        endpoint: endpoint1
+        path-name: p1
+        egress: {action: [...]}
+
+Every entry uses the Client (RESTCONF) keywords, taps also name the eline
+and endpoint they belong to.
+"""
+import time
+
+import yaml
+
+from lfmcli.dag import Dag, execute
+
+KINDS = ('paths', 'treepaths', 'elines', 'etrees', 'taps')
+
+
+class ManifestException(Exception):
+    """Invalid manifest"""
+
+    def __init__(self, msg):
+        self.msg = msg
+
+    def __str__(self):
+        return repr(self.msg)
+
+
+def load_manifest(stream):
+    """ Reads and checks a manifest from a file object or string.
+
+    :return: dict of kind: list of entries, for every kind
+
+    """
+    data = yaml.safe_load(stream) or {}
+    if not isinstance(data, dict):
+        raise ManifestException('manifest must be a mapping of kinds')
+
+    unknown = set(data) - set(KINDS)
+    if unknown:
+        raise ManifestException('unknown kinds {}, expected {}'.format(
+            ', '.join(sorted(unknown)), ', '.join(KINDS)))
+
+    manifest = {}
+    for kind in KINDS:
+        entries = data.get(kind) or []
+        if not isinstance(entries, list):
+            raise ManifestException('{} must be a list'.format(kind))
+        for entry in entries:
+            required = ('eline', 'endpoint', 'path-name') \
+                if kind == 'taps' else ('name',)
+            if not isinstance(entry, dict) or \
+                    any(key not in entry for key in required):
+                raise ManifestException('{} entries need {}: {}'.format(
+                    kind, ', '.join(required), entry))
+        manifest[kind] = entries
+
+    return manifest
+
+
+def item_name(kind, entry):
+    """ Returns the unique name of a manifest entry within its kind. """
+    if kind == 'taps':
+        return '{}/{}/{}'.format(entry['eline'], entry['endpoint'],
+                                 entry['path-name'])
+    return entry['name']
+
+
+def dependencies(kind, entry):
+    """ Returns the (kind, name) of the entries entry refers to.
+
+    Treepath leaves are not entries of their own: they are listed in the
+    'leaves' of their treepath and written with it in one request, so they
+    are never scheduled apart from it. The etrees of a treepath depend on
+    the whole treepath entry.
+
+    """
+    if kind == 'elines' and entry.get('path-name'):
+        return [('paths', entry['path-name'])]
+    if kind == 'etrees' and entry.get('path-name'):
+        # the path-name of an etree names a treepath (or a path)
+        return [('treepaths', entry['path-name']),
+                ('paths', entry['path-name'])]
+    if kind == 'taps':
+        return [('elines', entry['eline']), ('paths', entry['path-name'])]
+    return []
+
+
+def tap_entry(entry):
+    """ Returns the tap keywords of a manifest tap entry. """
+    return dict((key, value) for key, value in entry.items()
+                if key not in ('eline', 'endpoint'))
+
+
+def add_entry(fm, kind, entry):
+    """ Creates a manifest entry with the matching Client method. """
+    if kind == 'paths':
+        return fm.add_path(path=entry)
+    if kind == 'treepaths':
+        return fm.add_treepath(treepath=entry)
+    if kind == 'elines':
+        return fm.add_eline(eline=entry)
+    if kind == 'etrees':
+        return fm.add_etree(etree=entry)
+    return fm.add_tap(entry['eline'], entry['endpoint'],
+                      tap=tap_entry(entry))
+
+
+def delete_entry(fm, kind, entry):
+    """ Deletes a manifest entry with the matching Client method. """
+    if kind == 'taps':
+        return fm.delete_tap(entry['eline'], entry['endpoint'],
+                             entry['path-name'])
+    return getattr(fm, 'delete_' + kind[:-1])(entry['name'])
+
+
+def apply_manifest(fm, manifest, workers=8, bulk=False, chunk_size=None,
+                   progress=None, inventory=None):
+    """ Creates (or updates) every manifest entry.
+
+    Entries are sent as soon as the entries they refer to were created (see
+    dependencies), up to workers at a time (see lfmcli.dag.execute), so an
+    eline does not wait for unrelated paths. Entries referring to a manifest
+    entry that failed are skipped. With bulk, paths, treepaths, elines and
+    etrees are merged in chunks (see Client.patch_entries), each kind once
+    the kinds it refers to are done. With an inventory, entries whose nodes
+    or switch-ports are not in it fail without being sent.
+
+    :param fm: lfmcli.api.Client
+    :param manifest: dict returned by load_manifest
+    :param progress: function called with each item result
+    :param inventory: lfmcli.inventory.Inventory validating the endpoints
+    :return: report dict (see below)
+
+    Report Dict:
+      'items': number of manifest entries
+      'ok', 'failed', 'skipped': number of entries per outcome
+      'seconds': elapsed time
+      'items_per_sec': throughput
+      'kinds': {kind: {'ok': n, 'failed': n, 'skipped': n}}
+      'errors': item results of the failed and skipped entries
+        ('kind', 'name', 'status_code', 'error')
+
+    """
+    progress = progress or (lambda result: None)
+    failed = set()
+    results = []
+
+    def record(result):
+        results.append(result)
+        if result['status'] != 'ok':
+            failed.add((result['kind'], result['name']))
+        progress(result)
+
+    def blocked(kind, entry):
+        unknown = inventory.unknown_endpoints(entry) \
+            if inventory is not None else []
+        if unknown:
+            return item_result(kind, entry, None,
+                               'unknown endpoints {}'.format(
+                                   ', '.join(unknown)))
+        missing = [dep for dep in dependencies(kind, entry)
+                   if dep in failed]
+        if missing:
+            return skipped(kind, entry, missing)
+
+    def add(item):
+        kind, entry = item
+        if entry is None:
+            return add_bulk(kind)
+        result = blocked(kind, entry)
+        if result is not None:
+            return [result]
+        try:
+            r = add_entry(fm, kind, entry)
+        except Exception as e:
+            return [item_result(kind, entry, None, str(e))]
+        status_code = r.get('status_code')
+        return [item_result(kind, entry, status_code,
+                            None if status_code in (200, 201, 204)
+                            else r.get('content'))]
+
+    def add_bulk(kind):
+        kind_results = []
+        entries = []
+        for entry in manifest.get(kind, []):
+            result = blocked(kind, entry)
+            if result is None:
+                entries.append(entry)
+            else:
+                kind_results.append(result)
+        if entries:
+            r = getattr(fm, 'add_' + kind)(entries, chunk_size=chunk_size,
+                                           workers=workers)
+            kind_results.extend(
+                item_result(kind, entry, result['status_code'],
+                            result['error'])
+                for entry, result in zip(entries, r['results']))
+        return kind_results
+
+    def ok(key, kind_results):
+        # a bulk kind (key of its kind only) always lets its dependents run,
+        # they check their own dependencies
+        return len(key) == 1 or kind_results[0]['status'] == 'ok'
+
+    def skip(key, item, failed_keys):
+        kind, entry = item
+        if entry is None:
+            return []
+        return [skipped(kind, entry, [failed_key[:2]
+                                      for failed_key in failed_keys])]
+
+    start = time.time()
+    for key, kind_results in execute(
+            manifest_dag(manifest, bulk), add, workers, ok, skip):
+        for result in kind_results:
+            record(result)
+
+    seconds = time.time() - start
+    report = {'items': len(results), 'seconds': round(seconds, 3),
+              'items_per_sec': round(len(results) / seconds, 2)
+              if seconds else None,
+              'ok': 0, 'failed': 0, 'skipped': 0,
+              'kinds': dict((kind, {'ok': 0, 'failed': 0, 'skipped': 0})
+                            for kind in KINDS),
+              'errors': []}
+    for result in results:
+        report[result['status']] += 1
+        report['kinds'][result['kind']][result['status']] += 1
+        if result['status'] != 'ok':
+            report['errors'].append(dict(
+                (key, result[key])
+                for key in ('kind', 'name', 'status_code', 'error')))
+
+    return report
+
+
+def manifest_dag(manifest, bulk=False):
+    """ Returns the lfmcli.dag.Dag of the manifest entries.
+
+    Operations are keyed by (kind, name) and hold (kind, entry). An entry
+    listed again depends on its previous occurrence, keyed by (kind, name,
+    occurrence). With bulk, paths, treepaths, elines and etrees are one
+    operation per kind, keyed by (kind,) and holding (kind, None).
+
+    """
+    dag = Dag()
+    for kind in KINDS:
+        entries = manifest.get(kind, [])
+        if bulk and kind != 'taps':
+            if entries:
+                dag.add((kind,), (kind, None), set(
+                    (dep_kind,) for entry in entries
+                    for dep_kind, name in dependencies(kind, entry)))
+            continue
+        for entry in entries:
+            key = (kind, item_name(kind, entry))
+            depends = [(dep_kind,) if bulk and dep_kind != 'taps' else
+                       (dep_kind, name)
+                       for dep_kind, name in dependencies(kind, entry)]
+            occurrence = 0
+            op = key
+            while op in dag:
+                depends.append(op)
+                occurrence += 1
+                op = key + (occurrence,)
+            dag.add(op, (kind, entry), depends)
+    return dag
+
+
+def skipped(kind, entry, missing):
+    return item_result(kind, entry, None, 'depends on failed {}'.format(
+        ', '.join('{} {}'.format(*dep) for dep in missing)), 'skipped')
+
+
+def item_result(kind, entry, status_code, error, status=None):
+    if isinstance(error, bytes):
+        error = error.decode('utf-8', 'replace')
+    return {'kind': kind, 'name': item_name(kind, entry),
+            'status_code': status_code, 'error': error,
+            'status': status or ('failed' if error or status_code is None
+                                 else 'ok')}
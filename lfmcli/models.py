@@ -0,0 +1,318 @@
+""" Compact typed models of Flow Manager services and OF inventory.
+
+The Client returns the parsed RESTCONF json (nested dicts); tools keeping
+a whole controller state in memory can convert it to models::
+
+    elines = load('elines', entries)
+    elines[0].endpoint1.switch_port
+    elines[0].to_restconf() == entries[0]
+
+Models use __slots__ and the entries converted by one load share one copy
+of their repeated strings (node ids, switch-ports, providers, network
+types...), the table of strings only lives as long as the load. Leaves a
+model has no attribute for, and values of an unexpected shape, are kept
+as is in 'extra', so to_restconf returns the entry it was built from.
+"""
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
+
+def intern_string(value, strings):
+    """ Returns the copy of a string kept in strings, a dict shared by the
+    entries of one load (other values as is).
+    """
+    if isinstance(value, string_types):
+        return strings.setdefault(value, value)
+    return value
+
+
+def compact(value, strings):
+    """ Returns a copy of a json value sharing its dict keys with the other
+    entries of the load.
+    """
+    if isinstance(value, dict):
+        return dict((intern_string(key, strings), compact(child, strings))
+                    for key, child in value.items())
+    if isinstance(value, list):
+        return [compact(child, strings) for child in value]
+    return value
+
+
+class Raw(object):
+    """ Field holding a json value """
+
+    def load(self, value, strings):
+        return compact(value, strings)
+
+    def dump(self, value):
+        return value
+
+
+class Interned(Raw):
+    """ Field holding a string repeated across entries """
+
+    def load(self, value, strings):
+        return intern_string(value, strings)
+
+
+class One(object):
+    """ Field holding a container, as a model """
+
+    def __init__(self, model):
+        self.model = model
+
+    def load(self, value, strings):
+        if not isinstance(value, dict):
+            raise ValueError(value)
+        return self.model.from_restconf(value, strings)
+
+    def dump(self, value):
+        return value.to_restconf()
+
+
+class Many(object):
+    """ Field holding a list (wrapped in container if given), as models """
+
+    def __init__(self, model, container=None):
+        self.model = model
+        self.container = container
+
+    def load(self, value, strings):
+        if self.container is not None:
+            if not isinstance(value, dict) or list(value) != [self.container]:
+                raise ValueError(value)
+            value = value[self.container]
+        if not isinstance(value, list) or \
+                not all(isinstance(entry, dict) for entry in value):
+            raise ValueError(value)
+        return [self.model.from_restconf(entry, strings) for entry in value]
+
+    def dump(self, value):
+        entries = [entry.to_restconf() for entry in value]
+        if self.container is not None:
+            return {self.container: entries}
+        return entries
+
+
+RAW = Raw()
+INTERNED = Interned()
+
+
+# -----------------------------------------------------------------------------
+# Class 'Model'
+# -----------------------------------------------------------------------------
+class Model(object):
+    """ Base of the models.
+
+    FIELDS lists the (attribute, RESTCONF key, field) of the model, missing
+    leaves are None. Keyword arguments set the attributes.
+    """
+
+    __slots__ = ('extra',)
+    FIELDS = ()
+
+    def __init__(self, extra=None, **kwargs):
+        for attr, key, field in self.FIELDS:
+            setattr(self, attr, kwargs.pop(attr, None))
+        if kwargs:
+            raise TypeError('unknown {} attributes {}'.format(
+                type(self).__name__, ', '.join(sorted(kwargs))))
+        self.extra = extra or None
+
+    @classmethod
+    def from_restconf(cls, entry, strings=None):
+        """ Builds the model of a RESTCONF entry (dict).
+
+        :param strings: dict of the strings shared with other entries
+
+        """
+        if strings is None:
+            strings = {}
+        model = cls.__new__(cls)
+        extra = {}
+        for attr, key, field in cls.FIELDS:
+            value = entry.get(key)
+            if value is not None:
+                try:
+                    value = field.load(value, strings)
+                except ValueError:
+                    extra[intern_string(key, strings)] = compact(value,
+                                                                 strings)
+                    value = None
+            elif key in entry:
+                # null leaves (i.e. [null] empty types) are kept as is
+                extra[intern_string(key, strings)] = None
+            setattr(model, attr, value)
+        keys = set(key for attr, key, field in cls.FIELDS)
+        for key, value in entry.items():
+            if key not in keys:
+                extra[intern_string(key, strings)] = compact(value, strings)
+        model.extra = extra or None
+        return model
+
+    def to_restconf(self):
+        """ Returns the RESTCONF entry (dict) of the model.
+
+        Raw values are shared with the model, copy them before changing.
+
+        """
+        entry = dict(self.extra or {})
+        for attr, key, field in self.FIELDS:
+            value = getattr(self, attr)
+            if value is not None:
+                entry[key] = field.dump(value)
+        return entry
+
+    def __eq__(self, other):
+        return type(self) is type(other) and \
+            self.extra == other.extra and \
+            all(getattr(self, attr) == getattr(other, attr)
+                for attr, key, field in self.FIELDS)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join(
+            '{}={!r}'.format(attr, getattr(self, attr))
+            for attr, key, field in self.FIELDS
+            if getattr(self, attr) is not None))
+
+
+# -----------------------------------------------------------------------------
+# Class 'Tap'
+# -----------------------------------------------------------------------------
+class Tap(Model):
+    """ Tap of an E-Line endpoint """
+
+    __slots__ = ('path_name', 'egress')
+    FIELDS = (('path_name', 'path-name', INTERNED),
+              ('egress', 'egress', RAW))
+
+
+# -----------------------------------------------------------------------------
+# Class 'Endpoint'
+# -----------------------------------------------------------------------------
+class Endpoint(Model):
+    """ Endpoint of a service (endpoint1, root, leaf...) """
+
+    __slots__ = ('node', 'switch_port', 'segmentation_id', 'network_type',
+                 'taps')
+    FIELDS = (('node', 'node', INTERNED),
+              ('switch_port', 'switch-port', INTERNED),
+              ('segmentation_id', 'segmentation-id', RAW),
+              ('network_type', 'network-type', INTERNED),
+              ('taps', 'taps', Many(Tap, 'tap')))
+
+
+# -----------------------------------------------------------------------------
+# Class 'Path'
+# -----------------------------------------------------------------------------
+class Path(Model):
+    """ Path between two nodes """
+
+    __slots__ = ('name', 'provider', 'endpoint1', 'endpoint2', 'constraints')
+    FIELDS = (('name', 'name', RAW),
+              ('provider', 'provider', INTERNED),
+              ('endpoint1', 'endpoint1', One(Endpoint)),
+              ('endpoint2', 'endpoint2', One(Endpoint)),
+              ('constraints', 'constraints', RAW))
+
+
+# -----------------------------------------------------------------------------
+# Class 'TreePath'
+# -----------------------------------------------------------------------------
+class TreePath(Model):
+    """ Tree path from a root node to leaf nodes """
+
+    __slots__ = ('name', 'provider', 'root', 'leaves')
+    FIELDS = (('name', 'name', RAW),
+              ('provider', 'provider', INTERNED),
+              ('root', 'root', One(Endpoint)),
+              ('leaves', 'leaves', Many(Endpoint, 'leaf')))
+
+
+# -----------------------------------------------------------------------------
+# Class 'ELine'
+# -----------------------------------------------------------------------------
+class ELine(Model):
+    """ E-Line between two switch-ports """
+
+    __slots__ = ('name', 'path_name', 'provider', 'ethernet_type',
+                 'bidirectional', 'endpoint1', 'endpoint2')
+    FIELDS = (('name', 'name', RAW),
+              ('path_name', 'path-name', INTERNED),
+              ('provider', 'provider', INTERNED),
+              ('ethernet_type', 'ethernet-type', INTERNED),
+              ('bidirectional', 'bidirectional', INTERNED),
+              ('endpoint1', 'endpoint1', One(Endpoint)),
+              ('endpoint2', 'endpoint2', One(Endpoint)))
+
+
+# -----------------------------------------------------------------------------
+# Class 'ETree'
+# -----------------------------------------------------------------------------
+class ETree(Model):
+    """ E-Tree from a root switch-port to leaf switch-ports """
+
+    __slots__ = ('name', 'path_name', 'provider', 'ethernet_type', 'root',
+                 'leaves')
+    FIELDS = (('name', 'name', RAW),
+              ('path_name', 'path-name', INTERNED),
+              ('provider', 'provider', INTERNED),
+              ('ethernet_type', 'ethernet-type', INTERNED),
+              ('root', 'root', One(Endpoint)),
+              ('leaves', 'leaves', Many(Endpoint, 'leaf')))
+
+
+# -----------------------------------------------------------------------------
+# Class 'NodeConnector'
+# -----------------------------------------------------------------------------
+class NodeConnector(Model):
+    """ Connector (port) of an OF node """
+
+    __slots__ = ('id', 'port_number', 'name', 'hardware_address', 'state')
+    FIELDS = (('id', 'id', INTERNED),
+              ('port_number', 'flow-node-inventory:port-number', RAW),
+              ('name', 'flow-node-inventory:name', INTERNED),
+              ('hardware_address', 'flow-node-inventory:hardware-address',
+               RAW),
+              ('state', 'flow-node-inventory:state', RAW))
+
+
+# -----------------------------------------------------------------------------
+# Class 'Node'
+# -----------------------------------------------------------------------------
+class Node(Model):
+    """ OF node of the inventory """
+
+    __slots__ = ('id', 'manufacturer', 'hardware', 'software', 'ip_address',
+                 'connectors')
+    FIELDS = (('id', 'id', INTERNED),
+              ('manufacturer', 'flow-node-inventory:manufacturer', INTERNED),
+              ('hardware', 'flow-node-inventory:hardware', INTERNED),
+              ('software', 'flow-node-inventory:software', INTERNED),
+              ('ip_address', 'flow-node-inventory:ip-address', RAW),
+              ('connectors', 'node-connector', Many(NodeConnector)))
+
+
+MODELS = {'paths': Path, 'treepaths': TreePath, 'elines': ELine,
+          'etrees': ETree, 'taps': Tap, 'nodes': Node}
+
+
+def load(kind, entries):
+    """ Returns the models of the RESTCONF entries of a kind (see MODELS),
+    sharing their repeated strings.
+    """
+    model = MODELS[kind]
+    strings = {}
+    return [model.from_restconf(entry, strings) for entry in entries]
+
+
+def dump(models):
+    """ Returns the RESTCONF entries of models """
+    return [model.to_restconf() for model in models]
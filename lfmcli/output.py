@@ -0,0 +1,122 @@
+""" Output formats of the command line.
+
+json-pretty: one indented, key sorted document (the default)
+json-compact: one document without whitespace
+ndjson: one compact document per line, one line per list entry
+table: one row per entry, one column per leaf
+
+json-compact and ndjson write list entries as they come, so a streamed
+list (see Client.iter_elines) is printed in constant memory.
+"""
+import json
+
+FORMATS = ('json-pretty', 'json-compact', 'ndjson', 'table')
+
+COMPACT = (',', ':')
+
+
+def json_default(o):
+    return o.__dict__
+
+
+def dumps(value, sort_keys=False):
+    """ Returns the compact json of value """
+    return json.dumps(value, default=json_default, separators=COMPACT,
+                      sort_keys=sort_keys)
+
+
+def write_entries(entries, fmt, write, sort_keys=False):
+    """ Writes list entries as they come.
+
+    :param entries: iterable of json values
+    :param fmt: one of FORMATS
+    :param write: function called with each piece of text, a line (without
+                  its newline) for ndjson and table
+    :return: number of entries
+
+    """
+    count = 0
+    if fmt == 'ndjson':
+        for entry in entries:
+            write(dumps(entry, sort_keys))
+            count += 1
+    elif fmt == 'json-compact':
+        write('[')
+        for entry in entries:
+            write((',' if count else '') + dumps(entry, sort_keys))
+            count += 1
+        write(']')
+    elif fmt == 'table':
+        rows = list(entries)
+        count = len(rows)
+        for line in table(rows):
+            write(line)
+    else:
+        rows = list(entries)
+        count = len(rows)
+        write(json.dumps(rows, default=json_default, sort_keys=True,
+                         indent=4))
+    return count
+
+
+def write_value(value, fmt, write, sort_keys=False):
+    """ Writes a json document: lists as write_entries, other values as a
+    single entry (ndjson, table) or document.
+    """
+    if isinstance(value, list):
+        return write_entries(value, fmt, write, sort_keys)
+    if fmt in ('ndjson', 'table'):
+        return write_entries([value], fmt, write, sort_keys)
+    if fmt == 'json-compact':
+        write(dumps(value, sort_keys))
+    else:
+        write(json.dumps(value, default=json_default, sort_keys=True,
+                         indent=4))
+    return 1
+
+
+def flatten(entry, prefix=''):
+    """ Returns the leaves of an entry as {dotted key: text}, lists of
+    containers are shown by their length.
+    """
+    leaves = {}
+    for key, value in entry.items():
+        key = prefix + key.split(':', 1)[-1]
+        if isinstance(value, dict):
+            leaves.update(flatten(value, key + '.'))
+        elif isinstance(value, list):
+            if any(isinstance(child, (dict, list)) for child in value):
+                leaves[key] = '[{}]'.format(len(value))
+            else:
+                leaves[key] = ','.join(str(child) for child in value)
+        elif value is not None:
+            leaves[key] = value if isinstance(value, type(u'')) \
+                else str(value)
+    return leaves
+
+
+def table(entries):
+    """ Returns the lines of a text table of list entries, columns in the
+    order the leaves are first seen.
+    """
+    rows = [flatten(entry) if isinstance(entry, dict)
+            else {'value': str(entry)} for entry in entries]
+    if not rows:
+        return []
+    columns = []
+    seen = set()
+    for row in rows:
+        for key in sorted(row):
+            if key not in seen:
+                seen.add(key)
+                columns.append(key)
+    # keys first
+    columns.sort(key=lambda column: column not in ('name', 'id'))
+
+    lines = [columns] + [[row.get(column, '') for column in columns]
+                         for row in rows]
+    widths = [max(len(line[i]) for line in lines)
+              for i in range(len(columns))]
+    return ['  '.join(value.ljust(width)
+                      for value, width in zip(line, widths)).rstrip()
+            for line in lines]
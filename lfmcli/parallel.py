@@ -0,0 +1,26 @@
+from multiprocessing.pool import ThreadPool
+
+
+def run_parallel(func, items, workers=8):
+    """ Calls func on every item from at most workers threads.
+
+    Results are yielded as they complete (not in items order). Exceptions
+    raised by func are propagated to the caller, func should catch the ones
+    that must not stop the whole run.
+
+    :param func: function called with each item
+    :param items: iterable of items, consumed lazily
+    :param workers: number of concurrent calls, 1 runs them in the caller
+    """
+    if workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    pool = ThreadPool(workers)
+    try:
+        for result in pool.imap_unordered(func, items):
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,269 @@
+""" Reconciles the Flow Manager services with a desired manifest.
+
+The live paths, treepaths, elines and etrees (and the taps of the elines)
+are fetched with one request per kind, both sides are normalized and only
+the entries that differ are created, updated (PUT) or, with prune, deleted.
+"""
+import json
+import time
+
+import requests
+
+from lfmcli.dag import Dag, execute
+from lfmcli.manifest import KINDS, apply_manifest, delete_entry, \
+    dependencies, item_name, item_result, skipped
+from lfmcli.retry import CircuitOpenException
+
+ENDPOINTS = ('endpoint1', 'endpoint2')
+
+
+class ReconcileException(Exception):
+    """Live state can't be read"""
+
+    def __init__(self, msg):
+        self.msg = msg
+
+    def __str__(self):
+        return repr(self.msg)
+
+
+def normalize(value):
+    """ Returns a canonical copy of a RESTCONF (or manifest) value.
+
+    Module prefixes are stripped from keys, empty values are dropped,
+    scalars become strings ('true', '5') and lists are sorted, so the
+    controller and manifest versions of an entry compare equal.
+
+    """
+    if isinstance(value, dict):
+        result = {}
+        for key, child in value.items():
+            child = normalize(child)
+            if child not in (None, {}, []):
+                result[key.split(':', 1)[-1]] = child
+        return result
+    if isinstance(value, list):
+        return sorted((normalize(child) for child in value),
+                      key=lambda child: json.dumps(child, sort_keys=True))
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return str(value)
+    return value
+
+
+def split_taps(state):
+    """ Returns a copy of a manifest like dict with the taps of the elines
+    moved to the taps entries.
+    """
+    state = dict((kind, list(state.get(kind) or [])) for kind in KINDS)
+    elines = []
+    for eline in state['elines']:
+        eline = dict(eline)
+        for endpoint in ENDPOINTS:
+            if not isinstance(eline.get(endpoint), dict):
+                continue
+            eline[endpoint] = dict(eline[endpoint])
+            for key in list(eline[endpoint]):
+                if key.split(':', 1)[-1] != 'taps':
+                    continue
+                for name, taps in (eline[endpoint].pop(key) or {}).items():
+                    if name.split(':', 1)[-1] == 'tap':
+                        state['taps'].extend(
+                            dict(tap, eline=eline['name'], endpoint=endpoint)
+                            for tap in taps)
+        elines.append(eline)
+    state['elines'] = elines
+    return state
+
+
+def live_entries(r, kind):
+    """ Returns the list entries of a get_<kind> Client result. """
+    if r.get('status_code') == 404:
+        return []
+    if r.get('status_code') != 200:
+        raise ReconcileException('failed to get {}: {} {}'.format(
+            kind, r.get('status_code'), r.get('content')))
+    for container in r[kind].values():
+        for name, entries in (container or {}).items():
+            if name.split(':', 1)[-1] == kind[:-1]:
+                return entries
+    return []
+
+
+def live_state(fm):
+    """ Returns the normalized services of the controller. """
+    state = dict((kind, live_entries(getattr(fm, 'get_' + kind)(), kind))
+                 for kind in KINDS if kind != 'taps')
+    return split_taps(state)
+
+
+def plan(desired, live, prune=False):
+    """ Returns the actions turning the live state into the desired one.
+
+    An eline PUT replaces its taps, so every desired tap of a created or
+    updated eline is (re)created with it, as well as its live taps unless
+    pruning. Taps of deleted elines are not deleted on their own.
+
+    :param desired: desired state (see split_taps)
+    :param live: live state (see live_state)
+    :return: (list of (op, kind, entry), number of unchanged entries)
+
+    """
+    actions = []
+    unchanged = 0
+    for kind in KINDS:
+        have = dict((item_name(kind, entry), entry) for entry in live[kind])
+        want = dict((item_name(kind, entry), entry)
+                    for entry in desired[kind])
+        for name, entry in want.items():
+            if name not in have:
+                actions.append(('create', kind, entry))
+            elif normalize(have[name]) != normalize(entry):
+                actions.append(('update', kind, entry))
+            else:
+                unchanged += 1
+        if prune:
+            actions.extend(('delete', kind, entry)
+                           for name, entry in have.items()
+                           if name not in want)
+
+    elines = dict((op, set(entry['name'] for o, kind, entry in actions
+                           if o == op and kind == 'elines'))
+                  for op in ('create', 'update', 'delete'))
+    replaced = elines['create'] | elines['update']
+    actions = [action for action in actions if action[1] != 'taps' or
+               action[2]['eline'] not in replaced | elines['delete']]
+
+    have = dict((item_name('taps', entry), entry) for entry in live['taps'])
+    want = set(item_name('taps', entry) for entry in desired['taps'])
+    for entry in desired['taps']:
+        if entry['eline'] in replaced:
+            name = item_name('taps', entry)
+            if name in have and normalize(have[name]) == normalize(entry):
+                unchanged -= 1
+            actions.append(('update' if name in have else 'create', 'taps',
+                            entry))
+    if not prune:
+        actions.extend(('update', 'taps', entry) for entry in live['taps']
+                       if entry['eline'] in replaced and
+                       item_name('taps', entry) not in want)
+    return actions, unchanged
+
+
+def referrers(live):
+    """ Returns {(kind, name): (kind, name) of the live entries referring
+    to it} (see lfmcli.manifest.dependencies).
+    """
+    refs = {}
+    for kind in KINDS:
+        for entry in live[kind]:
+            for dep in dependencies(kind, entry):
+                refs.setdefault(dep, []).append((kind,
+                                                 item_name(kind, entry)))
+    return refs
+
+
+def prune_dag(deletes, refs):
+    """ Returns the lfmcli.dag.Dag of the deletes of plan.
+
+    Operations are keyed by (kind, name) and hold (kind, entry), an entry
+    is deleted after the deleted entries referring to it (see referrers).
+
+    """
+    keys = set((kind, item_name(kind, entry)) for kind, entry in deletes)
+    dag = Dag()
+    for kind, entry in deletes:
+        key = (kind, item_name(kind, entry))
+        dag.add(key, (kind, entry),
+                [ref for ref in refs.get(key, []) if ref in keys])
+    return dag
+
+
+def sync(fm, desired, prune=False, dry_run=False, workers=8, progress=None):
+    """ Reconciles the controller services with a desired manifest.
+
+    Creates and updates run first, in dependency order (see
+    lfmcli.manifest.apply_manifest), so the entries moving to a new path
+    leave the old one. The deletes run then, in reverse dependency order
+    (see prune_dag). An entry still referred to by a live entry whose
+    update failed, or whose delete failed, is not deleted.
+
+    :param fm: lfmcli.api.Client
+    :param desired: dict returned by lfmcli.manifest.load_manifest
+    :param prune: delete the live entries missing from desired
+    :param dry_run: only compute the actions
+    :param progress: function called with each item result
+    :return: report dict (see below)
+
+    Report Dict:
+      'create', 'update', 'delete', 'unchanged': number of entries
+      'actions': list of {'op', 'kind', 'name'}
+      'seconds': elapsed time
+      'ok', 'failed', 'skipped', 'errors': outcome of the actions (see
+        apply_manifest)
+
+    """
+    progress = progress or (lambda result: None)
+    start = time.time()
+    live = live_state(fm)
+    actions, unchanged = plan(split_taps(desired), live, prune)
+
+    report = {'unchanged': unchanged, 'create': 0, 'update': 0, 'delete': 0,
+              'actions': [], 'ok': 0, 'failed': 0, 'skipped': 0,
+              'errors': []}
+    for op, kind, entry in actions:
+        report[op] += 1
+        report['actions'].append({'op': op, 'kind': kind,
+                                  'name': item_name(kind, entry)})
+
+    if not dry_run:
+        manifest = dict((kind, [entry for op, k, entry in actions
+                                if op != 'delete' and k == kind])
+                        for kind in KINDS)
+        applied = apply_manifest(fm, manifest, workers=workers,
+                                 progress=progress)
+        for key in ('ok', 'failed', 'skipped', 'errors'):
+            report[key] += applied[key]
+
+        refs = referrers(live)
+        failed = set((error['kind'], error['name'])
+                     for error in applied['errors'])
+
+        def delete(item):
+            kind, entry = item
+            missing = [ref for ref in refs.get((kind, item_name(kind, entry)),
+                                               []) if ref in failed]
+            if missing:
+                return skipped(kind, entry, missing)
+            try:
+                r = delete_entry(fm, kind, entry)
+            except (requests.exceptions.RequestException,
+                    CircuitOpenException) as e:
+                return item_result(kind, entry, None, str(e))
+            status_code = r.get('status_code')
+            return item_result(kind, entry, status_code,
+                               None if status_code in (200, 204, 404)
+                               else r.get('content'))
+
+        def ok(key, result):
+            return result['status'] == 'ok'
+
+        def skip(key, item, failed_keys):
+            return skipped(item[0], item[1], failed_keys)
+
+        deletes = [(kind, entry) for op, kind, entry in actions
+                   if op == 'delete']
+        for key, result in execute(prune_dag(deletes, refs), delete,
+                                   workers, ok, skip):
+            report[result['status']] += 1
+            if result['status'] != 'ok':
+                report['errors'].append(dict(
+                    (key, result[key])
+                    for key in ('kind', 'name', 'status_code', 'error')))
+            progress(result)
+
+    report['seconds'] = round(time.time() - start, 3)
+    return report
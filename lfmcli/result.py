@@ -0,0 +1,145 @@
+""" Result dicts of the Client methods.
+
+A Result holds the 'status_code' and 'content' of a response and the keys
+parsed from its json body. In lean mode (controller property 'lean') the
+body is only parsed when one of those keys is first read, and the raw
+'content' of successful responses is dropped (kept with 'lean_content')::
+
+    r = fm.get_ofnodes()
+    if r['status_code'] == 200:
+        nodes = r['nodes']      # parsed here
+"""
+import json
+
+
+def whole(body):
+    """ Parser returning the whole body """
+    return body
+
+
+def first(name):
+    """ Parser returning the first entry of a list, or None """
+    def parse(body):
+        entries = body.get(name)
+        return entries[0] if entries else None
+    return parse
+
+
+def child(name, default=None):
+    """ Parser returning a child of the body, or default """
+    def parse(body):
+        value = body.get(name)
+        return value if value else default
+    return parse
+
+
+# -----------------------------------------------------------------------------
+# Class 'Result'
+# -----------------------------------------------------------------------------
+class Result(dict):
+    """ Result dict of a response.
+
+    :param resp: http response, None gives an empty result
+    :param parsers: dict of key: function of the json body, computing the
+                    keys of 200 responses
+    :param lean: parse on first access, drop the content of 2xx responses
+    :param keep_content: keep the content in lean mode
+
+    Reading the whole dict (iterating, items, json.dumps...) parses every
+    key. Use the dict methods, the dict() and update() shortcuts of
+    python 2 don't see the keys not parsed yet.
+
+    """
+
+    def __init__(self, resp=None, parsers=None, lean=False,
+                 keep_content=False):
+        dict.__init__(self)
+        self._raw = None
+        self._body = None
+        self._lazy = {}
+        if resp is None:
+            return
+
+        self['status_code'] = resp.status_code
+        if not lean or keep_content or not 200 <= resp.status_code < 300:
+            self['content'] = resp.content
+
+        if parsers and resp.status_code == 200:
+            if lean:
+                self._raw = resp.content
+                self._lazy = dict(parsers)
+            else:
+                body = json.loads(resp.content)
+                for key, parse in parsers.items():
+                    self[key] = parse(body)
+
+    def __missing__(self, key):
+        if key not in self._lazy:
+            raise KeyError(key)
+        return self._load(key)
+
+    def _load(self, key):
+        parse = self._lazy.pop(key)
+        if self._body is None:
+            self._body = json.loads(self._raw)
+            self._raw = None
+        value = parse(self._body)
+        dict.__setitem__(self, key, value)
+        if not self._lazy:
+            self._body = None
+        return value
+
+    def load(self):
+        """ Parses the keys not parsed yet """
+        for key in list(self._lazy):
+            self._load(key)
+        return self
+
+    def get(self, key, default=None):
+        if key in self._lazy:
+            return self._load(key)
+        return dict.get(self, key, default)
+
+    def __contains__(self, key):
+        return key in self._lazy or dict.__contains__(self, key)
+
+    has_key = __contains__
+
+    def __bool__(self):
+        return bool(self._lazy) or dict.__len__(self) > 0
+
+    __nonzero__ = __bool__
+
+    def __setitem__(self, key, value):
+        self._lazy.pop(key, None)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        if self._lazy.pop(key, None) is None:
+            dict.__delitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __reduce__(self):
+        return dict, (dict(self.load()),)
+
+
+def _loaded(name):
+    method = getattr(dict, name)
+
+    def loaded(self, *args, **kwargs):
+        self.load()
+        return method(self, *args, **kwargs)
+
+    loaded.__name__ = name
+    return loaded
+
+
+for _name in ('__iter__', '__len__', '__repr__', '__eq__', '__ne__', 'keys',
+              'items', 'values', 'copy', 'pop', 'popitem', 'setdefault',
+              'iterkeys', 'iteritems', 'itervalues', 'viewkeys', 'viewitems',
+              'viewvalues'):
+    if hasattr(dict, _name):
+        setattr(Result, _name, _loaded(_name))
@@ -0,0 +1,138 @@
+import random
+import threading
+import time
+
+
+class CircuitOpenException(Exception):
+    """Raised while the circuit breaker fails requests fast"""
+
+    def __init__(self, msg):
+        self.msg = msg
+
+    def __str__(self):
+        return repr(self.msg)
+
+
+# -----------------------------------------------------------------------------
+# Class 'RetryPolicy'
+# -----------------------------------------------------------------------------
+class RetryPolicy(object):
+    """ When and how long to wait before sending a request again.
+
+    Only idempotent methods are retried, on connection errors, timeouts and
+    on the given gateway statuses. PATCHes are retried when the caller flags
+    them idempotent (merges), RPCs (POST) only when flagged idempotent and
+    'rpc' is enabled.
+
+    """
+
+    IDEMPOTENT_METHODS = ('GET', 'PUT', 'DELETE')
+
+    def __init__(self, retries=3, backoff_factor=0.5, backoff_max=10,
+                 statuses=(502, 503, 504), rpc=False):
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.statuses = tuple(statuses)
+        self.rpc = rpc
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(retries=config['retries'],
+                   backoff_factor=config['backoff_factor'],
+                   backoff_max=config['backoff_max'],
+                   statuses=config['retry_statuses'],
+                   rpc=config['retry_rpc'])
+
+    def is_retryable(self, method, idempotent=False):
+        if method in self.IDEMPOTENT_METHODS:
+            return True
+        if method == 'PATCH':
+            return bool(idempotent)
+        return bool(idempotent and self.rpc)
+
+    def is_retryable_status(self, status_code):
+        return status_code in self.statuses
+
+    def backoff(self, attempt, retry_after=None):
+        """ Returns the seconds to wait before attempt number attempt + 1.
+
+        Exponential backoff with full jitter, a Retry-After header sent by
+        the controller is honoured up to backoff_max.
+
+        """
+        delay = random.uniform(
+            0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        return min(delay, self.backoff_max)
+
+
+# -----------------------------------------------------------------------------
+# Class 'CircuitBreaker'
+# -----------------------------------------------------------------------------
+class CircuitBreaker(object):
+    """ Thread safe circuit breaker for a controller.
+
+    After 'threshold' consecutive failures the circuit opens and requests
+    fail fast with CircuitOpenException. Once 'reset_timeout' seconds have
+    passed a single probe request is let through (half open), its outcome
+    closes or re-opens the circuit. A probe with no outcome recorded within
+    'reset_timeout' re-opens it. A threshold of 0 disables the breaker.
+
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, threshold=5, reset_timeout=30, name='controller'):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self.probed_at = 0
+
+    def allow(self):
+        """ Raises CircuitOpenException if the request must not be sent. """
+        if not self.threshold:
+            return
+
+        with self.lock:
+            now = time.time()
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and \
+                    now - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.probed_at = now
+                return
+            if self.state == self.HALF_OPEN and \
+                    now - self.probed_at >= self.reset_timeout:
+                # the probe never reported back
+                self.state = self.OPEN
+                self.opened_at = now
+
+        raise CircuitOpenException(
+            'circuit open for {}, retry in {:.0f}s'.format(
+                self.name,
+                max(self.reset_timeout - (time.time() - self.opened_at), 0)))
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or \
+                    (self.threshold and self.failures >= self.threshold):
+                self.state = self.OPEN
+                self.opened_at = time.time()
@@ -0,0 +1,195 @@
+""" Selection of paths, treepaths, elines and etrees by their properties.
+
+Matches are resolved from one list request and deleted concurrently, one
+DELETE per entry, or in chunks of YANG-Patch remove edits (see
+Client.remove_elines) so that purging a large container stays within the
+controller transaction limits.
+"""
+import re
+
+import requests
+
+from lfmcli.manifest import item_result
+from lfmcli.parallel import run_parallel
+from lfmcli.reconcile import live_entries
+from lfmcli.retry import CircuitOpenException
+
+KINDS = ('paths', 'treepaths', 'elines', 'etrees')
+
+# Containers holding the endpoints of the services
+ENDPOINT_KEYS = ('endpoint1', 'endpoint2', 'root', 'leaves', 'leaf')
+
+
+def parse_range(value):
+    """ Parses 'MIN-MAX' or 'ID' into a (min, max) tuple of ints. """
+    low, sep, high = value.partition('-')
+    try:
+        low = int(low)
+        high = int(high) if sep else low
+    except ValueError:
+        raise ValueError('{} is not ID or MIN-MAX'.format(value))
+    if low > high:
+        raise ValueError('{} is an empty range'.format(value))
+    return low, high
+
+
+def endpoint_leaves(entry):
+    """ Yields the (name, value) of the leaves of an entry and of its
+    endpoints ('node', 'switch-port', 'segmentation-id'...), names without
+    their module prefix.
+    """
+    if isinstance(entry, list):
+        for child in entry:
+            for leaf in endpoint_leaves(child):
+                yield leaf
+    elif isinstance(entry, dict):
+        for key, value in entry.items():
+            key = key.split(':', 1)[-1]
+            if key in ENDPOINT_KEYS:
+                for leaf in endpoint_leaves(value):
+                    yield leaf
+            elif not isinstance(value, (dict, list)):
+                yield key, value
+
+
+def endpoint_values(entry):
+    """ Returns the nodes and segmentation ids of the entry endpoints,
+    segmentation ids that aren't integers are left out.
+
+    :return: (set of node ids, set of segmentation ids)
+
+    """
+    nodes, segmentation_ids = set(), set()
+    for key, value in endpoint_leaves(entry):
+        if key == 'node':
+            nodes.add(str(value))
+        elif key == 'switch-port':
+            nodes.add(str(value).rsplit(':', 1)[0])
+        elif key == 'segmentation-id':
+            try:
+                segmentation_ids.add(int(value))
+            except (TypeError, ValueError):
+                pass
+    return nodes, segmentation_ids
+
+
+# -----------------------------------------------------------------------------
+# Class 'Selector'
+# -----------------------------------------------------------------------------
+class Selector(object):
+    """ Matches list entries, every given criteria must match.
+
+    :param prefix: name prefix
+    :param regex: regular expression searched in the name
+    :param provider: 'sr' or 'mpls'
+    :param node: node id of an endpoint (root or leaf)
+    :param segmentation_ids: (min, max) range holding a segmentation id of
+                             an endpoint
+    :raises ValueError: on an invalid regex or provider
+    """
+
+    def __init__(self, prefix=None, regex=None, provider=None, node=None,
+                 segmentation_ids=None):
+        if provider not in (None, 'sr', 'mpls'):
+            raise ValueError('{} is not sr or mpls'.format(provider))
+        try:
+            regex = re.compile(regex) if regex else None
+        except re.error as e:
+            raise ValueError("'{}' is not a valid regex: {}".format(regex, e))
+        self.prefix = prefix
+        self.regex = regex
+        self.provider = provider
+        self.node = node
+        self.segmentation_ids = segmentation_ids
+
+    def __bool__(self):
+        return any(criteria is not None for criteria in (
+            self.prefix, self.regex, self.provider, self.node,
+            self.segmentation_ids))
+
+    __nonzero__ = __bool__
+
+    def matches(self, entry):
+        name = str(entry.get('name'))
+        if self.prefix is not None and not name.startswith(self.prefix):
+            return False
+        if self.regex is not None and not self.regex.search(name):
+            return False
+        if self.provider is not None and \
+                entry.get('provider', 'sr') != self.provider:
+            return False
+        if self.node is None and self.segmentation_ids is None:
+            return True
+
+        nodes, segmentation_ids = endpoint_values(entry)
+        if self.node is not None and self.node not in nodes:
+            return False
+        if self.segmentation_ids is not None:
+            low, high = self.segmentation_ids
+            if not any(low <= i <= high for i in segmentation_ids):
+                return False
+        return True
+
+    def select(self, fm, kind):
+        """ Returns the names of the matching entries of a kind, from a
+        single list request.
+        """
+        entries = live_entries(getattr(fm, 'get_' + kind)(), kind)
+        return [entry['name'] for entry in entries if self.matches(entry)]
+
+
+def delete_names(fm, kind, names, workers=8, batch_size=None,
+                 progress=None):
+    """ Deletes entries of a kind by name.
+
+    Without batch_size every entry is deleted by its own request, up to
+    workers at a time, else names are removed batch_size per request (see
+    Client.remove_<kind>). Entries that don't exist count as deleted.
+
+    :param progress: function called with each item result
+    :return: report dict ('deleted', 'failed' and 'errors' as apply_manifest)
+
+    """
+    progress = progress or (lambda result: None)
+
+    def delete(name):
+        try:
+            r = getattr(fm, 'delete_' + kind[:-1])(name)
+        except (requests.exceptions.RequestException,
+                CircuitOpenException) as e:
+            return item_result(kind, {'name': name}, None, str(e))
+        status_code = r.get('status_code')
+        return item_result(kind, {'name': name}, status_code,
+                           None if status_code in (200, 204, 404)
+                           else r.get('content'))
+
+    def remove(batch):
+        try:
+            r = getattr(fm, 'remove_' + kind)(batch, chunk_size=batch_size)
+        except (requests.exceptions.RequestException,
+                CircuitOpenException) as e:
+            return [item_result(kind, {'name': name}, None, str(e))
+                    for name in batch]
+        return [item_result(kind, result, result['status_code'],
+                            result['error']) for result in r['results']]
+
+    if batch_size:
+        batches = [names[i:i + batch_size]
+                   for i in range(0, len(names), batch_size)]
+        results = (result for batch in run_parallel(remove, batches, workers)
+                   for result in batch)
+    else:
+        results = run_parallel(delete, names, workers)
+
+    report = {'deleted': 0, 'failed': 0, 'errors': []}
+    for result in results:
+        if result['status'] == 'ok':
+            report['deleted'] += 1
+        else:
+            report['failed'] += 1
+            report['errors'].append(dict(
+                (key, result[key])
+                for key in ('kind', 'name', 'status_code', 'error')))
+        progress(result)
+
+    return report
@@ -0,0 +1,146 @@
+""" Snapshots of the Flow Manager services.
+
+A snapshot is a gzip compressed json document holding the paths,
+treepaths, elines, etrees and taps of a controller::
+
+    {"format": "lfm-snapshot", "version": 1,
+     "created": "2024-01-01T00:00:00Z", "controller": "10.0.0.1:8181",
+     "counts": {"paths": 2, ...},
+     "services": {"paths": [...], ..., "taps": [...]}}
+
+'services' is a manifest (see lfmcli.manifest): taps are split from their
+elines, so a restore creates them after the elines like 'lfm apply'.
+"""
+import gzip
+import json
+import time
+
+from lfmcli.manifest import KINDS, apply_manifest
+from lfmcli.parallel import run_parallel
+from lfmcli.reconcile import ENDPOINTS, ReconcileException, live_entries, \
+    split_taps
+
+FORMAT = 'lfm-snapshot'
+VERSION = 1
+
+
+class SnapshotException(Exception):
+    """Snapshot can't be taken or read"""
+
+    def __init__(self, msg):
+        self.msg = msg
+
+    def __str__(self):
+        return repr(self.msg)
+
+
+def read_kind(fm, kind):
+    """ Returns (kind, list entries) of the configured services of a kind """
+    try:
+        return kind, live_entries(getattr(fm, 'get_' + kind)(), kind)
+    except ReconcileException as e:
+        raise SnapshotException(e.msg)
+
+
+def read_taps(fm, eline, endpoint):
+    """ Returns the manifest tap entries of an eline endpoint """
+    r = fm.get_taps(eline, endpoint)
+    if r.get('status_code') == 404:
+        return []
+    if r.get('status_code') != 200:
+        raise SnapshotException('failed to get taps of {} {}: {} {}'.format(
+            eline, endpoint, r.get('status_code'), r.get('content')))
+    taps = []
+    for container in (r[endpoint] or {}).values():
+        for name, entries in (container or {}).items():
+            if name.split(':', 1)[-1] == 'tap':
+                taps.extend(dict(tap, eline=eline, endpoint=endpoint)
+                            for tap in entries)
+    return taps
+
+
+def export_snapshot(fm, workers=8, tap_reads=False):
+    """ Reads the services of the controller.
+
+    The kinds are read concurrently, one request each. The taps come with
+    the elines, with tap_reads the taps of every eline endpoint are read
+    on their own instead (up to workers requests at a time).
+
+    :param fm: lfmcli.api.Client
+    :return: snapshot dict (see module)
+
+    """
+    kinds = [kind for kind in KINDS if kind != 'taps']
+    state = dict(run_parallel(lambda kind: read_kind(fm, kind), kinds,
+                              workers))
+    services = split_taps(state)
+
+    if tap_reads:
+        endpoints = [(eline['name'], endpoint)
+                     for eline in services['elines']
+                     for endpoint in ENDPOINTS if endpoint in eline]
+        services['taps'] = []
+        for taps in run_parallel(lambda item: read_taps(fm, *item),
+                                 endpoints, workers):
+            services['taps'].extend(taps)
+        services['taps'].sort(key=lambda tap: (tap['eline'],
+                                               tap['endpoint'],
+                                               tap.get('path-name')))
+
+    return {'format': FORMAT, 'version': VERSION,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'controller': '{ip}:{port}'.format(**fm.ctrl.config),
+            'counts': dict((kind, len(services[kind])) for kind in KINDS),
+            'services': services}
+
+
+def write_snapshot(snapshot, filename):
+    """ Writes a snapshot to a gzip file """
+    data = json.dumps(snapshot, separators=(',', ':'), sort_keys=True)
+    with gzip.open(filename, 'wb') as f:
+        f.write(data.encode('utf-8'))
+
+
+def read_snapshot(filename):
+    """ Reads and checks a snapshot file.
+
+    :raise SnapshotException: when the file is not a snapshot or is of a
+                              later version
+
+    """
+    try:
+        with gzip.open(filename, 'rb') as f:
+            snapshot = json.loads(f.read().decode('utf-8'))
+    except (IOError, ValueError) as e:
+        raise SnapshotException('{} is not a snapshot: {}'.format(
+            filename, e))
+
+    if not isinstance(snapshot, dict) or snapshot.get('format') != FORMAT:
+        raise SnapshotException('{} is not a snapshot'.format(filename))
+    if not isinstance(snapshot.get('version'), int) or \
+            snapshot['version'] > VERSION:
+        raise SnapshotException(
+            'unsupported snapshot version {!r} (up to {})'.format(
+                snapshot.get('version'), VERSION))
+    services = snapshot.get('services')
+    if not isinstance(services, dict) or \
+            not all(isinstance(services.get(kind, []), list)
+                    for kind in KINDS):
+        raise SnapshotException('{} has no services'.format(filename))
+    return snapshot
+
+
+def restore_snapshot(fm, snapshot, workers=8, chunk_size=None,
+                     progress=None):
+    """ Creates (or updates) the services of a snapshot.
+
+    Paths, treepaths, elines and etrees are merged with chunked YANG-Patch
+    requests, then the taps are added, up to workers requests at a time
+    (see lfmcli.manifest.apply_manifest).
+
+    :return: report dict of apply_manifest
+    """
+    services = dict((kind, snapshot['services'].get(kind) or [])
+                    for kind in KINDS)
+    return apply_manifest(fm, services, workers=workers, bulk=True,
+                          chunk_size=chunk_size, progress=progress)
@@ -0,0 +1,174 @@
+""" Formatting and sampling of E-Line and E-Tree stats.
+
+See Client.iter_stats and Client.watch_stats.
+"""
+import json
+import numbers
+import time
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
+
+def flatten(output, prefix=''):
+    """ Returns the numeric counters of a get-stats output.
+
+    Nested containers and lists are flattened to dotted keys, i.e.
+    {'endpoint1': {'packets': 5}} becomes {'endpoint1.packets': 5}.
+
+    """
+    counters = {}
+    if isinstance(output, dict):
+        children = output.items()
+    elif isinstance(output, list):
+        children = enumerate(output)
+    else:
+        children = ()
+
+    for key, value in children:
+        if isinstance(value, bool) or key == 'name':
+            continue
+        key = '{}{}'.format(prefix, key)
+        if isinstance(value, numbers.Number):
+            counters[key] = value
+        elif isinstance(value, (dict, list)):
+            counters.update(flatten(value, key + '.'))
+        elif isinstance(value, string_types) and value.isdigit():
+            counters[key] = int(value)
+    return counters
+
+
+def table(rows):
+    """ Returns the lines of a text table of stats dicts.
+
+    A column is added per counter and a last row holds the totals.
+
+    """
+    counters = [flatten(row['output']) for row in rows]
+    columns = sorted(set(key for row in counters for key in row))
+    totals = dict((column, sum(row.get(column, 0) for row in counters))
+                  for column in columns)
+
+    lines = [['name'] + columns + ['error']]
+    for row, values in sorted(zip(rows, counters),
+                              key=lambda item: item[0]['name']):
+        lines.append([row['name']] +
+                     [str(values.get(column, '')) for column in columns] +
+                     [' '.join(str(row['error'] or '').split())[:60]])
+    lines.append(['TOTAL'] + [str(totals[column]) for column in columns] +
+                 [''])
+
+    widths = [max(len(line[i]) for line in lines)
+              for i in range(len(lines[0]))]
+    return ['  '.join(value.ljust(width)
+                      for value, width in zip(line, widths)).rstrip()
+            for line in lines]
+
+
+def write_stats(results, fmt, write):
+    """ Writes stats dicts as they come (ndjson) or as a table.
+
+    :param results: iterable of stats dicts
+    :param fmt: 'ndjson' or 'table'
+    :param write: function called with each output line
+    :return: (number of services, number of errors)
+
+    """
+    rows = []
+    count = errors = 0
+    for result in results:
+        count += 1
+        if result['error']:
+            errors += 1
+        if fmt == 'ndjson':
+            write(json.dumps(result, sort_keys=True))
+        else:
+            rows.append(result)
+
+    if fmt != 'ndjson':
+        for line in table(rows):
+            write(line)
+    return count, errors
+
+
+def deltas(previous, current, seconds):
+    """ Returns the change of each counter between two flattened samples.
+
+    A counter lower than in the previous sample was reset (service or
+    switch restarted), its delta is then its current value.
+
+    :return: dict of counter: {'delta', 'rate' (per second), 'reset'}
+
+    """
+    changes = {}
+    for key, value in current.items():
+        if key not in previous:
+            continue
+        reset = value < previous[key]
+        delta = value if reset else value - previous[key]
+        changes[key] = {'delta': delta, 'reset': reset,
+                        'rate': delta / float(seconds) if seconds > 0
+                        else None}
+    return changes
+
+
+def schedule(interval, count=None, clock=time.time, sleep=time.sleep):
+    """ Yields at start + n * interval, for n = 0, 1, 2...
+
+    Ticks are computed from the start time, not from the previous tick, so
+    the time spent by the caller between ticks doesn't accumulate. Ticks
+    missed because the caller overran are skipped.
+
+    :param count: number of ticks yielded, default forever
+    :return: generator of tick numbers
+
+    """
+    start = clock()
+    tick = ticks = 0
+    while count is None or ticks < count:
+        delay = start + tick * interval - clock()
+        if delay > 0:
+            sleep(delay)
+        yield tick
+        ticks += 1
+        tick = max(tick + 1, int((clock() - start) / interval) + 1)
+
+
+def watch(sample, interval, count=None, clock=time.time, sleep=time.sleep):
+    """ Samples counters periodically and yields their per interval change.
+
+    Rates use the measured time between samples (middle of each request),
+    not the nominal interval, so request latency doesn't skew them.
+
+    :param sample: function returning (get-stats output, error message)
+    :param interval: seconds between samples
+    :param count: number of samples, default forever
+    :return: generator of watch dicts (See below)
+
+    Watch Dict:
+      'time': sample time (epoch seconds)
+      'seconds': seconds since the previous successful sample (None first)
+      'counters': flattened counters of the sample
+      'deltas': counter changes (see deltas), None for the first sample
+      'error': error message or None
+
+    """
+    previous = None
+    for tick in schedule(interval, count, clock, sleep):
+        before = clock()
+        output, error = sample()
+        now = (before + clock()) / 2.0
+
+        result = {'time': now, 'seconds': None, 'counters': {},
+                  'deltas': None, 'error': error}
+        if error is None:
+            result['counters'] = flatten(output)
+            if previous is not None:
+                result['seconds'] = now - previous['time']
+                result['deltas'] = deltas(previous['counters'],
+                                          result['counters'],
+                                          result['seconds'])
+            previous = result
+        yield result
@@ -0,0 +1,4 @@
+import sys
+
+# the asyncio client needs python 3.6+ (async generators)
+collect_ignore = [] if sys.version_info >= (3, 6) else ['test_aio.py']
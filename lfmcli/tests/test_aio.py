@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+import pytest
+
+from lfmcli.fakeserver import FakeFlowManager
+
+aio = pytest.importorskip('lfmcli.aio')
+if aio.aiohttp is None:
+    pytest.skip('needs aiohttp', allow_module_level=True)
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_async_client_shares_the_client_requests():
+    async def scenario(config):
+        async with aio.AsyncClient(config=config) as fm:
+            path = {'name': 'p1', 'endpoint1': {'node': 'openflow:1'},
+                    'endpoint2': {'node': 'openflow:2'}}
+            assert (await fm.add_path(path=path))['status_code'] in (200, 201)
+            r = await fm.get_path('p1', fields='name')
+            assert r['path'] == {'name': 'p1'}
+            assert 'content' not in r
+
+            elines = [{'name': 'e{}'.format(i), 'path-name': 'p1'}
+                      for i in range(5)]
+            r = await fm.add_elines(elines, chunk_size=2, workers=2)
+            assert (r['status_code'], r['requests'], r['errors']) == \
+                (200, 3, 0)
+            names = [eline['name'] async for eline in fm.iter_elines()]
+            assert sorted(names) == ['e{}'.format(i) for i in range(5)]
+            stats = [s async for s in fm.iter_eline_stats(workers=2)]
+            assert sorted(s['name'] for s in stats) == sorted(names)
+
+            r = await fm.remove_elines(names)
+            assert r['errors'] == 0
+            assert [eline async for eline in fm.iter_elines()] == []
+
+    with FakeFlowManager(query_params=True) as server:
+        run(scenario(server.client_config(lean=True)))
+
+
+def test_leader_discovery_runs_off_the_event_loop():
+    with FakeFlowManager() as server:
+        members = [{'ip': server.host, 'port': server.port}]
+        fm = aio.AsyncClient(config=server.client_config(members=members))
+        threads = []
+        jolokia_read = fm.ctrl.jolokia_read
+
+        def recording(member, mbean):
+            threads.append(threading.current_thread())
+            return jolokia_read(member, mbean)
+
+        fm.ctrl.jolokia_read = recording
+
+        async def scenario():
+            r = await fm.add_eline(eline={'name': 'e1', 'path-name': 'p1'})
+            await fm.close()
+            return r
+
+        assert run(scenario())['status_code'] in (200, 201)
+        assert threads
+        assert threading.main_thread() not in threads
+        assert fm.ctrl.leaders.leaders['default'][0].port == server.port
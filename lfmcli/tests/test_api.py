@@ -0,0 +1,145 @@
+import json
+
+import pytest
+
+from lfmcli.api import Client, FlowManagerClientException
+from lfmcli.fakeserver import FakeFlowManager
+
+PATH = {'name': 'p1', 'endpoint1': {'node': 'openflow:1'},
+        'endpoint2': {'node': 'openflow:2'}}
+ELINE = {'name': 'e1', 'path-name': 'p1',
+         'endpoint1': {'switch-port': 'openflow:1:1'},
+         'endpoint2': {'switch-port': 'openflow:2:1'}}
+TAP = {'path-name': 'p1', 'egress': {'action': [
+    {'order': 0, 'output-action': {'output-node-connector': '2'}}]}}
+
+
+@pytest.fixture
+def server():
+    with FakeFlowManager(nodes=3, connectors=2) as server:
+        yield server
+
+
+@pytest.fixture
+def fm(server):
+    fm = Client(config=server.client_config())
+    yield fm
+    fm.close()
+
+
+def test_reads_of_missing_entries(fm):
+    r = fm.get_path('p1')
+    assert r['status_code'] == 404
+    assert 'path' not in r
+    assert r['content']
+
+
+def test_path_lifecycle(fm):
+    r = fm.add_path(path=PATH)
+    assert set(r) == set(['status_code', 'content'])
+    assert r['status_code'] in (200, 201)
+
+    r = fm.get_path('p1')
+    assert r['status_code'] == 200
+    assert r['path']['name'] == 'p1'
+    assert json.loads(r['content'])['path'][0]['name'] == 'p1'
+    r = fm.get_paths()
+    assert [p['name'] for p in r['paths']['paths']['path']] == ['p1']
+    assert [p['name'] for p in fm.iter_paths()] == ['p1']
+
+    assert fm.delete_path('p1')['status_code'] == 200
+    assert fm.delete_path('p1')['status_code'] == 404
+    assert list(fm.iter_paths()) == []
+
+
+def test_eline_taps_and_stats(fm):
+    fm.add_path(path=PATH)
+    assert fm.add_eline(eline=ELINE)['status_code'] in (200, 201)
+    assert fm.add_tap('e1', 'endpoint1', tap=TAP)['status_code'] in \
+        (200, 201)
+
+    assert fm.get_tap('e1', 'endpoint1', 'p1')['tap']['path-name'] == 'p1'
+    assert 'endpoint1' in fm.get_taps('e1', 'endpoint1')
+    r = fm.get_eline_stats('e1')
+    assert r['status_code'] == 200
+    assert r['output']['endpoint1']['packets'] >= 0
+    assert [s['name'] for s in fm.iter_eline_stats()] == ['e1']
+
+    assert fm.delete_tap('e1', 'endpoint1', 'p1')['status_code'] == 200
+    assert fm.delete_elines()['status_code'] == 200
+
+
+def test_refused_container_delete_returns_the_list(server, fm):
+    fm.add_path(path=PATH)
+    server.error_rate = {'path': 1.0}
+    r = Client(config=server.client_config(retries=0)).delete_paths()
+    assert r['status_code'] == server.error_code
+    assert 'paths' not in r
+
+
+def test_missing_properties_raise(fm):
+    with pytest.raises(FlowManagerClientException):
+        fm.add_path(path=None)
+    with pytest.raises(FlowManagerClientException):
+        fm.add_etree_leaf('t1', None)
+
+
+def test_bulk_writes(fm):
+    paths = [dict(PATH, name='p{}'.format(i)) for i in range(5)]
+    r = fm.add_paths(paths, chunk_size=2, workers=2)
+    assert (r['status_code'], r['requests'], r['errors']) == (200, 3, 0)
+    assert [result['name'] for result in r['results']] == \
+        [p['name'] for p in paths]
+    assert all(result['ok'] for result in r['results'])
+
+    r = fm.remove_paths(['p0', 'p1', 'nope'])
+    assert r['errors'] == 0
+    assert sorted(p['name'] for p in fm.iter_paths()) == ['p2', 'p3', 'p4']
+
+
+def test_lean_results_and_fields(server):
+    fm = Client(config=server.client_config(lean=True))
+    fm.add_path(path=PATH)
+
+    r = fm.get_path('p1', fields='name')
+    assert 'content' not in r
+    assert r['path'] == {'name': 'p1'}
+    assert fm.get_path('nope')['content']
+    fm.close()
+
+
+def test_inventory_reads(fm):
+    r = fm.get_ofnodes()
+    assert [node['id'] for node in r['nodes']] == \
+        ['openflow:1', 'openflow:2', 'openflow:3']
+    assert fm.get_ofnode_ids()['nodes'] == \
+        ['openflow:1', 'openflow:2', 'openflow:3']
+    assert fm.get_ofnode('openflow:1')['node']['id'] == 'openflow:1'
+    r = fm.get_ofnode_connector('openflow:1', 'openflow:1:1')
+    assert r['node-connector']['id'] == 'openflow:1:1'
+    r = fm.get_ofnode_connector_stats('openflow:1', 'openflow:1:1')
+    assert 'packets' in r['stats']
+    assert len(list(fm.iter_connector_stats())) == 6
+    assert [node['id'] for node in fm.iter_nodes()] == \
+        ['openflow:1', 'openflow:2', 'openflow:3']
+
+
+def test_controller_status_keeps_the_content(server):
+    fm = Client(config=server.client_config(lean=True))
+    r = fm.get_controller_status()
+    assert r['status_code'] == 200
+    assert r['content']
+    fm.close()
+
+
+def test_connector_stats_of_explicit_nodes(server, fm):
+    before = server.get_counters().get('inventory', 0)
+    stats = list(fm.iter_connector_stats(['openflow:2', 'openflow:9']))
+
+    assert [(s['node'], s['name']) for s in stats if not s['error']] == \
+        [('openflow:2', 'openflow:2:1'), ('openflow:2', 'openflow:2:2')]
+    missing = [s for s in stats if s['error']]
+    assert [(s['node'], s['status_code']) for s in missing] == \
+        [('openflow:9', 404)]
+    # one read per node, not the whole inventory
+    assert server.get_counters()['inventory'] - before == 2
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from lfmcli.cache import StateCache, resource_path
+
+BASE = 'http://fm:8181/restconf'
+ELINES = 'lumina-flowmanager-eline:elines'
+
+
+class Response(object):
+
+    def __init__(self, content, status_code=200):
+        self.status_code = status_code
+        self.content = content
+
+
+@pytest.fixture
+def cache(tmpdir):
+    cache = StateCache(path=str(tmpdir.join('lfm', 'cache.sqlite')),
+                       controller='fm:8181')
+    yield cache
+    cache.close()
+
+
+def url(datastore, path, query=''):
+    return '{}/{}/{}{}'.format(BASE, datastore, path, query)
+
+
+def test_resource_path():
+    assert resource_path(url('config', ELINES + '/eline/e1/', '?depth=2')) \
+        == ELINES + '/eline/e1'
+    assert resource_path(url('operational', ELINES)) == ELINES
+    assert resource_path(BASE + '/operations/lumina-flowmanager-eline:get') \
+        is None
+
+
+def test_get_put(cache, monkeypatch):
+    assert cache.get(url('config', ELINES)) is None
+    cache.put(url('config', ELINES), Response(b'{}'))
+    cached = cache.get(url('config', ELINES))
+    assert (cached.status_code, cached.content) == (200, b'{}')
+
+    stored = time.time()
+    monkeypatch.setattr(time, 'time', lambda: stored + 301)
+    assert cache.get(url('config', ELINES)) is None
+    assert cache.get(url('config', ELINES), ttl=600).content == b'{}'
+
+
+def test_invalidate(cache):
+    urls = [url('operational', ELINES),
+            url('operational', ELINES, '?depth=1'),
+            url('config', ELINES + '/eline/X'),
+            url('operational', ELINES + '/eline/X/endpoint1'),
+            url('config', ELINES + '/eline/X1'),
+            url('operational', ELINES + '/eline/X1/endpoint1'),
+            url('config', 'lumina-flowmanager-path:paths')]
+    for u in urls:
+        cache.put(u, Response(b'{}'))
+    other = StateCache(path=cache.path, controller='other:8181')
+    other.put(urls[0], Response(b'{}'))
+
+    cache.invalidate(url('config', ELINES + '/eline/X'))
+    assert [u for u in urls if cache.get(u) is not None] == urls[4:]
+    assert other.get(urls[0]) is not None
+    other.close()
+
+
+def test_clear(cache):
+    cache.put(url('config', ELINES), Response(b'{}'))
+    cache.clear()
+    assert cache.get(url('config', ELINES)) is None
@@ -0,0 +1,53 @@
+import json
+import threading
+import time
+
+from lfmcli.cluster import LeaderCache, Member
+from lfmcli.controller import Controller
+from lfmcli.fakeserver import FakeFlowManager
+
+
+def test_leader_discovery_runs_outside_the_lock_once():
+    cache = LeaderCache(ttl=60)
+    leader = Member('10.0.0.1', 8181)
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def discover(shard):
+        calls.append(shard)
+        started.set()
+        release.wait(5)
+        return leader
+
+    thread = threading.Thread(target=cache.get, args=('default', discover))
+    thread.start()
+    started.wait(5)
+
+    # a second caller neither waits nor discovers again
+    start = time.time()
+    assert cache.get('default', discover) is None
+    assert time.time() - start < 1
+    release.set()
+    thread.join()
+
+    assert calls == ['default']
+    assert cache.get('default', discover) is leader
+
+
+def test_failed_write_invalidates_the_shard_leader():
+    with FakeFlowManager(error_rate={'eline': 1.0}) as leader, \
+            FakeFlowManager() as follower:
+        members = [{'ip': leader.host, 'port': leader.port},
+                   {'ip': follower.host, 'port': follower.port}]
+        ctrl = Controller(config=follower.client_config(
+            members=members, retries=0))
+        url = ctrl.get_config_url() + \
+            '/lumina-flowmanager-eline:elines/eline/e1'
+
+        resp = ctrl.http_request('PUT', url, data=json.dumps(
+            {'eline': [{'name': 'e1'}]}))
+
+        assert resp.status_code == 503
+        assert 'default' not in ctrl.leaders.leaders
+        ctrl.close()
@@ -0,0 +1,74 @@
+import threading
+import traceback
+
+import pytest
+
+from lfmcli.dag import Dag, DagException, execute
+
+
+def chain():
+    dag = Dag()
+    dag.add('path', 'p1')
+    dag.add('eline', 'e1', depends=['path'])
+    dag.add('tap', 't1', depends=['eline', 'unknown'])
+    dag.add('other', 'o1')
+    return dag
+
+
+def test_duplicate_keys_and_cycles():
+    dag = Dag()
+    dag.add('a', 1, depends=['c'])
+    with pytest.raises(DagException):
+        dag.add('a', 2)
+    dag.add('b', 2, depends=['a'])
+    dag.add('c', 3, depends=['b'])
+    dag.add('d', 4)
+    with pytest.raises(DagException) as e:
+        dag.dependents()
+    assert "'d'" not in str(e.value)
+    with pytest.raises(DagException):
+        list(execute(dag, lambda item: item))
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_dependencies_run_first(workers):
+    order = []
+    lock = threading.Lock()
+
+    def run(item):
+        with lock:
+            order.append(item)
+        return item.upper()
+
+    results = list(execute(chain(), run, workers))
+
+    assert sorted(results) == sorted([('path', 'P1'), ('eline', 'E1'),
+                                      ('tap', 'T1'), ('other', 'O1')])
+    assert order.index('p1') < order.index('e1') < order.index('t1')
+
+
+def test_dependents_of_a_failure_are_skipped():
+    dag = chain()
+    dag.add('tree', 'r1', depends=['path'])
+
+    def skip(key, item, failed):
+        return 'skipped after {}'.format(','.join(failed))
+
+    results = dict(execute(dag, lambda item: item != 'p1', 2,
+                           ok=lambda key, result: result, skip=skip))
+
+    assert results == {'path': False, 'eline': 'skipped after path',
+                       'tree': 'skipped after path',
+                       'tap': 'skipped after eline', 'other': True}
+
+
+def test_errors_propagate_with_their_traceback():
+    def boom(item):
+        if item == 'e1':
+            raise ValueError('bad eline')
+        return item
+
+    with pytest.raises(ValueError) as e:
+        list(execute(chain(), boom, 2))
+    assert str(e.value) == 'bad eline'
+    assert traceback.extract_tb(e.tb)[-1][2] == 'boom'
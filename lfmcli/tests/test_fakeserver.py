@@ -0,0 +1,44 @@
+import json
+
+import requests
+
+from lfmcli.fakeserver import FakeFlowManager
+
+ELINES = '/restconf/config/lumina-flowmanager-eline:elines'
+PATHS = '/restconf/config/lumina-flowmanager-path:paths'
+
+
+def eline(name):
+    return json.dumps({'eline': [{'name': name, 'path-name': 'p1'}]})
+
+
+def url(server, path):
+    return 'http://{}:{}{}'.format(server.host, server.port, path)
+
+
+def test_injected_errors_keep_the_connection_usable():
+    with FakeFlowManager(error_rate={'eline': 0.5}, seed=1) as server:
+        session = requests.Session()
+        statuses = [session.put(url(server, ELINES + '/eline/e{}'.format(i)),
+                                data=eline('e{}'.format(i)),
+                                auth=('admin', 'admin')).status_code
+                    for i in range(12)]
+        session.close()
+
+    assert 503 in statuses
+    assert set(statuses) <= set([200, 201, 503])
+
+
+def test_error_replies_drain_the_request_body():
+    with FakeFlowManager(error_rate={'eline': 1.0}) as server:
+        session = requests.Session()
+        auth = ('admin', 'admin')
+        r = session.put(url(server, ELINES + '/eline/e1'), data=eline('e1'),
+                        auth=auth)
+        assert r.status_code == 503
+        r = session.put(url(server, '/restconf/unknown/x/y'),
+                        data=eline('e1'), auth=auth)
+        assert r.status_code == 405
+        r = session.get(url(server, PATHS), auth=auth)
+        assert r.status_code == 404
+        session.close()
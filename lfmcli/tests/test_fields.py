@@ -0,0 +1,70 @@
+import pytest
+
+from lfmcli.fields import limit_depth, matches, parse_fields, project, \
+    query, select
+
+ELINES = {'lumina-flowmanager-eline:elines': {'eline': [
+    {'name': 'e1', 'path-name': 'p1',
+     'endpoint1': {'switch-port': 'openflow:1:1', 'vlan': 10}},
+    {'name': 'e2', 'endpoint1': {'switch-port': 'openflow:2:1'}}]}}
+
+
+def test_parse_fields():
+    assert parse_fields('a;b/c;d(e;f/g)') == \
+        {'a': None, 'b': {'c': None}, 'd': {'e': None, 'f': {'g': None}}}
+    # paths to the same node merge, a whole node wins
+    assert parse_fields('b/c;b/d') == {'b': {'c': None, 'd': None}}
+    assert parse_fields('b/c;b') == {'b': None}
+    assert parse_fields(' a ; b ') == {'a': None, 'b': None}
+
+
+@pytest.mark.parametrize('expr', ['a;;b', 'a/', 'a(b', 'a)b', '(b)'])
+def test_malformed_fields(expr):
+    with pytest.raises(ValueError):
+        parse_fields(expr)
+
+
+def test_module_prefixes_are_optional():
+    assert matches('lumina-flowmanager-eline:eline', 'eline')
+    assert matches('eline', 'eline')
+    assert not matches('other:eline', 'lumina-flowmanager-eline:eline')
+
+
+def test_project():
+    tree = parse_fields('eline(name;endpoint1/switch-port)')
+    assert project(ELINES['lumina-flowmanager-eline:elines'], tree) == \
+        {'eline': [{'name': 'e1',
+                    'endpoint1': {'switch-port': 'openflow:1:1'}},
+                   {'name': 'e2',
+                    'endpoint1': {'switch-port': 'openflow:2:1'}}]}
+    assert project('leaf', tree) == 'leaf'
+
+
+def test_limit_depth():
+    value = {'a': 1, 'b': {'c': {'d': 2}}, 'l': [{'x': {'y': 1}}]}
+    assert limit_depth(value, 0) == {}
+    assert limit_depth(value, 1) == {'a': 1, 'b': {}, 'l': [{}]}
+    assert limit_depth(value, 2) == {'a': 1, 'b': {'c': {}},
+                                     'l': [{'x': {}}]}
+
+
+def test_select():
+    assert select(ELINES, 'eline(name)') == \
+        {'lumina-flowmanager-eline:elines': {'eline': [{'name': 'e1'},
+                                                       {'name': 'e2'}]}}
+    # the resource read is level 1
+    assert select(ELINES, depth=2) == \
+        {'lumina-flowmanager-eline:elines': {'eline': [{}, {}]}}
+    assert select(ELINES) == ELINES
+
+
+def test_query():
+    assert query() == ''
+    assert query('eline(name;endpoint1/switch-port)', 2) == \
+        '?fields=eline(name%3Bendpoint1/switch-port)&depth=2'
+    assert query('a b') == '?fields=a%20b'
+    assert query(depth='3') == '?depth=3'
+    with pytest.raises(ValueError):
+        query(depth=0)
+    with pytest.raises(ValueError):
+        query('a(')
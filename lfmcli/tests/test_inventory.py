@@ -0,0 +1,84 @@
+import pytest
+
+from lfmcli.api import Client
+from lfmcli.fakeserver import INVENTORY, TOPOLOGY, FakeFlowManager
+from lfmcli.inventory import Inventory
+from lfmcli.models import Node, NodeConnector
+
+
+@pytest.fixture
+def server():
+    with FakeFlowManager(nodes=3, connectors=2) as server:
+        yield server
+
+
+@pytest.fixture
+def fm(server):
+    return Client(config=server.client_config())
+
+
+def test_lookups(fm):
+    inventory = Inventory.from_client(fm)
+    assert len(inventory) == 3 and 'openflow:2' in inventory
+    assert isinstance(inventory.node('openflow:2'), Node)
+    connector = inventory.connector('openflow:2:1')
+    assert isinstance(connector, NodeConnector)
+    assert inventory.connector_node('openflow:2:1') == 'openflow:2'
+    assert inventory.port(connector.name) == 'openflow:2:1'
+    assert inventory.resolve(connector.hardware_address.upper()) == \
+        'openflow:2:1'
+    assert inventory.unknown_endpoints(
+        {'name': 'e1', 'endpoint1': {'switch-port': 'openflow:2:1'},
+         'endpoint2': {'switch-port': 'openflow:9:1'}}) == ['openflow:9:1']
+
+
+def test_unprefixed_leaves():
+    inventory = Inventory([{'id': 'openflow:1', 'node-connector': [
+        {'id': 'openflow:1:1', 'name': 'eth1',
+         'hardware-address': '02:00:00:00:00:01'}]}])
+    assert inventory.port('eth1') == 'openflow:1:1'
+    assert inventory.hardware_address('02:00:00:00:00:01') == 'openflow:1:1'
+    inventory.remove_node('openflow:1')
+    assert inventory.port('eth1') is None
+    assert inventory.hardware_addresses == {}
+
+
+def test_refresh(server, fm):
+    inventory = Inventory.from_client(fm)
+    nodes = server.operational.roots[INVENTORY]['node']
+    topology = server.operational.roots[TOPOLOGY]['topology'][0]['node']
+
+    # openflow:3 leaves, openflow:4 joins and openflow:2 gets a port
+    del nodes[2], topology[2]
+    nodes.append(server.make_node(4, 2, 0))
+    topology.append({'node-id': 'openflow:4', 'termination-point': [
+        {'tp-id': 'openflow:4:1'}, {'tp-id': 'openflow:4:2'}]})
+    nodes[1]['node-connector'].append(
+        dict(nodes[1]['node-connector'][0], id='openflow:2:3'))
+    topology[1]['termination-point'].append({'tp-id': 'openflow:2:3'})
+
+    before = server.get_counters()['inventory']
+    changes = inventory.refresh(fm)
+    assert changes == {'added': ['openflow:4'], 'updated': ['openflow:2'],
+                       'removed': ['openflow:3']}
+    # the topology and the two changed nodes
+    assert server.get_counters()['inventory'] - before == 3
+    assert sorted(inventory.nodes) == ['openflow:1', 'openflow:2',
+                                       'openflow:4']
+    assert inventory.connector_node('openflow:2:3') == 'openflow:2'
+    assert inventory.connector('openflow:3:1') is None
+
+    assert inventory.refresh(fm) == \
+        {'added': [], 'updated': [], 'removed': []}
+
+
+def test_refresh_without_termination_points(server, fm):
+    inventory = Inventory.from_client(fm)
+    for node in server.operational.roots[TOPOLOGY]['topology'][0]['node']:
+        del node['termination-point']
+    server.operational.roots[INVENTORY]['node'][0]['node-connector'].pop()
+    assert inventory.refresh(fm) == \
+        {'added': [], 'updated': [], 'removed': []}
+    assert inventory.refresh(fm, nodes=['openflow:1']) == \
+        {'added': [], 'updated': ['openflow:1'], 'removed': []}
+    assert inventory.connector('openflow:1:2') is None
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from lfmcli.jsonstream import JsonStreamException, Reader, iter_list
+
+DOC = {'lumina-flowmanager-eline:elines': {'other': [1, 2], 'eline': [
+    {'name': u'é1', 'mtu': 1500, 'ratio': -1.25e3},
+    {'name': 'e2', 'tags': ['a', {'b': None}], 'up': True}]}}
+PATH = ('elines', 'eline')
+
+
+def chunked(text, size):
+    data = text.encode('utf-8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 100000])
+def test_entries_across_chunk_boundaries(size):
+    chunks = chunked(json.dumps(DOC, ensure_ascii=False), size)
+    assert list(iter_list(chunks, PATH)) == DOC[
+        'lumina-flowmanager-eline:elines']['eline']
+
+
+def test_number_split_across_chunks():
+    chunks = [b'{"l": [12', b'34', b', 5', b'6.', b'5e', b'1]}']
+    assert list(iter_list(chunks, ('l',))) == [1234, 565.0]
+
+
+def test_truncated_after_number():
+    entries = iter_list([b'{"l": [7', b'8'], ('l',))
+    assert next(entries) == 78
+    with pytest.raises(JsonStreamException):
+        next(entries)
+
+
+def test_split_utf8_sequence():
+    data = u'{"l": ["é€"]}'.encode('utf-8')
+    at = data.index(b'\xe2') + 1
+    assert list(iter_list([data[:at], data[at:]], ('l',))) == \
+        [u'é€']
+
+
+def test_missing_and_empty_lists():
+    assert list(iter_list([b'{"elines": {}}'], PATH)) == []
+    assert list(iter_list([b'{"elines": {"eline": []}}'], PATH)) == []
+    assert list(iter_list([b'{"elines": {"eline": 5}}'], PATH)) == []
+    assert list(iter_list([b'[]'], PATH)) == []
+    assert list(iter_list([], PATH)) == []
+
+
+def test_malformed_documents():
+    with pytest.raises(JsonStreamException):
+        list(iter_list([b'{"l": [1, 2'], ('l',)))
+    with pytest.raises(JsonStreamException):
+        list(iter_list([b'{"l": [1; 2]}'], ('l',)))
+
+
+def test_reader_text_chunks():
+    reader = Reader([u' {"a"', u': 1}'])
+    assert reader.peek() == '{'
+    reader.expect('{')
+    assert reader.value() == 'a'
+    reader.expect(':')
+    assert reader.value() == 1
+    assert reader.expect('}') == '}'
+    assert reader.peek() is None
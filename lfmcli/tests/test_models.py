@@ -0,0 +1,84 @@
+import copy
+import json
+
+import pytest
+
+from lfmcli import models
+
+ENDPOINT = {'switch-port': 'openflow:1:1', 'segmentation-id': 10,
+            'network-type': 'vlan', 'vendor:color': 'red',
+            'taps': {'tap': [{'path-name': 'p1', 'egress': [None]}]}}
+
+ENTRIES = {
+    'paths': [{'name': 'p1', 'provider': 'sr',
+               'endpoint1': {'node': 'openflow:1'},
+               'endpoint2': {'node': 'openflow:2'},
+               'constraints': {'cost': [1, 2]}}],
+    'treepaths': [{'name': 't1', 'root': {'node': 'openflow:1'},
+                   'leaves': {'leaf': [{'node': 'openflow:2'},
+                                       {'node': 'openflow:3'}]}}],
+    'elines': [
+        {'name': 'e1', 'path-name': 'p1', 'provider': 'sr',
+         'bidirectional': True, 'endpoint1': ENDPOINT,
+         'endpoint2': dict(ENDPOINT, **{'switch-port': 'openflow:2:1'})},
+        # values of an unexpected shape and null leaves go to extra
+        {'name': 'e2', 'endpoint1': 'openflow:1:1', 'endpoint2': None,
+         'ethernet-type': [None], 'mtu': 9000}],
+    'etrees': [{'name': 'r1', 'path-name': 't1',
+                'root': {'switch-port': 'openflow:1:1'},
+                'leaves': {'leaf': [{'switch-port': 'openflow:2:1'}],
+                           'other': 1}}],
+    'taps': [{'path-name': 'p1', 'egress': {'switch-port': 'openflow:3:1'}}],
+    'nodes': [{'id': 'openflow:1',
+               'flow-node-inventory:manufacturer': 'Nicira, Inc.',
+               'node-connector': [
+                   {'id': 'openflow:1:1',
+                    'flow-node-inventory:port-number': 1,
+                    'flow-node-inventory:name': 's1-eth1',
+                    'flow-node-inventory:state': {'live': True},
+                    'opendaylight-port-statistics:stats': {'bytes': 5}}]}],
+}
+
+
+@pytest.mark.parametrize('kind', sorted(ENTRIES))
+def test_round_trip(kind):
+    entries = copy.deepcopy(ENTRIES[kind])
+    loaded = models.load(kind, entries)
+    assert models.dump(loaded) == ENTRIES[kind]
+    assert models.load(kind, models.dump(loaded)) == loaded
+
+
+def test_attributes_and_extra():
+    e1, e2 = models.load('elines', ENTRIES['elines'])
+    assert e1.endpoint1.switch_port == 'openflow:1:1'
+    assert e1.endpoint1.taps[0].path_name == 'p1'
+    assert e1.endpoint1.extra == {'vendor:color': 'red'}
+    assert e1.extra is None
+    assert e2.endpoint1 is None and e2.ethernet_type == [None]
+    assert e2.extra == {'endpoint1': 'openflow:1:1', 'endpoint2': None,
+                        'mtu': 9000}
+
+    node = models.load('nodes', ENTRIES['nodes'])[0]
+    assert node.connectors[0].name == 's1-eth1'
+    assert node.connectors[0].extra == \
+        {'opendaylight-port-statistics:stats': {'bytes': 5}}
+
+
+def test_strings_shared_within_a_load():
+    entries = [json.loads(json.dumps(entry)) for entry in
+               [ENTRIES['elines'][0]] * 2]
+    assert entries[0]['provider'] is not entries[1]['provider']
+    first, second = models.load('elines', entries)
+    assert first.provider is second.provider
+    assert first.endpoint1.network_type is second.endpoint2.network_type
+    assert not hasattr(models, '_strings')
+
+
+def test_constructor():
+    path = models.Path(name='p1', provider='sr',
+                       endpoint1=models.Endpoint(node='openflow:1'))
+    assert path.to_restconf() == {'name': 'p1', 'provider': 'sr',
+                                  'endpoint1': {'node': 'openflow:1'}}
+    assert path == models.Path.from_restconf(path.to_restconf())
+    with pytest.raises(TypeError):
+        models.Path(nodes=[])
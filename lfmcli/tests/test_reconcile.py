@@ -0,0 +1,74 @@
+from lfmcli.api import Client
+from lfmcli.fakeserver import FakeFlowManager
+from lfmcli.reconcile import live_state, plan, sync
+
+
+def path(name):
+    return {'name': name, 'endpoint1': {'node': 'openflow:1'},
+            'endpoint2': {'node': 'openflow:2'}}
+
+
+def eline(name, path_name):
+    return {'name': name, 'path-name': path_name,
+            'endpoint1': {'switch-port': 'openflow:1:1'},
+            'endpoint2': {'switch-port': 'openflow:2:1'}}
+
+
+def state(paths=(), elines=()):
+    return {'paths': list(paths), 'treepaths': [], 'elines': list(elines),
+            'etrees': [], 'taps': []}
+
+
+def test_plan():
+    live = state([path('p1'), path('p2')], [eline('e1', 'p1')])
+    desired = state([path('p2'), dict(path('p3'), provider='sr')],
+                    [eline('e1', 'p2')])
+
+    actions, unchanged = plan(desired, live)
+    assert [(op, kind, entry['name']) for op, kind, entry in actions] == \
+        [('create', 'paths', 'p3'), ('update', 'elines', 'e1')]
+    assert unchanged == 1
+
+    actions, unchanged = plan(desired, live, prune=True)
+    assert ('delete', 'paths', path('p1')) in actions
+
+
+def moved_eline(server):
+    fm = Client(config=server.client_config())
+    fm.add_path(path=path('p1'))
+    fm.add_path(path=path('p2'))
+    fm.add_eline(eline=eline('e1', 'p1'))
+    return fm, state([path('p2')], [eline('e1', 'p2')])
+
+
+def test_sync_updates_before_pruning():
+    with FakeFlowManager() as server:
+        fm, desired = moved_eline(server)
+        results = []
+
+        report = sync(fm, desired, prune=True, workers=4,
+                      progress=results.append)
+
+        assert (report['update'], report['delete'], report['ok']) == \
+            (1, 1, 2)
+        assert [(r['kind'], r['name']) for r in results] == \
+            [('elines', 'e1'), ('paths', 'p1')]
+        live = live_state(fm)
+        assert [p['name'] for p in live['paths']] == ['p2']
+        assert live['elines'][0]['path-name'] == 'p2'
+        fm.close()
+
+
+def test_sync_keeps_what_a_failed_update_still_refers_to():
+    with FakeFlowManager() as server:
+        fm, desired = moved_eline(server)
+        fm.add_eline = lambda **kwargs: {'status_code': 500,
+                                         'content': 'boom'}
+
+        report = sync(fm, desired, prune=True)
+
+        assert (report['failed'], report['skipped']) == (1, 1)
+        assert report['errors'][1]['name'] == 'p1'
+        assert sorted(p['name'] for p in live_state(fm)['paths']) == \
+            ['p1', 'p2']
+        fm.close()
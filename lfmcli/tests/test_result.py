@@ -0,0 +1,97 @@
+import json
+import sys
+
+import pytest
+
+from lfmcli.result import Result, child, first, whole
+
+
+class Response(object):
+
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode('utf-8')
+
+
+BODY = {'eline': [{'name': 'e1'}], 'output': {'packets': 5}}
+PARSERS = {'eline': first('eline'), 'output': child('output'),
+           'body': whole}
+
+
+def counting():
+    calls = []
+
+    def parse(name):
+        def counted(body):
+            calls.append(name)
+            return PARSERS[name](body)
+        return counted
+    return dict((name, parse(name)) for name in PARSERS), calls
+
+
+def test_eager_result():
+    r = Result(Response(200, BODY), PARSERS)
+    assert r == {'status_code': 200, 'content': Response(200, BODY).content,
+                 'eline': {'name': 'e1'}, 'output': {'packets': 5},
+                 'body': BODY}
+
+
+def test_parsers():
+    assert first('eline')({'eline': []}) is None
+    assert child('output', {})({'output': None}) == {}
+
+
+def test_errors_and_no_response():
+    r = Result(Response(404, {'errors': {}}), PARSERS, lean=True)
+    assert r['content']
+    assert 'eline' not in r
+    with pytest.raises(KeyError):
+        r['eline']
+    assert Result() == {}
+    assert not Result()
+
+
+def test_lean_keys_are_parsed_on_first_access():
+    parsers, calls = counting()
+    r = Result(Response(200, BODY), parsers, lean=True)
+
+    assert 'content' not in r
+    assert 'eline' in r and r
+    assert calls == []
+    assert r['eline'] == {'name': 'e1'}
+    assert r.get('output') == {'packets': 5}
+    assert r['eline'] is r['eline']
+    assert calls == ['eline', 'output']
+    assert r.get('missing', 1) == 1
+
+    assert sorted(r) == ['body', 'eline', 'output', 'status_code']
+    assert calls.count('body') == 1
+
+
+def test_lean_keep_content():
+    r = Result(Response(200, BODY), PARSERS, lean=True, keep_content=True)
+    assert r['content'] == Response(200, BODY).content
+
+
+def test_lean_writes_and_copies():
+    r = Result(Response(200, BODY), PARSERS, lean=True)
+    r['eline'] = 'replaced'
+    del r['output']
+    r.update(extra=1)
+    assert r['eline'] == 'replaced'
+    assert 'output' not in r
+    # dict methods parse what is left, see the python 2 caveat of Result
+    assert r.copy() == {'status_code': 200, 'eline': 'replaced', 'extra': 1,
+                        'body': BODY}
+    assert len(r) == 4
+    assert json.loads(json.dumps(r))['body'] == BODY
+
+
+def test_dict_copies_need_load_on_python_2():
+    r = Result(Response(200, BODY), PARSERS, lean=True)
+    copy = dict(r.load())
+    assert copy == {'status_code': 200, 'eline': {'name': 'e1'},
+                    'output': {'packets': 5}, 'body': BODY}
+    if sys.version_info[0] >= 3:
+        # python 2 dict() skips the keys not parsed yet
+        assert dict(Result(Response(200, BODY), PARSERS, lean=True)) == copy
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+import requests
+
+from lfmcli.controller import Controller
+from lfmcli.fakeserver import FakeFlowManager
+from lfmcli.retry import CircuitBreaker, CircuitOpenException
+
+
+def open_breaker(breaker, clock):
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock[0] += breaker.reset_timeout
+
+
+def test_probe_without_outcome_reopens_the_breaker(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr('lfmcli.retry.time.time', lambda: clock[0])
+    breaker = CircuitBreaker(threshold=1, reset_timeout=10)
+    open_breaker(breaker, clock)
+
+    breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenException):
+        breaker.allow()
+
+    # the probe was lost: open again, then a new probe
+    clock[0] += 10
+    with pytest.raises(CircuitOpenException):
+        breaker.allow()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock[0] += 10
+    breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_unexpected_send_errors_record_a_failure():
+    with FakeFlowManager() as server:
+        ctrl = Controller(config=server.client_config(breaker_threshold=1))
+        # the next request is the probe
+        ctrl.breaker.state = CircuitBreaker.OPEN
+
+        def redirects(*args, **kwargs):
+            raise requests.exceptions.TooManyRedirects('loop')
+
+        ctrl.get_session().request = redirects
+        with pytest.raises(requests.exceptions.TooManyRedirects):
+            ctrl.http_request('GET', ctrl.get_config_url() +
+                              '/lumina-flowmanager-eline:elines')
+        assert ctrl.breaker.state == CircuitBreaker.OPEN
+        ctrl.close()
+
+
+def test_token_refresh_records_the_probe_outcome():
+    with FakeFlowManager(user='admin', password='admin') as server:
+        ctrl = Controller(config=server.client_config(auth='token'))
+        ctrl.auth.token = 'revoked'
+        ctrl.auth.expires_at = time.time() + 3600
+        ctrl.auth.loaded = True
+        ctrl.breaker.state = CircuitBreaker.OPEN
+        ctrl.breaker.failures = 5
+
+        resp = ctrl.http_request('GET', ctrl.get_operational_url() +
+                                 '/opendaylight-inventory:nodes')
+
+        assert resp.status_code == 200
+        assert ctrl.breaker.state == CircuitBreaker.CLOSED
+        ctrl.close()
@@ -0,0 +1,103 @@
+import click
+import pytest
+import requests
+
+from lfmcli.api import Client
+from lfmcli.commands.selection import make_selector
+from lfmcli.fakeserver import FakeFlowManager
+from lfmcli.retry import CircuitOpenException
+from lfmcli.selector import Selector, delete_names, endpoint_values, \
+    parse_range
+
+
+def eline(name, node='openflow:1', vlan=10, provider='sr'):
+    return {'name': name, 'provider': provider,
+            'endpoint1': {'switch-port': node + ':1', 'segmentation-id': vlan},
+            'endpoint2': {'switch-port': 'openflow:9:1'}}
+
+
+def test_parse_range():
+    assert parse_range('7') == (7, 7)
+    assert parse_range('10-20') == (10, 20)
+    for value in ('x', '1-', '20-10', '1-x'):
+        with pytest.raises(ValueError):
+            parse_range(value)
+
+
+def test_endpoint_values():
+    tree = {'name': 't', 'root': {'node': 'openflow:1'}, 'leaves': [
+        {'switch-port': 'openflow:2:3', 'segmentation-id': '5'},
+        {'switch-port': 'openflow:3:1', 'segmentation-id': 'any'}]}
+    assert endpoint_values(tree) == (
+        {'openflow:1', 'openflow:2', 'openflow:3'}, {5})
+
+
+def test_matches():
+    entries = [eline('a1'), eline('a2', node='openflow:2', vlan=30),
+               eline('b1', provider='mpls'), eline('a3', vlan='x')]
+
+    def names(**kwargs):
+        selector = Selector(**kwargs)
+        return [e['name'] for e in entries if selector.matches(e)]
+
+    assert not Selector()
+    assert names(prefix='a') == ['a1', 'a2', 'a3']
+    assert names(regex='[0-9]$', provider='mpls') == ['b1']
+    assert names(node='openflow:2') == ['a2']
+    assert names(node='openflow:9', segmentation_ids=(20, 40)) == ['a2']
+
+
+def test_invalid_selector():
+    with pytest.raises(ValueError):
+        Selector(regex='(')
+    with pytest.raises(ValueError):
+        Selector(provider='vxlan')
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'regex': '('}, {'segmentation_id': 'x'}, {'segmentation_id': '9-1'},
+    {'segmentation_id': ''}, {'prefix': ' '}, {'node': ''}])
+def test_make_selector_bad_parameter(kwargs):
+    with pytest.raises(click.BadParameter):
+        make_selector(**kwargs)
+
+
+def test_select_and_delete():
+    with FakeFlowManager(nodes=3) as server:
+        fm = Client(config=server.client_config())
+        for entry in (eline('a1'), eline('a2', vlan=30), eline('b1')):
+            fm.add_eline(eline=entry)
+
+        names = Selector(prefix='a').select(fm, 'elines')
+        assert sorted(names) == ['a1', 'a2']
+        report = delete_names(fm, 'elines', names + ['gone'], workers=2)
+        assert report == {'deleted': 3, 'failed': 0, 'errors': []}
+        assert Selector(regex='.').select(fm, 'elines') == ['b1']
+
+
+class Failing(object):
+
+    def __init__(self, error):
+        self.error = error
+
+    def delete_eline(self, name):
+        raise self.error
+
+    def remove_elines(self, names, chunk_size=None):
+        raise self.error
+
+
+@pytest.mark.parametrize('error', [
+    requests.exceptions.ConnectionError('refused'),
+    CircuitOpenException('open')])
+@pytest.mark.parametrize('batch_size', [None, 2])
+def test_delete_request_errors(error, batch_size):
+    report = delete_names(Failing(error), 'elines', ['a', 'b', 'c'],
+                          workers=1, batch_size=batch_size)
+    assert report['deleted'] == 0 and report['failed'] == 3
+    assert [e['name'] for e in report['errors']] == ['a', 'b', 'c']
+
+
+def test_delete_bugs_propagate():
+    with pytest.raises(KeyError):
+        delete_names(Failing(KeyError('name')), 'elines', ['a'], workers=1)
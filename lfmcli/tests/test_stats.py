@@ -0,0 +1,76 @@
+from lfmcli.stats import deltas, flatten, schedule, watch
+
+
+class Clock(object):
+    """ Fake time, advanced by sleep and by the callbacks """
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_flatten():
+    output = {'name': 'e1', 'up': True, 'endpoint1': {'packets': 5},
+              'ports': [{'bytes': '7'}, {'bytes': 'n/a'}], 'drops': 1.5}
+    assert flatten(output) == {'endpoint1.packets': 5, 'ports.0.bytes': 7,
+                               'drops': 1.5}
+
+
+def test_deltas():
+    changes = deltas({'a': 10, 'b': 50, 'gone': 1},
+                     {'a': 30, 'b': 20, 'new': 5}, 4)
+    assert changes == {'a': {'delta': 20, 'reset': False, 'rate': 5.0},
+                       'b': {'delta': 20, 'reset': True, 'rate': 5.0}}
+    assert deltas({'a': 1}, {'a': 1}, 0) == \
+        {'a': {'delta': 0, 'reset': False, 'rate': None}}
+
+
+def test_schedule_keeps_the_start_time():
+    clock = Clock()
+    times = []
+    for tick in schedule(10, count=3, clock=clock, sleep=clock.sleep):
+        times.append((tick, clock.now))
+        clock.now += 2
+    assert times == [(0, 1000), (1, 1010), (2, 1020)]
+    assert clock.sleeps == [8, 8]
+
+
+def test_schedule_skips_missed_ticks():
+    clock = Clock()
+    ticks = []
+    for tick in schedule(10, count=3, clock=clock, sleep=clock.sleep):
+        ticks.append((tick, clock.now))
+        clock.now += 25 if tick == 0 else 1
+    assert ticks == [(0, 1000), (3, 1030), (4, 1040)]
+
+
+def test_watch():
+    clock = Clock()
+    samples = iter([({'packets': 100}, None), (None, 'timeout'),
+                    ({'packets': 160}, None), ({'packets': 4}, None)])
+
+    def sample():
+        clock.now += 1
+        return next(samples)
+
+    results = list(watch(sample, 10, count=4, clock=clock,
+                         sleep=clock.sleep))
+    assert [r['time'] for r in results] == [1000.5, 1010.5, 1020.5, 1030.5]
+
+    first, failed, second, reset = results
+    assert first['deltas'] is None and first['seconds'] is None
+    assert first['counters'] == {'packets': 100}
+    assert failed == {'time': 1010.5, 'seconds': None, 'counters': {},
+                      'deltas': None, 'error': 'timeout'}
+    assert second['seconds'] == 20
+    assert second['deltas'] == \
+        {'packets': {'delta': 60, 'reset': False, 'rate': 3.0}}
+    assert reset['deltas'] == \
+        {'packets': {'delta': 4, 'reset': True, 'rate': 0.4}}
@@ -21,7 +21,8 @@ setuptools.setup(
         'Programming Language :: Python :: 3.5',
     ],
     license='LICENSE',
-    install_requires=['click', 'requests', 'topology-yaml==0.1.1'],
+    install_requires=['click', 'PyYAML', 'requests', 'topology-yaml==0.1.1'],
+    extras_require={'async': ['aiohttp>=3.3']},
     entry_points='''
         [console_scripts]
         lfm=lfmcli.cli:cli